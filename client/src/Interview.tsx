@@ -34,6 +34,9 @@ interface AnalysisResults {
   }>;
 }
 
+// Time between checks of a background analysis job
+const ANALYSIS_POLL_INTERVAL_MS = 2000;
+
 type InterviewScreenRouteProp = RouteProp<RootStackParamList, "Interview">;
 
 const InterviewScreen: FC<{ route: InterviewScreenRouteProp }> = ({
@@ -82,16 +85,31 @@ const InterviewScreen: FC<{ route: InterviewScreenRouteProp }> = ({
 
   /**
    * Gets the analysis results for this interview.
+   *
+   * The server ingests the analysis in a background job, which is polled until it finishes.
    */
   const getAnalysisResults = async () => {
     try {
       const response = await axios.post(SERVER_ENDPOINT("analyze_interview"), {
         id: updatedInterview.analysisId,
       });
+      let job = response.data;
+      while (job.status === "queued" || job.status === "running") {
+        await new Promise((resolve) =>
+          setTimeout(resolve, ANALYSIS_POLL_INTERVAL_MS)
+        );
+        job = (
+          await axios.get(SERVER_ENDPOINT("analyze_interview/" + job.job_id))
+        ).data;
+      }
+      if (job.status !== "completed") {
+        console.log("Analysis failed:", job.error, job.details);
+        return;
+      }
       // TODO: make this code robust to not enough topics
 
       // Sort the topics array in descending order based on probability
-      setAnalysisResults(response.data);
+      setAnalysisResults(job.result);
     } catch (error) {
       console.log("Error fetching analysis:", error);
     }
@@ -1,20 +1,42 @@
 #!/usr/bin/env python3
 
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 import os
 import requests
 import sys
-from typing import Dict, Any, Optional, Tuple
+import time
+from typing import Dict, Any, Iterable, List, Optional, TextIO, Tuple
+
+# Shared with the server without importing the rest of it. Run the tool from the repository root with python -m command_line.recall_tool
+from shared.constants import RECALL_FETCH_DEADLINE_SECONDS
+from shared.http_client import HttpClient
+from shared.payload_cache import PayloadCache
 
 RECALL_CREDENTIAL_FILEPATH = os.path.expanduser("~/.aws/credentials.json")
 
+# (connect, read) timeouts in seconds for requests to Recall
+RECALL_TIMEOUT = (5, 60)
+
+# Payload cache shared with the server, so payloads it fetched can be analyzed without network calls
+RECALL_PAYLOAD_CACHE_DIR = os.environ.get('RECALL_PAYLOAD_CACHE_DIR', os.path.expanduser("~/.cache/voxai/recall"))
+RECALL_PAYLOAD_CACHE_MAX_BYTES = 1024 ** 3
+
+# Number of bots processed at the same time in batch mode
+BATCH_CONCURRENCY = 8
+
+# Commands that can be run for a list of bot ids
+BATCH_COMMANDS = ('transcript', 'analyze', 'save')
+
 class RecallAPI:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache_dir: Optional[str] = RECALL_PAYLOAD_CACHE_DIR, pool_size: int = 10):
         self.api_key = api_key or self.get_recall_api_key()
         if not self.api_key:
             raise ValueError("API key is required either via argument or credentials file")
-        self.base_url = "https://us-west-2.recall.ai/api"
+        self.base_url = os.environ.get("RECALL_API_BASE_URL", "https://us-west-2.recall.ai/api")
+        self.http_client = HttpClient({'recall': RECALL_TIMEOUT}, pool_size=pool_size)
+        self.payload_cache = PayloadCache(cache_dir, RECALL_PAYLOAD_CACHE_MAX_BYTES) if cache_dir else None
         
     @staticmethod
     def get_recall_api_key() -> Optional[str]:
@@ -52,8 +74,9 @@ class RecallAPI:
             'recording_mode': 'speaker_view'
         }
         
-        response = requests.post(
+        response = self.http_client.post(
             f'{self.base_url}/v1/bot/',
+            'recall',
             headers=self.get_headers(),
             json=data
         )
@@ -73,28 +96,53 @@ class RecallAPI:
             }
         }
 
-        response = requests.post(
+        response = self.http_client.post(
             f'{self.base_url}/v2beta/bot/{bot_id}/analyze',
+            'recall',
             headers=self.get_headers(),
             json=data
         )
+        if response.status_code == 201 and self.payload_cache:
+            # The cached payloads belong to the previous analysis
+            self.payload_cache.invalidate(bot_id)
         return response.json(), response.status_code
 
-    def analyze_interview(self, bot_id: str) -> Dict[str, Any]:
-        """Analyzes an interview recording."""
-        transcript_response = requests.get(
-            f'{self.base_url}/v1/bot/{bot_id}/transcript',
-            headers=self.get_headers()
-        )
-        intelligence_response = requests.get(
-            f'{self.base_url}/v1/bot/{bot_id}/intelligence',
+    def fetch_payloads(self, bot_id: str, refresh: bool = False) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Gets the transcript and intelligence payloads from the cache, fetching the missing ones at the same time within one shared deadline."""
+        kinds = ['transcript', 'intelligence']
+        payloads = {kind: self.payload_cache.get(bot_id, kind) if self.payload_cache and not refresh else None for kind in kinds}
+        missing = [kind for kind in kinds if payloads[kind] is None]
+        if not missing:
+            return payloads, {}
+
+        responses = self.http_client.get_many(
+            [f'{self.base_url}/v1/bot/{bot_id}/{kind}' for kind in missing],
+            'recall',
+            RECALL_FETCH_DEADLINE_SECONDS,
             headers=self.get_headers()
         )
 
-        if transcript_response.status_code != 200 or intelligence_response.status_code != 200:
-            return {"error": "Failed to retrieve data"}, 500
+        failures = {}
+        for kind, response in zip(missing, responses):
+            if isinstance(response, Exception):
+                failures[kind] = str(response)
+            elif response.status_code != 200:
+                failures[kind] = f"Status {response.status_code}: {response.text}"
+            else:
+                payloads[kind] = response.json()
+        if not failures and self.payload_cache:
+            for kind in missing:
+                if payloads[kind]:
+                    self.payload_cache.put(bot_id, kind, payloads[kind])
+        return payloads, failures
+
+    def analyze_interview(self, bot_id: str, refresh: bool = False) -> Dict[str, Any]:
+        """Analyzes an interview recording, using cached payloads unless refresh is set."""
+        payloads, failures = self.fetch_payloads(bot_id, refresh)
+        if failures:
+            return {"error": "Failed to retrieve data", "failures": failures}, 500
 
-        intelligence_data = intelligence_response.json()
+        intelligence_data = payloads["intelligence"]
         summary = intelligence_data.get("assembly_ai.summary", "")
         topics = intelligence_data.get("assembly_ai.iab_categories_result", {}).get("summary", {})
         top_5_topics = dict(sorted(topics.items(), key=lambda x: x[1], reverse=True)[:5])
@@ -102,23 +150,98 @@ class RecallAPI:
         return {
             "summary": summary,
             "topics": top_5_topics,
-            "transcript": transcript_response.json(),
+            "transcript": payloads["transcript"],
             "intelligence": intelligence_data
         }, 200
 
     def save_recording(self, bot_id: str) -> Dict[str, Any]:
         """Retrieves recording information for a specific bot."""
-        response = requests.get(
+        response = self.http_client.get(
             f'{self.base_url}/v1/bot/{bot_id}/',
+            'recall',
             headers=self.get_headers()
         )
         return response.json(), response.status_code
 
+def read_bot_ids(lines: Iterable[str]) -> List[str]:
+    """Reads bot ids, one per line, skipping blank lines, # comments and repeated ids."""
+    bot_ids = []
+    seen = set()
+    for line in lines:
+        bot_id = line.split('#', 1)[0].strip()
+        if bot_id and bot_id not in seen:
+            seen.add(bot_id)
+            bot_ids.append(bot_id)
+    return bot_ids
+
+def run_command(api: RecallAPI, command: str, bot_id: str, args: argparse.Namespace) -> Tuple[Dict[str, Any], int]:
+    """Runs a per-bot command for one bot id."""
+    if command == 'transcript':
+        return api.generate_transcript(bot_id)
+    elif command == 'analyze':
+        return api.analyze_interview(bot_id, args.refresh)
+    elif command == 'save':
+        return api.save_recording(bot_id)
+    raise ValueError(f"Unknown command: {command}")
+
+def run_batch(api: RecallAPI, command: str, bot_ids: List[str], args: argparse.Namespace, concurrency: int = BATCH_CONCURRENCY, output: TextIO = sys.stdout, progress: Optional[TextIO] = sys.stderr) -> Dict[str, Any]:
+    """
+    Runs a command for many bots with bounded concurrency, writing one NDJSON result line per bot as each finishes.
+
+    Each result has bot_id, ok, status_code, elapsed_ms and either response or error. A failure for one bot doesn't stop the others.
+
+    Returns:
+        A summary with the number of bots that succeeded and failed, and the ids of the failed ones.
+    """
+    start_time = time.monotonic()
+    failed_bot_ids = []
+
+    def run_one(bot_id):
+        bot_start_time = time.monotonic()
+        try:
+            response, status_code = run_command(api, command, bot_id, args)
+            result = {"bot_id": bot_id, "ok": 200 <= status_code < 300, "status_code": status_code}
+            result["response" if result["ok"] else "error"] = response
+        except Exception as e:
+            result = {"bot_id": bot_id, "ok": False, "status_code": None, "error": f"{type(e).__name__}: {str(e)}"}
+        result["elapsed_ms"] = round((time.monotonic() - bot_start_time) * 1000)
+        return result
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(run_one, bot_id) for bot_id in bot_ids]
+        # Results are written from this thread only, in the order they finish
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+            if not result["ok"]:
+                failed_bot_ids.append(result["bot_id"])
+            if progress:
+                print(f"[{done}/{len(bot_ids)}] {result['bot_id']}: {'ok' if result['ok'] else 'failed'} ({result['elapsed_ms']} ms)", file=progress)
+
+    return {
+        "command": command,
+        "total": len(bot_ids),
+        "succeeded": len(bot_ids) - len(failed_bot_ids),
+        "failed": len(failed_bot_ids),
+        "failed_bot_ids": failed_bot_ids,
+        "elapsed_seconds": round(time.monotonic() - start_time, 2)
+    }
+
+def add_bot_id_arguments(subparser: argparse.ArgumentParser):
+    """Adds the options selecting one bot id, or a batch of them, to a per-bot command."""
+    bot_ids_group = subparser.add_mutually_exclusive_group(required=True)
+    bot_ids_group.add_argument('--bot-id', help='Bot ID for the recording')
+    bot_ids_group.add_argument('--bot-ids', metavar='FILE', help='File with one bot ID per line, or - for stdin; results are written as NDJSON')
+    subparser.add_argument('--concurrency', type=int, default=BATCH_CONCURRENCY, help=f'Number of bots processed at the same time with --bot-ids (default {BATCH_CONCURRENCY})')
+
 def main():
     global RECALL_CREDENTIAL_FILEPATH
     parser = argparse.ArgumentParser(description='Recall.ai API Command Line Tool')
     parser.add_argument('--api-key', help='Your Recall.ai API key (optional if using credentials file)')
     parser.add_argument('--credentials-file', help='Path to credentials file', default=RECALL_CREDENTIAL_FILEPATH)
+    parser.add_argument('--metrics', action='store_true', help='Print request latency metrics to stderr when done')
+    parser.add_argument('--cache-dir', default=RECALL_PAYLOAD_CACHE_DIR, help='Directory of the payload cache (empty to disable)')
     
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
@@ -128,15 +251,16 @@ def main():
 
     # Generate transcript command
     transcript_parser = subparsers.add_parser('transcript', help='Generate transcript')
-    transcript_parser.add_argument('--bot-id', required=True, help='Bot ID for the recording')
+    add_bot_id_arguments(transcript_parser)
 
     # Analyze interview command
     analyze_parser = subparsers.add_parser('analyze', help='Analyze interview')
-    analyze_parser.add_argument('--bot-id', required=True, help='Bot ID for the recording')
+    add_bot_id_arguments(analyze_parser)
+    analyze_parser.add_argument('--refresh', action='store_true', help='Fetch the payloads again instead of using cached ones')
 
     # Save recording command
     save_parser = subparsers.add_parser('save', help='Save recording')
-    save_parser.add_argument('--bot-id', required=True, help='Bot ID for the recording')
+    add_bot_id_arguments(save_parser)
 
     args = parser.parse_args()
 
@@ -149,16 +273,33 @@ def main():
 
     try:
         # Initialize API with either provided key or from credentials file
-        api = RecallAPI(args.api_key)
+        concurrency = max(1, getattr(args, 'concurrency', 1))
+        api = RecallAPI(args.api_key, args.cache_dir, pool_size=max(10, concurrency))
+
+        def print_metrics():
+            if args.metrics:
+                metrics = api.http_client.metrics_snapshot()
+                if api.payload_cache:
+                    metrics["payload_cache"] = api.payload_cache.stats()
+                print(json.dumps(metrics, indent=2), file=sys.stderr)
+
+        if args.command in BATCH_COMMANDS and args.bot_ids:
+            if args.bot_ids == '-':
+                bot_ids = read_bot_ids(sys.stdin)
+            else:
+                with open(args.bot_ids) as f:
+                    bot_ids = read_bot_ids(f)
+            summary = run_batch(api, args.command, bot_ids, args, concurrency, sys.stdout, sys.stderr)
+            print_metrics()
+            print(json.dumps(summary, indent=2), file=sys.stderr)
+            sys.exit(0 if not summary["failed"] else 1)
 
         if args.command == 'join':
             response, status_code = api.join_meeting(args.url)
-        elif args.command == 'transcript':
-            response, status_code = api.generate_transcript(args.bot_id)
-        elif args.command == 'analyze':
-            response, status_code = api.analyze_interview(args.bot_id)
-        elif args.command == 'save':
-            response, status_code = api.save_recording(args.bot_id)
+        else:
+            response, status_code = run_command(api, args.command, args.bot_id, args)
+
+        print_metrics()
 
         if status_code >= 200 and status_code < 300:
             print(json.dumps(response, indent=2))
@@ -1,2 +1,2 @@
-from server.src.routes import auth, default, insights, interviews, okta, onboarding, recall, skills
-from server.src import migrations
\ No newline at end of file
+from server.src.routes import auth, default, insights, interviews, metrics, okta, onboarding, recall, skills
+from server.src import fake_services, migrations, recompute
\ No newline at end of file
@@ -4,13 +4,13 @@ import hashlib
 import json
 
 from ..app import app
-from ..utils import api_error_response
+from ..utils import api_error_response, get_storage
 
 @app.route('/test/sentiment', methods=['POST'])
 def calculate_sentiment():
     url = request.json.get('url')
-    if url.startswith("s3://"):
-        # In real implementation, load from S3
+    if get_storage().owns(url):
+        # In real implementation, load from storage
         pass
     else:
         return api_error_response("Invalid URL", 400)
@@ -19,8 +19,8 @@ def calculate_sentiment():
 @app.route('/test/engagement', methods=['POST'])
 def calculate_engagement():
     url = request.json.get('url')
-    if url.startswith("s3://"):
-        # In real implementation, load from S3
+    if get_storage().owns(url):
+        # In real implementation, load from storage
         pass
     else:
          return api_error_response("Invalid URL", 400)
@@ -0,0 +1,165 @@
+from datetime import datetime, timezone
+from flask import jsonify, request
+from sqlalchemy import and_, or_, update
+
+from ..app import app
+from ..constants import RECALL_STATUS_WEBHOOK_TOKEN
+from ..database import db, Interview
+from ..utils import api_error_response, get_recall_headers, webhook_token_error
+
+from .ingestion import analysis_executor, create_analysis_job, discard_analysis_job, run_analysis_job, update_analysis_job
+from .recall import build_analysis_response, get_recall_bot, request_recall_analysis, save_bot_recording
+
+# Bot status codes that trigger follow-up work: the recording is available, or Recall finished analyzing it
+RECORDING_DONE_STATUS = 'done'
+ANALYSIS_DONE_STATUS = 'analysis_done'
+
+def parse_status_time(value):
+    """Converts a Recall timestamp into a naive UTC datetime, using the current time if there is none."""
+    if not value:
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+def parse_bot_status_event(payload):
+    """
+    Converts a Recall bot status webhook event into its bot id and status.
+
+    Returns:
+        A (bot_id, status) tuple, where status has code, sub_code, message and created_at. Both are None for other kinds of events.
+    """
+    if payload.get("event") != "bot.status_change":
+        return None, None
+    data = payload["data"]
+    status = data["status"]
+    return data.get("bot_id"), {
+        "code": status["code"],
+        "sub_code": status.get("sub_code"),
+        "message": status.get("message"),
+        "created_at": parse_status_time(status.get("created_at"))
+    }
+
+def record_bot_status(interview_id, status):
+    """
+    Stores a bot status on an interview in one conditional UPDATE, unless the interview already has a later status or this one. Commits.
+
+    Returns:
+        Whether the status was stored. Recall retries deliveries and doesn't guarantee their order, so follow-up work only runs when this is true.
+    """
+    stored = db.session.execute(
+        update(Interview)
+        .where(
+            Interview.interview_id == interview_id,
+            or_(
+                Interview.recall_status_at.is_(None),
+                Interview.recall_status_at < status["created_at"],
+                and_(Interview.recall_status_at == status["created_at"], Interview.recall_status != status["code"])
+            )
+        )
+        .values(
+            recall_status=status["code"],
+            recall_status_at=status["created_at"],
+            recall_state={"sub_code": status["sub_code"], "message": status["message"]}
+        )
+        .returning(Interview.interview_id)
+    ).first() is not None
+    db.session.commit()
+    return stored
+
+def update_recall_state(interview_id, **fields):
+    """Adds fields to the recall_state stored on an interview and commits."""
+    interview = db.session.get(Interview, interview_id)
+    interview.recall_state = {**(interview.recall_state or {}), **fields}
+    db.session.commit()
+
+def process_finished_recording(job_id, interview_id, bot_id, headers):
+    """Saves a finished bot's recording and asks Recall to analyze it, recording how it finished in a job created by create_analysis_job. Runs on a background worker."""
+    with app.app_context():
+        try:
+            update_analysis_job(job_id, status="running", stage="save_recording")
+            response = get_recall_bot(bot_id, headers)
+            if response.status_code == 200:
+                save_bot_recording(db.session.get(Interview, interview_id), bot_id, response.json())
+                update_recall_state(interview_id, recording_saved=True)
+            else:
+                app.logger.warning(f"Failed to retrieve bot {bot_id} after its recording finished: {response.text}")
+
+            response = request_recall_analysis(bot_id, headers)
+            update_recall_state(interview_id, analysis_requested=response.status_code == 201)
+            update_analysis_job(job_id, status="completed", stage=None)
+        except Exception as e:
+            db.session.rollback()
+            app.logger.exception(f"Processing the finished recording of bot {bot_id} failed")
+            update_analysis_job(job_id, status="failed", error=str(e))
+
+@app.route('/api/webhooks/recall/status', methods=['POST'])
+def receive_bot_status():
+    """
+    Receives a Recall bot lifecycle event and stores the bot's status on its interview.
+
+    When the recording is done, the recording is saved and its analysis requested; when the analysis is done, it's ingested. Both run as jobs on the background workers, so clients don't need to poll Recall.
+    If the job queue is full, the status isn't stored and the response is a 503, so Recall delivers the event again later.
+    """
+    token_error = webhook_token_error(RECALL_STATUS_WEBHOOK_TOKEN)
+    if token_error:
+        return token_error
+
+    try:
+        bot_id, status = parse_bot_status_event(request.json or {})
+    except (KeyError, TypeError, AttributeError, ValueError):
+        return api_error_response("Invalid bot status event", 400)
+    if status is None:
+        return jsonify({"success": True, "stored": False}), 200
+    if not bot_id:
+        return api_error_response("Missing bot id", 400)
+
+    interview = Interview.query.filter_by(recall_id=bot_id).first()
+    if not interview:
+        return api_error_response("Interview not found", 404)
+
+    # Get the headers and a place in the job queue before storing the status, so a failure makes Recall retry the delivery
+    interview_id = interview.interview_id
+    headers = job_id = None
+    if status["code"] in (RECORDING_DONE_STATUS, ANALYSIS_DONE_STATUS):
+        headers = get_recall_headers()
+        if "error" in headers:
+            return api_error_response(headers["error"], 500)
+        job_id = create_analysis_job(interview_id, bot_id)
+        if job_id is None:
+            return api_error_response("Too many analysis jobs in progress, try again later", 503)
+
+    try:
+        stored = record_bot_status(interview_id, status)
+    except Exception:
+        if job_id:
+            discard_analysis_job(job_id)
+        raise
+    if not stored:
+        if job_id:
+            discard_analysis_job(job_id)
+        return jsonify({"success": True, "stored": False}), 200
+
+    response = {"success": True, "stored": True, "status": status["code"]}
+    if status["code"] == RECORDING_DONE_STATUS:
+        analysis_executor.submit(process_finished_recording, job_id, interview_id, bot_id, headers)
+        response["recording_job_id"] = job_id
+    elif status["code"] == ANALYSIS_DONE_STATUS:
+        # The analysis may have been rerun, so don't use payloads cached from an earlier one
+        analysis_executor.submit(run_analysis_job, job_id, interview_id, bot_id, headers, build_analysis_response, False)
+        update_recall_state(interview_id, analysis_job_id=job_id)
+        response["analysis_job_id"] = job_id
+
+    return jsonify(response), 200
+
+@app.route('/api/interviews/<int:interview_id>/recall_status', methods=['GET'])
+def get_bot_status(interview_id):
+    """Gets the latest Recall bot status stored for an interview, so clients can check progress without calling Recall."""
+    interview = db.session.get(Interview, interview_id)
+    if not interview:
+        return api_error_response("Interview not found", 404)
+
+    return jsonify({
+        "status": interview.recall_status,
+        "status_at": interview.recall_status_at.isoformat() if interview.recall_status_at else None,
+        **(interview.recall_state or {})
+    }), 200
@@ -6,7 +6,7 @@ import requests
 from ..app import app, api_bp
 from ..database import db, Role
 from ..sessions import sessions
-from ..utils import api_error_response, valid_token_response, handle_auth_token
+from ..utils import api_error_response, valid_token_response, handle_auth_token, get_http_client
 
 @api_bp.route('/greenhouse', methods=['POST'])
 def parse_greenhouse_jobs():
@@ -19,7 +19,7 @@ def parse_greenhouse_jobs():
         return api_error_response("Missing 'url' parameter", 400)
 
     try:
-        response = requests.get(url)
+        response = get_http_client().get(url, 'greenhouse')
         response.raise_for_status()
 
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -0,0 +1,262 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from threading import Lock
+import time
+import uuid
+
+from shared.payload_cache import PayloadCache
+
+from ..app import app
+from ..constants import ANALYSIS_WORKER_COUNT, ANALYSIS_QUEUE_MAX, ANALYSIS_JOB_HISTORY, RECALL_API_BASE_URL, RECALL_FETCH_DEADLINE_SECONDS, RECALL_PAYLOAD_CACHE_DIR, RECALL_PAYLOAD_CACHE_MAX_AGE_SECONDS, RECALL_PAYLOAD_CACHE_MAX_BYTES, RECALL_STREAM_CHUNK_BYTES
+from ..database import db, Interview, TranscriptLine
+from ..json_stream import extract_fields
+from ..keywords import extract_interview_keywords
+from ..sentiment import fill_missing_sentiments
+from ..utils import get_http_client
+
+from .realtime import finish_live_transcript
+from .topics import count_topic_mentions, index_interview_topics
+from .transcript import match_transcript_lines, persist_transcript_lines, update_interview_metrics
+from .words import extract_words, store_word_timings
+
+# Stages of the ingestion pipeline, in the order they run
+INGESTION_STAGES = ['fetch', 'parse', 'match', 'persist', 'metrics']
+
+# Background analysis jobs by job id, oldest first
+analysis_jobs = OrderedDict()
+analysis_jobs_lock = Lock()
+analysis_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKER_COUNT, thread_name_prefix='analysis')
+
+# Recall payloads fetched by the pipeline, and the on-disk cache they're kept in
+RECALL_PAYLOAD_KINDS = ['transcript', 'intelligence']
+
+# The parts of the Recall intelligence payload the pipeline reads. The rest of it is skipped while it downloads
+RECALL_INTELLIGENCE_FIELDS = ['assembly_ai.summary', 'assembly_ai.iab_categories_result', 'assembly_ai.sentiment_analysis_results']
+
+# Cache kind of each payload. The intelligence payload is kept apart from the whole payloads recall_tool caches in the same directory, since only its RECALL_INTELLIGENCE_FIELDS are stored
+RECALL_PAYLOAD_CACHE_KINDS = {'transcript': 'transcript', 'intelligence': 'intelligence_fields'}
+recall_payload_cache = PayloadCache(RECALL_PAYLOAD_CACHE_DIR, RECALL_PAYLOAD_CACHE_MAX_BYTES, RECALL_PAYLOAD_CACHE_MAX_AGE_SECONDS)
+
+class IngestionError(Exception):
+    """Raised when a stage of the ingestion pipeline fails."""
+
+    def __init__(self, message, details=None, status_code=500):
+        super().__init__(message)
+        self.message = message
+        self.details = details
+        self.status_code = status_code
+
+def fetch_recall_payloads(bot_id, headers, use_cache=True):
+    """
+    Gets the transcript and intelligence payloads for a bot, from the payload cache or from Recall.
+
+    Payloads missing from the cache are fetched at the same time, within a shared deadline, and cached once every request has succeeded.
+
+    Args:
+        bot_id: The Recall bot that recorded the interview.
+        headers: The Recall API headers.
+        use_cache: Whether cached payloads may be used. Fetched payloads are cached either way.
+
+    Returns:
+        A (transcript, intelligence) tuple of the decoded payloads. The intelligence payload holds only its RECALL_INTELLIGENCE_FIELDS.
+
+    Raises:
+        IngestionError: If any request doesn't succeed. The error names every request that failed.
+    """
+    payloads = {kind: recall_payload_cache.get(bot_id, RECALL_PAYLOAD_CACHE_KINDS[kind]) if use_cache else None for kind in RECALL_PAYLOAD_KINDS}
+    missing = [kind for kind, data in payloads.items() if data is None]
+    if missing:
+        urls = [f'{RECALL_API_BASE_URL}/v1/bot/{bot_id}/{kind}' for kind in missing]
+        responses = get_http_client().get_many(urls, 'recall', RECALL_FETCH_DEADLINE_SECONDS, headers=headers, stream=True)
+        try:
+            # Check for failed requests and HTTP errors in every response
+            failures = []
+            for kind, response in zip(missing, responses):
+                if isinstance(response, Exception):
+                    failures.append((f"{kind.capitalize()} API request failed: {str(response)}", None, 502))
+                elif response.status_code != 200:
+                    failures.append((f"{kind.capitalize()} API request failed with status code {response.status_code}", response.text, 500))
+            if failures:
+                _, details, status_code = failures[0]
+                raise IngestionError("; ".join(message for message, _, _ in failures), details, status_code)
+
+            for kind, response in zip(missing, responses):
+                payloads[kind] = read_recall_payload(kind, response)
+                # Empty payloads are usually an analysis that hasn't finished, so they aren't kept
+                if payloads[kind]:
+                    try:
+                        recall_payload_cache.put(bot_id, RECALL_PAYLOAD_CACHE_KINDS[kind], payloads[kind])
+                    except (OSError, ValueError) as e:
+                        app.logger.warning(f"Failed to cache the {kind} payload of bot {bot_id}: {str(e)}")
+        finally:
+            # Streamed responses hold their connection until closed, including ones left unread after another request failed
+            for response in responses:
+                if not isinstance(response, Exception):
+                    response.close()
+
+    return payloads["transcript"], payloads["intelligence"]
+
+def read_recall_payload(kind, response):
+    """
+    Decodes a streamed Recall response. Only the RECALL_INTELLIGENCE_FIELDS of an intelligence payload are decoded, as its body arrives.
+
+    Raises:
+        IngestionError: If the body is cut off or isn't valid JSON.
+    """
+    try:
+        if kind == 'intelligence':
+            return extract_fields(response.iter_content(RECALL_STREAM_CHUNK_BYTES), RECALL_INTELLIGENCE_FIELDS)
+        return response.json()
+    except requests.RequestException as e:
+        raise IngestionError(f"{kind.capitalize()} API response was interrupted: {str(e)}", None, 502)
+    except ValueError as e:
+        raise IngestionError(f"{kind.capitalize()} API response is not a valid JSON object: {str(e)}", None, 502)
+    finally:
+        response.close()
+
+def parse_recall_payloads(transcript_data, intelligence_data):
+    """Extracts the summary, topics and sentiment results from the Recall payloads."""
+    topics = intelligence_data.get("assembly_ai.iab_categories_result", {}).get("summary", {})
+
+    return {
+        "transcript": transcript_data,
+        "intelligence": intelligence_data,
+        "summary": intelligence_data.get("assembly_ai.summary", ""),
+        "topics": dict(sorted(topics.items(), key=lambda x: x[1], reverse=True)[:5]),
+        "topic_weights": topics,
+        "sentiment_analysis": intelligence_data.get("assembly_ai.sentiment_analysis_results", [])
+    }
+
+def run_ingestion_pipeline(interview_id, bot_id, headers, on_stage=None, use_cache=True):
+    """
+    Runs the fetch, parse, match, persist and metrics stages for an interview and commits the result.
+
+    Args:
+        interview_id: The interview to store the analysis in.
+        bot_id: The Recall bot that recorded the interview.
+        headers: The Recall API headers.
+        on_stage: Optional callback, called with the name of each stage before it starts.
+        use_cache: Whether payloads from the payload cache may be used instead of fetching them again.
+
+    Returns:
+        The parsed payloads from parse_recall_payloads.
+
+    Raises:
+        IngestionError: If the Recall requests fail.
+    """
+    def start_stage(stage):
+        if on_stage:
+            on_stage(stage)
+
+    start_stage('fetch')
+    transcript_data, intelligence_data = fetch_recall_payloads(bot_id, headers, use_cache)
+
+    start_stage('parse')
+    parsed = parse_recall_payloads(transcript_data, intelligence_data)
+
+    start_stage('match')
+    matched_lines = match_transcript_lines(parsed["intelligence"])
+    fill_missing_sentiments(matched_lines)
+
+    start_stage('persist')
+    was_live = finish_live_transcript(interview_id)
+    interview = db.session.get(Interview, interview_id)
+    if matched_lines and was_live:
+        # Lines streamed during the meeting are provisional, so the full transcript replaces them
+        TranscriptLine.query.filter_by(interview_id=interview_id).delete()
+    interview.summary = parsed["summary"]
+    # Keywords come from the transcript text, falling back to the provider's top categories when there is none
+    keywords = extract_interview_keywords(interview_id, [line["text"] for line in matched_lines])
+    interview.keywords = keywords or list(parsed["topics"].keys())
+    persist_transcript_lines(interview_id, matched_lines)
+    store_word_timings(interview_id, extract_words(parsed["transcript"]))
+    topic_mentions = count_topic_mentions(line["labels"] for line in matched_lines)
+    index_interview_topics(interview_id, parsed["topic_weights"], topic_mentions)
+
+    start_stage('metrics')
+    update_interview_metrics(interview_id)
+    db.session.commit()
+
+    return parsed
+
+def update_analysis_job(job_id, **fields):
+    """Updates the stored state of a background analysis job."""
+    with analysis_jobs_lock:
+        analysis_jobs[job_id].update(fields, updated_at=time.time())
+
+def run_analysis_job(job_id, interview_id, bot_id, headers, build_result, use_cache=True):
+    """Runs the ingestion pipeline for a job on a worker thread and records how it finished."""
+    with app.app_context():
+        try:
+            parsed = run_ingestion_pipeline(interview_id, bot_id, headers, lambda stage: update_analysis_job(job_id, status="running", stage=stage), use_cache)
+            update_analysis_job(job_id, status="completed", stage=None, result=build_result(parsed))
+        except IngestionError as e:
+            db.session.rollback()
+            update_analysis_job(job_id, status="failed", error=e.message, details=e.details)
+        except Exception as e:
+            db.session.rollback()
+            app.logger.exception(f"Analysis job {job_id} failed")
+            update_analysis_job(job_id, status="failed", error=str(e))
+
+def create_analysis_job(interview_id, bot_id):
+    """
+    Records a queued job for an interview, reserving a place on the background worker pool. The caller submits the job's work to analysis_executor, or discards it.
+
+    Returns:
+        The new job's id, or None if ANALYSIS_QUEUE_MAX jobs are already queued or running.
+    """
+    with analysis_jobs_lock:
+        active_jobs = sum(1 for job in analysis_jobs.values() if job["status"] in ("queued", "running"))
+        if active_jobs >= ANALYSIS_QUEUE_MAX:
+            return None
+
+        # Forget the oldest finished jobs once the history is full
+        finished_job_ids = [job_id for job_id, job in analysis_jobs.items() if job["status"] in ("completed", "failed")]
+        for job_id in finished_job_ids[:max(0, len(analysis_jobs) - ANALYSIS_JOB_HISTORY + 1)]:
+            del analysis_jobs[job_id]
+
+        job_id = str(uuid.uuid4())
+        analysis_jobs[job_id] = {
+            "job_id": job_id,
+            "bot_id": bot_id,
+            "interview_id": interview_id,
+            "status": "queued",
+            "stage": None,
+            "error": None,
+            "details": None,
+            "result": None,
+            "created_at": time.time(),
+            "updated_at": time.time()
+        }
+    return job_id
+
+def discard_analysis_job(job_id):
+    """Forgets a job created by create_analysis_job whose work was never submitted, releasing its place."""
+    with analysis_jobs_lock:
+        analysis_jobs.pop(job_id, None)
+
+def submit_analysis_job(interview_id, bot_id, headers, build_result, use_cache=True):
+    """
+    Queues the ingestion pipeline for an interview on the background worker pool.
+
+    Args:
+        interview_id: The interview to store the analysis in.
+        bot_id: The Recall bot that recorded the interview.
+        headers: The Recall API headers.
+        build_result: Called with the parsed payloads to build the result stored with the finished job.
+        use_cache: Whether payloads from the payload cache may be used instead of fetching them again.
+
+    Returns:
+        The new job's id, or None if too many jobs are already queued or running.
+    """
+    job_id = create_analysis_job(interview_id, bot_id)
+    if job_id is not None:
+        analysis_executor.submit(run_analysis_job, job_id, interview_id, bot_id, headers, build_result, use_cache)
+    return job_id
+
+def get_analysis_job(job_id):
+    """Returns a copy of a background analysis job's state, or None if the job doesn't exist."""
+    with analysis_jobs_lock:
+        job = analysis_jobs.get(job_id)
+        return dict(job) if job else None
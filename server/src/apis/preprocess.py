@@ -1,7 +1,7 @@
 from flask import jsonify, request
 
 from ..app import app
-from ..utils import api_error_response, download_and_reupload_file
+from ..utils import api_error_response, download_and_reupload_file, get_storage
 
 def preprocess(interview, audio=False, video=False):
     """
@@ -50,7 +50,7 @@ def preprocess_media():
     
     if not audio_url and not video_url:
         return api_error_response("No URL provided", 400)
-    if (audio_url and "s3://" not in audio_url) or (video_url and "s3://" not in video_url):
+    if (audio_url and not get_storage().owns(audio_url)) or (video_url and not get_storage().owns(video_url)):
         return api_error_response("Invalid URL provided", 400)
     
     data = {}
@@ -64,6 +64,6 @@ def preprocess_media():
         data['video_url_preprocessed'] = download_and_reupload_file(video_url, video_output_key)
 
     if (audio_url and data['audio_url_preprocessed'] is None) or (video_url and data['video_url_preprocessed'] is None):
-        return api_error_response("Invalid S3 file", 500)
+        return api_error_response("Invalid stored file", 500)
     
     return jsonify(data), 200
\ No newline at end of file
@@ -0,0 +1,148 @@
+from flask import jsonify, request
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from ..app import app
+from ..constants import REALTIME_WEBHOOK_TOKEN
+from ..database import db, Interview, LiveSpeakerMetrics, TranscriptLine
+from ..sentiment import fill_missing_sentiments
+from ..utils import api_error_response, webhook_token_error
+
+from .transcript import bump_transcript_version, count_words
+
+def parse_realtime_segment(payload):
+    """
+    Converts a Recall real-time transcription event into TranscriptLine fields.
+
+    Returns:
+        A (bot_id, line) tuple. line is None for partial results and segments without words.
+    """
+    data = payload.get("data", {})
+    transcript = data.get("transcript", {})
+    words = transcript.get("words") or []
+    if not transcript.get("is_final", True) or not words:
+        return data.get("bot_id"), None
+
+    confidences = [word["confidence"] for word in words if word.get("confidence") is not None]
+    return data.get("bot_id"), {
+        "text": " ".join(word["text"] for word in words),
+        "start": round(words[0]["start_time"] * 1000),
+        "end": round(words[-1]["end_time"] * 1000),
+        "confidence": sum(confidences) / len(confidences) if confidences else None,
+        "speaker": transcript.get("speaker")
+    }
+
+def add_live_line(interview_id, line):
+    """Adds a line to the running totals of its speaker. Does not commit."""
+    duration = line["end"] - line["start"]
+    statement = insert(LiveSpeakerMetrics).values(
+        interview_id=interview_id,
+        speaker=line["speaker"] or "",
+        line_count=1,
+        word_count=count_words(line["text"]),
+        talk_duration=duration,
+        start=line["start"],
+        end=line["end"]
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=['interview_id', 'speaker'],
+        set_={
+            "line_count": LiveSpeakerMetrics.line_count + statement.excluded.line_count,
+            "word_count": LiveSpeakerMetrics.word_count + statement.excluded.word_count,
+            "talk_duration": LiveSpeakerMetrics.talk_duration + statement.excluded.talk_duration,
+            "start": func.least(LiveSpeakerMetrics.start, statement.excluded.start),
+            "end": func.greatest(LiveSpeakerMetrics.end, statement.excluded.end)
+        }
+    )
+    db.session.execute(statement)
+
+def get_live_metrics_json(interview_id):
+    """
+    Adds up the running totals of every speaker in an interview whose transcript is arriving in real time.
+
+    Returns:
+        The running metrics in the shape stored in engagement_json, or None if the interview has no live transcript.
+    """
+    speakers = db.session.scalars(select(LiveSpeakerMetrics).where(LiveSpeakerMetrics.interview_id == interview_id)).all()
+    if not speakers:
+        return None
+
+    start = min(speaker.start for speaker in speakers)
+    end = max(speaker.end for speaker in speakers)
+    speech_duration = sum(speaker.talk_duration for speaker in speakers)
+    word_count = sum(speaker.word_count for speaker in speakers)
+    return {
+        "live": True,
+        "start": start,
+        "end": end,
+        "interview_duration": end - start,
+        "speech_duration": speech_duration,
+        "line_count": sum(speaker.line_count for speaker in speakers),
+        "wpm": round(word_count / (speech_duration / 60000), 2) if speech_duration > 0 else 0,
+        "word_count_by_speaker": {speaker.speaker: speaker.word_count for speaker in speakers},
+        "talk_duration_by_speaker": {speaker.speaker: speaker.talk_duration for speaker in speakers}
+    }
+
+def finish_live_transcript(interview_id):
+    """
+    Stops tracking the running metrics of an interview once the meeting is over. Does not commit.
+
+    Returns:
+        Whether any lines arrived in real time for the interview.
+    """
+    removed = db.session.execute(
+        delete(LiveSpeakerMetrics).where(LiveSpeakerMetrics.interview_id == interview_id).returning(LiveSpeakerMetrics.speaker)
+    ).all()
+    return bool(removed)
+
+@app.route('/api/webhooks/recall/transcript', methods=['POST'])
+def receive_realtime_transcript():
+    """
+    Receives a transcript segment from a Recall bot while the meeting is in progress.
+
+    The segment and the running metrics are committed before responding, so any worker can take the next segment and nothing is lost if a worker stops.
+    """
+    token_error = webhook_token_error(REALTIME_WEBHOOK_TOKEN)
+    if token_error:
+        return token_error
+
+    try:
+        bot_id, line = parse_realtime_segment(request.json or {})
+    except (KeyError, TypeError, AttributeError):
+        return api_error_response("Invalid transcript segment", 400)
+    if not bot_id:
+        return api_error_response("Missing bot id", 400)
+
+    interview = Interview.query.filter_by(recall_id=bot_id).first()
+    if not interview:
+        return api_error_response("Interview not found", 404)
+    if line is None:
+        # Partial results are replaced by a final segment later
+        return jsonify({"success": True}), 200
+
+    # Bumping the version first locks the interview, so its segments are added one at a time and the stored metrics are never older than the lines
+    # Like ingested lines, live lines aren't written to the edit log
+    bump_transcript_version(interview.interview_id)
+    fill_missing_sentiments([line])
+    db.session.execute(insert(TranscriptLine).values(interview_id=interview.interview_id, **line))
+    add_live_line(interview.interview_id, line)
+
+    metrics = get_live_metrics_json(interview.interview_id)
+    interview.duration = metrics["interview_duration"]
+    interview.speaking_time = metrics["speech_duration"]
+    interview.wpm = metrics["wpm"]
+    interview.engagement_json = metrics
+    db.session.commit()
+
+    return jsonify({"success": True}), 200
+
+@app.route('/api/interviews/<int:interview_id>/live', methods=['GET'])
+def get_live_metrics(interview_id):
+    """Gets the running metrics for an interview whose transcript is arriving in real time."""
+    if not db.session.get(Interview, interview_id):
+        return api_error_response("Interview not found", 404)
+
+    metrics = get_live_metrics_json(interview_id)
+    if metrics is None:
+        return api_error_response("No live transcript for interview", 404)
+    return jsonify(metrics), 200
@@ -3,12 +3,12 @@ import json
 import requests
 
 from ..app import app
-from ..constants import DEBUG_RECALL_INTELLIGENCE, DEBUG_RECALL_RECORDING_RETRIEVAL
+from ..constants import DEBUG_RECALL_INTELLIGENCE, DEBUG_RECALL_RECORDING_RETRIEVAL, REALTIME_TRANSCRIPT_WEBHOOK_URL, RECALL_ACTIVE_STATUSES, RECALL_API_BASE_URL
 from ..database import db, Interview, TranscriptLine
 from ..sessions import sessions
-from ..utils import get_recall_headers, api_error_response, valid_token_response, handle_auth_token, download_and_reupload_file
+from ..utils import get_recall_headers, api_error_response, valid_token_response, handle_auth_token, download_and_reupload_file, get_http_client
 
-from .transcript import process_transcript_lines
+from .ingestion import IngestionError, get_analysis_job, recall_payload_cache, run_ingestion_pipeline, submit_analysis_job
 
 @app.route('/api/join_meeting', methods=['POST'])
 def join_meeting():
@@ -21,15 +21,23 @@ def join_meeting():
     data = {
         'meeting_url': url,
         'bot_name': 'VoxAI Bot',
-        # 'real_time_transcription': {
-        # },
         'automatic_leave': {
             'everyone_left_timeout': 150
         },
         'recording_mode': 'speaker_view'
     }
+    if REALTIME_TRANSCRIPT_WEBHOOK_URL:
+        # Stream transcript segments to /api/webhooks/recall/transcript during the meeting
+        data['transcription_options'] = {'provider': 'assembly_ai'}
+        data['real_time_transcription'] = {
+            'destination_url': REALTIME_TRANSCRIPT_WEBHOOK_URL,
+            'partial_results': False
+        }
     
-    response = requests.post('https://us-west-2.recall.ai/api/v1/bot/', headers=headers, json=data)
+    try:
+        response = get_http_client().post(f'{RECALL_API_BASE_URL}/v1/bot/', 'recall', headers=headers, json=data)
+    except requests.RequestException as e:
+        return api_error_response(f"Recall API request failed: {str(e)}", 502)
     
     # TODO: only pass full response to client when some debug flag is set 
     if response.status_code == 201:
@@ -37,17 +45,19 @@ def join_meeting():
     else:
         return jsonify(response.json()), 400
 
-@app.route('/api/generate_transcript', methods=['POST'])
-def generate_transcript():
-    """Generates a transcript from a meeting recorded by the bot account."""
-    bot_id = request.json.get('id')
-    if not bot_id:
-        return api_error_response("Missing required field: id", 400)
+def recall_not_ready_response(interview, analysis=False):
+    """
+    Returns a 409 response if the bot lifecycle webhook shows that Recall hasn't finished the recording (or, if analysis is set, its analysis), so the request doesn't call Recall for nothing.
 
-    headers = get_recall_headers()
-    if "error" in headers: 
-        return api_error_response(headers["error"], 500)
+    Returns None otherwise, including when no status has been received for the interview.
+    """
+    status = interview.recall_status if interview else None
+    if status in RECALL_ACTIVE_STATUSES or (analysis and status == 'done' and (interview.recall_state or {}).get("analysis_requested")):
+        return api_error_response(f"Recall has not finished processing this interview (status: {status})", 409)
+    return None
 
+def request_recall_analysis(bot_id, headers):
+    """Asks Recall to transcribe and analyze a bot's recording, and returns Recall's response. Once Recall accepts, the bot's cached payloads are dropped, since they belong to the previous analysis."""
     data = {
         'assemblyai_async_transcription': {
             # 'language': 'US English',
@@ -65,7 +75,30 @@ def generate_transcript():
         }
     }
 
-    response = requests.post('https://us-west-2.recall.ai/api/v2beta/bot/' + bot_id + '/analyze', headers=headers, json=data) 
+    response = get_http_client().post(f'{RECALL_API_BASE_URL}/v2beta/bot/{bot_id}/analyze', 'recall', headers=headers, json=data)
+    if response.status_code == 201:
+        recall_payload_cache.invalidate(bot_id)
+    return response
+
+@app.route('/api/generate_transcript', methods=['POST'])
+def generate_transcript():
+    """Generates a transcript from a meeting recorded by the bot account."""
+    bot_id = request.json.get('id')
+    if not bot_id:
+        return api_error_response("Missing required field: id", 400)
+
+    headers = get_recall_headers()
+    if "error" in headers: 
+        return api_error_response(headers["error"], 500)
+
+    not_ready = recall_not_ready_response(Interview.query.filter_by(recall_id=bot_id).first())
+    if not_ready:
+        return not_ready
+
+    try:
+        response = request_recall_analysis(bot_id, headers)
+    except requests.RequestException as e:
+        return api_error_response(f"Recall API request failed: {str(e)}", 502)
 
     # TODO: only pass full response to client when some debug flag is set 
     if response.status_code == 201:
@@ -101,9 +134,25 @@ def generate_transcript():
 
     """
 
+def build_analysis_response(parsed):
+    """Builds the analyze_interview response body from the parsed Recall payloads."""
+    return {
+        "summary": parsed["summary"],
+        "topics": parsed["topics"],
+        "sentiment_analysis": parsed["sentiment_analysis"],
+        "transcript": parsed["transcript"],
+        "debug_intelligence_response": parsed["intelligence"] if DEBUG_RECALL_INTELLIGENCE else None 
+    }
+
 @app.route('/api/analyze_interview', methods=['POST'])
 def analyze_interview():
-    """Gets the result of the interview analysis for a given interview."""
+    """
+    Starts ingesting the result of the interview analysis for a given interview.
+
+    The analysis runs on a background worker, so web workers aren't tied up while Recall's payloads download. The response is a 202 with a job id to poll with /api/analyze_interview/<job_id>, which holds the result once the job has completed.
+    If the request sets "sync" to true, the analysis runs in the request instead and the response holds the result.
+    Payloads cached from an earlier analysis are reused unless the request sets "refresh" to true.
+    """
     # TODO: check auth here (can't currently due to circular import)
     # current_user_id = handle_auth_token(sessions)
     # if current_user_id is None:
@@ -115,52 +164,49 @@ def analyze_interview():
 
     bot_id = request.json.get('id')
 
+    # TODO: Verify auth privileges for user making this request
     interview = Interview.query.filter_by(recall_id=bot_id).first()
     if not interview:
         return api_error_response("Interview not found", 404)
-
-    transcript_response = requests.get('https://us-west-2.recall.ai/api/v1/bot/' + bot_id + '/transcript', headers=headers)
-    intelligence_response = requests.get('https://us-west-2.recall.ai/api/v1/bot/' + bot_id + '/intelligence', headers=headers)
-
-    # Check for HTTP errors in transcript response
-    if transcript_response.status_code != 200:
-        return jsonify({
-            "error": f"Transcript API request failed with status code {transcript_response.status_code}",
-            "details": transcript_response.text
-        }), 500
-
-    # Check for HTTP errors in intelligence response
-    if intelligence_response.status_code != 200:
-        return jsonify({
-            "error": f"Intelligence API request failed with status code {intelligence_response.status_code}",
-            "details": intelligence_response.text
-        }), 500
-
-    intelligence_data = intelligence_response.json()
-
-    summary = intelligence_data.get("assembly_ai.summary", "")
-    topics = intelligence_data.get("assembly_ai.iab_categories_result", {}).get("summary", {})
-    top_5_topics = dict(sorted(topics.items(), key=lambda x: x[1], reverse=True)[:5])
-    sentiment_analysis = intelligence_data.get("assembly_ai.sentiment_analysis_results", [])
-
-    # TODO: Verify auth privileges for user making this request
-    if interview:
-        interview.summary = summary
-        interview.keywords = list(top_5_topics.keys())
-
-        # Process and save TranscriptLines
-        process_transcript_lines(interview.interview_id, intelligence_data)
-        db.session.commit()
-
-    return jsonify({
-        "summary": summary,
-        "topics": top_5_topics,
-        "sentiment_analysis": sentiment_analysis,
-        "transcript": transcript_response.json(),
-        "debug_intelligence_response": intelligence_response.json() if DEBUG_RECALL_INTELLIGENCE else None 
-    }), 200
-
-    return jsonify({"transcript_response": transcript_response.json(), "intelligence_response": intelligence_response.json()}), 200
+    not_ready = recall_not_ready_response(interview, analysis=True)
+    if not_ready:
+        return not_ready
+
+    use_cache = not request.json.get('refresh')
+    if not request.json.get('sync'):
+        job_id = submit_analysis_job(interview.interview_id, bot_id, headers, build_analysis_response, use_cache)
+        if job_id is None:
+            return api_error_response("Too many analysis jobs in progress, try again later", 503)
+        return jsonify({"job_id": job_id, "status": "queued"}), 202
+
+    try:
+        parsed = run_ingestion_pipeline(interview.interview_id, bot_id, headers, use_cache=use_cache)
+    except IngestionError as e:
+        db.session.rollback()
+        return jsonify({"error": e.message, "details": e.details}), e.status_code
+
+    return jsonify(build_analysis_response(parsed)), 200
+
+@app.route('/api/analyze_interview/<string:job_id>', methods=['GET'])
+def get_analysis_job_status(job_id):
+    """Gets the status of a background analysis job, and its result once it has completed."""
+    job = get_analysis_job(job_id)
+    if not job:
+        return api_error_response("Analysis job not found", 404)
+    return jsonify(job), 200
+
+def get_recall_bot(bot_id, headers):
+    """Gets a bot's details, including its recording URL, from Recall, and returns Recall's response."""
+    return get_http_client().get(f'{RECALL_API_BASE_URL}/v1/bot/{bot_id}/', 'recall', headers=headers)
+
+def save_bot_recording(interview, bot_id, bot_data):
+    """Copies a bot's recording to S3 and stores its URL on the interview, given the bot's details from Recall."""
+    video_url = bot_data.get('video_url')
+    download_and_reupload_file(video_url, bot_id + ".mp4")
+
+    # Save video URL to database
+    interview.video_url = video_url
+    db.session.commit()
 
 @app.route('/api/save_recording/<string:bot_id>', methods=['GET'])
 def save_recording(bot_id):
@@ -169,21 +215,23 @@ def save_recording(bot_id):
     if "error" in headers:
         return api_error_response(headers["error"], 500)
 
-    response = requests.get(f'https://us-west-2.recall.ai/api/v1/bot/{bot_id}/', headers=headers)
+    not_ready = recall_not_ready_response(Interview.query.filter_by(recall_id=bot_id).first())
+    if not_ready:
+        return not_ready
+
+    try:
+        response = get_recall_bot(bot_id, headers)
+    except requests.RequestException as e:
+        return api_error_response(f"Recall API request failed: {str(e)}", 502)
 
     if response.status_code == 200:
         interview = Interview.query.filter_by(recall_id=bot_id).first()
         if not interview:
             return api_error_response("Interview not found", 404)
         data = response.json()
-        video_url = data.get('video_url')
-        download_and_reupload_file(video_url, bot_id + ".mp4")
+        save_bot_recording(interview, bot_id, data)
         meeting_url = data.get('meeting_url')
 
-        # Save video URL to database
-        interview.video_url = video_url
-        db.session.commit()
-
         return jsonify({
             "bot_id": bot_id,
             "meeting_url": meeting_url,
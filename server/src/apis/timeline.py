@@ -0,0 +1,150 @@
+from flask import jsonify, request
+
+from ..app import app
+from ..constants import SENTIMENT_SCORES, TIMELINE_BIN_MS, TIMELINE_BINS_MAX, TIMELINE_POINTS_MAX
+from ..database import db, Interview
+from ..queries import get_transcript_analytics_lines
+from ..utils import api_error_response
+
+from .transcript import count_words
+
+def bin_transcript_lines(transcript_lines, bin_ms):
+    """
+    Buckets transcript lines into fixed-width time bins.
+
+    A line that spans several bins contributes to each of them in proportion to how much of it falls inside, so long lines don't make a single bin spike.
+
+    Args:
+        transcript_lines: Transcript lines (or rows with start, end, speaker, text and sentiment) ordered by start time.
+        bin_ms: The width of each bin in milliseconds.
+
+    Returns:
+        A list with one dictionary per bin, holding its start time, the speech time by speaker, the word count and the sentiment total and weight.
+    """
+    if not transcript_lines:
+        return []
+
+    timeline_start = transcript_lines[0].start
+    timeline_end = max(line.end for line in transcript_lines)
+    bin_count = max(1, -(-(timeline_end - timeline_start) // bin_ms))
+    bins = [{"start": timeline_start + i * bin_ms, "talk_time": {}, "words": 0.0, "sentiment_total": 0.0, "sentiment_weight": 0}
+            for i in range(bin_count)]
+
+    for line in transcript_lines:
+        duration = line.end - line.start
+        if duration <= 0:
+            continue
+        words = count_words(line.text)
+        score = SENTIMENT_SCORES.get(line.sentiment.upper()) if line.sentiment else None
+
+        first_bin = (line.start - timeline_start) // bin_ms
+        last_bin = (line.end - 1 - timeline_start) // bin_ms
+        for index in range(first_bin, last_bin + 1):
+            bin_start = timeline_start + index * bin_ms
+            overlap = min(line.end, bin_start + bin_ms) - max(line.start, bin_start)
+            current = bins[index]
+            current["talk_time"][line.speaker] = current["talk_time"].get(line.speaker, 0) + overlap
+            current["words"] += words * overlap / duration
+            if score is not None:
+                current["sentiment_total"] += score * overlap
+                current["sentiment_weight"] += overlap
+
+    return bins
+
+def build_timeline_series(bins):
+    """
+    Converts time bins into sentiment, talk ratio and speaking rate series of [time, value] points.
+
+    Bins where nobody spoke are left out of every series, and bins without sentiment are left out of the sentiment series.
+    """
+    speakers = sorted({speaker for current in bins for speaker in current["talk_time"]}, key=str)
+    series = {"sentiment": [], "wpm": [], "talk_ratio": {speaker: [] for speaker in speakers}}
+
+    for current in bins:
+        talk_time = sum(current["talk_time"].values())
+        if talk_time <= 0:
+            continue
+        series["wpm"].append([current["start"], round(current["words"] / (talk_time / 60000), 2)])
+        for speaker in speakers:
+            series["talk_ratio"][speaker].append([current["start"], round(current["talk_time"].get(speaker, 0) / talk_time, 4)])
+        if current["sentiment_weight"]:
+            series["sentiment"].append([current["start"], round(current["sentiment_total"] / current["sentiment_weight"], 4)])
+
+    return series
+
+def downsample_lttb(points, threshold):
+    """
+    Reduces a series to at most threshold points with the Largest-Triangle-Three-Buckets algorithm.
+
+    The first and last points are always kept. Every other output point is the point in its bucket that forms the largest triangle with the previously kept point and the average of the next bucket, which keeps peaks and dips that plain averaging would flatten.
+
+    Args:
+        points: [x, y] points ordered by x.
+        threshold: The number of points to return. Series that are already this short are returned unchanged.
+
+    Returns:
+        A list of the kept points.
+    """
+    if threshold >= len(points) or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    bucket_size = (len(points) - 2) / (threshold - 2)
+    previous = 0
+
+    for i in range(threshold - 2):
+        # Average of the next bucket, which is just the last point for the final bucket
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, len(points))
+        next_points = points[next_start:next_end]
+        average_x = sum(point[0] for point in next_points) / len(next_points)
+        average_y = sum(point[1] for point in next_points) / len(next_points)
+
+        # Keep the point in this bucket forming the largest triangle
+        bucket_start = int(i * bucket_size) + 1
+        previous_x, previous_y = points[previous]
+        largest_area = -1
+        for index in range(bucket_start, next_start):
+            x, y = points[index]
+            area = abs((previous_x - average_x) * (y - previous_y) - (previous_x - x) * (average_y - previous_y))
+            if area > largest_area:
+                largest_area = area
+                previous = index
+        sampled.append(points[previous])
+
+    sampled.append(points[-1])
+    return sampled
+
+@app.route('/api/interviews/<int:interview_id>/timeline', methods=['GET'])
+def get_interview_timeline(interview_id):
+    """
+    Gets sentiment, talk ratio and speaking rate over time for an interview.
+
+    Query parameters:
+        bin_ms: The width of each time bin in milliseconds.
+        points: Downsample each series to at most this many points.
+    """
+    interview = db.session.get(Interview, interview_id)
+    if not interview:
+        return api_error_response("Interview not found", 404)
+
+    bin_ms = request.args.get('bin_ms', TIMELINE_BIN_MS, type=int)
+    points = request.args.get('points', type=int)
+    if bin_ms is None or bin_ms <= 0:
+        return api_error_response("bin_ms must be a positive integer", 400)
+    if 'points' in request.args and (points is None or not (3 <= points <= TIMELINE_POINTS_MAX)):
+        return api_error_response(f"points must be between 3 and {TIMELINE_POINTS_MAX}", 400)
+
+    lines = get_transcript_analytics_lines(interview_id)
+    if lines and (max(line.end for line in lines) - lines[0].start) / bin_ms > TIMELINE_BINS_MAX:
+        return api_error_response(f"bin_ms is too small, a timeline can have at most {TIMELINE_BINS_MAX} bins", 400)
+
+    series = build_timeline_series(bin_transcript_lines(lines, bin_ms))
+    if points is not None:
+        series = {
+            "sentiment": downsample_lttb(series["sentiment"], points),
+            "wpm": downsample_lttb(series["wpm"], points),
+            "talk_ratio": {speaker: downsample_lttb(values, points) for speaker, values in series["talk_ratio"].items()}
+        }
+
+    return jsonify({"bin_ms": bin_ms, "series": series}), 200
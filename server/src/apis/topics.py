@@ -0,0 +1,170 @@
+from collections import Counter
+from flask import jsonify, request
+import json
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from ..app import app
+from ..constants import TOPIC_RESULTS_MAX
+from ..database import db, Application, Interview, InterviewTopic, TopicAggregate
+from ..utils import api_error_response
+
+def count_topic_mentions(labels):
+    """
+    Counts how many transcript lines are labelled with each topic.
+
+    Args:
+        labels: The labels field of each line, a JSON list of "topic:relevance" strings.
+
+    Returns:
+        A Counter mapping each topic to the number of lines labelled with it.
+    """
+    mentions = Counter()
+    for line_labels in labels:
+        if not line_labels:
+            continue
+        try:
+            topics = {label.rsplit(':', 1)[0] for label in json.loads(line_labels)}
+        except (TypeError, ValueError, AttributeError):
+            # Lines edited by hand may hold free-form labels
+            continue
+        mentions.update(topics)
+    return mentions
+
+def index_interview_topics(interview_id, topic_weights, topic_mentions):
+    """
+    Replaces an interview's entries in the topic index and adjusts the role and candidate totals by the difference.
+
+    Only the topics of this interview are touched, so the cost doesn't depend on how many interviews are indexed. Does not commit.
+
+    Args:
+        interview_id: The interview's id.
+        topic_weights: A dictionary mapping each topic to its relevance over the whole interview.
+        topic_mentions: A dictionary mapping each topic to the number of lines labelled with it.
+    """
+    interview = db.session.get(Interview, interview_id)
+    application = db.session.get(Application, interview.application_id)
+    role_id = application.role_id if application else None
+    candidate_id = interview.candidate_id
+
+    old_entries = {
+        entry.topic: entry for entry in
+        db.session.scalars(select(InterviewTopic).where(InterviewTopic.interview_id == interview_id))
+    }
+    new_entries = {
+        topic: {"weight": float(topic_weights.get(topic, 0)), "mentions": int(topic_mentions.get(topic, 0))}
+        for topic in set(topic_weights) | set(topic_mentions)
+    }
+
+    # Work out how each topic's totals change, in topic order so concurrent ingestions lock the aggregate rows in the same order
+    deltas = []
+    for topic in sorted(set(old_entries) | set(new_entries)):
+        old = old_entries.get(topic)
+        new = new_entries.get(topic, {"weight": 0.0, "mentions": 0})
+        deltas.append({
+            "topic": topic,
+            "interview_count": (topic in new_entries) - (old is not None),
+            "total_weight": new["weight"] - (old.weight if old else 0),
+            "total_mentions": new["mentions"] - (old.mentions if old else 0)
+        })
+
+    # Replace the interview's index entries
+    db.session.execute(delete(InterviewTopic).where(InterviewTopic.interview_id == interview_id))
+    if new_entries:
+        db.session.execute(insert(InterviewTopic), [
+            {"topic": topic, "interview_id": interview_id, "role_id": role_id, "candidate_id": candidate_id, **values}
+            for topic, values in sorted(new_entries.items())
+        ])
+
+    # Apply the differences to the role and candidate totals
+    scopes = [(scope, scope_id) for scope, scope_id in [("role", role_id), ("candidate", candidate_id)] if scope_id is not None]
+    if not deltas or not scopes:
+        return
+    statement = insert(TopicAggregate).values([
+        {"scope": scope, "scope_id": scope_id, **delta} for scope, scope_id in scopes for delta in deltas
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=['scope', 'scope_id', 'topic'],
+        set_={
+            "interview_count": TopicAggregate.interview_count + statement.excluded.interview_count,
+            "total_weight": TopicAggregate.total_weight + statement.excluded.total_weight,
+            "total_mentions": TopicAggregate.total_mentions + statement.excluded.total_mentions
+        }
+    )
+    db.session.execute(statement)
+
+    # Drop topics that no longer appear in any interview for the role or candidate
+    for scope, scope_id in scopes:
+        db.session.execute(delete(TopicAggregate).where(
+            TopicAggregate.scope == scope,
+            TopicAggregate.scope_id == scope_id,
+            TopicAggregate.interview_count <= 0
+        ))
+
+def get_top_topics(scope, scope_id, limit):
+    """Gets the topics with the highest total weight over every interview for a role or candidate."""
+    aggregates = db.session.scalars(
+        select(TopicAggregate)
+        .where(TopicAggregate.scope == scope, TopicAggregate.scope_id == scope_id)
+        .order_by(TopicAggregate.total_weight.desc())
+        .limit(limit)
+    )
+    return [{
+        "topic": aggregate.topic,
+        "interview_count": aggregate.interview_count,
+        "total_weight": aggregate.total_weight,
+        "total_mentions": aggregate.total_mentions
+    } for aggregate in aggregates]
+
+def get_topic_limit():
+    """Reads the limit query parameter for topic requests. Raises ValueError if it is invalid."""
+    limit = int(request.args.get('limit', TOPIC_RESULTS_MAX))
+    if not (0 < limit <= TOPIC_RESULTS_MAX):
+        raise ValueError
+    return limit
+
+@app.route('/api/roles/<int:role_id>/topics', methods=['GET'])
+def get_role_topics(role_id):
+    """Gets the most relevant topics over every interview for a role."""
+    try:
+        limit = get_topic_limit()
+    except ValueError:
+        return api_error_response(f"limit must be between 1 and {TOPIC_RESULTS_MAX}", 400)
+    return jsonify({"topics": get_top_topics("role", role_id, limit)}), 200
+
+@app.route('/api/candidates/<int:candidate_id>/topics', methods=['GET'])
+def get_candidate_topics(candidate_id):
+    """Gets the most relevant topics over every interview for a candidate."""
+    try:
+        limit = get_topic_limit()
+    except ValueError:
+        return api_error_response(f"limit must be between 1 and {TOPIC_RESULTS_MAX}", 400)
+    return jsonify({"topics": get_top_topics("candidate", candidate_id, limit)}), 200
+
+@app.route('/api/topics/interviews', methods=['GET'])
+def get_topic_interviews():
+    """Gets the interviews that cover a topic, most relevant first, optionally limited to a role or candidate."""
+    topic = request.args.get('topic')
+    if not topic:
+        return api_error_response("Missing required parameter: topic", 400)
+    try:
+        limit = get_topic_limit()
+    except ValueError:
+        return api_error_response(f"limit must be between 1 and {TOPIC_RESULTS_MAX}", 400)
+    role_id = request.args.get('role_id', type=int)
+    candidate_id = request.args.get('candidate_id', type=int)
+
+    query = select(InterviewTopic).where(InterviewTopic.topic == topic)
+    if role_id is not None:
+        query = query.where(InterviewTopic.role_id == role_id)
+    if candidate_id is not None:
+        query = query.where(InterviewTopic.candidate_id == candidate_id)
+    entries = db.session.scalars(query.order_by(InterviewTopic.weight.desc()).limit(limit))
+
+    return jsonify({"interviews": [{
+        "interview_id": entry.interview_id,
+        "role_id": entry.role_id,
+        "candidate_id": entry.candidate_id,
+        "weight": entry.weight,
+        "mentions": entry.mentions
+    } for entry in entries]}), 200
@@ -1,19 +1,26 @@
+from bisect import bisect_right
 from collections import Counter, defaultdict
-from flask import jsonify, request
+from flask import Response, jsonify, request, stream_with_context
 from itertools import groupby
+import heapq
 import json
-from operator import attrgetter
+from operator import attrgetter, itemgetter
 import re
-from sqlalchemy import func
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
 
 from ..app import app
-from ..database import db, Interview, TranscriptLine
-from ..queries import get_transcript_lines_in_order
+from ..constants import ENGAGEMENT_METRICS_CACHE_SIZE, INTERRUPTION_MIN_OVERLAP_MS, PAUSE_HISTOGRAM_BUCKETS_MS, SENTIMENT_SCORES, SPEAKING_RATE_WINDOW_SECONDS, SPEAKING_RATE_HOP_SECONDS, STOP_WORDS, WORD_COUNT_TOP_K, TRANSCRIPT_PAGE_SIZE_MAX, TRANSCRIPT_STREAM_BATCH_SIZE
+from ..database import db, Interview, TranscriptEdit, TranscriptLine
+from ..input_validation import validate_transcript_line_fields
+from ..queries import get_transcript_analytics_lines, get_transcript_lines_query
+from ..sentiment import label_sentiments
+from ..utils import VersionedLRUCache, api_error_response
 
 # TODO: add docstrings
 
 def calculate_silence_by_speaker(transcript_lines):
-    # TODO: calculate different counts of pauses in consecutive lines by the same speaker, and pauses when switching between speakers
+    # Pauses within and between speakers are broken down separately by analyze_turn_taking
     silence_by_speaker = {}
     previous_line = None
 
@@ -27,54 +34,257 @@ def calculate_silence_by_speaker(transcript_lines):
 
     return silence_by_speaker
 
+def analyze_turn_taking(transcript_lines, pause_buckets=PAUSE_HISTOGRAM_BUCKETS_MS, interruption_min_overlap=INTERRUPTION_MIN_OVERLAP_MS):
+    """
+    Analyzes turn-taking in a single pass over the transcript.
+
+    A turn is a run of consecutive lines by the same speaker. Pauses between lines in the same turn are counted separately from pauses where the speaker changes. A speaker who starts before the previous turn ends overlaps it, and interrupts it if the overlap is at least interruption_min_overlap.
+
+    Args:
+        transcript_lines: Transcript lines ordered by start time.
+        pause_buckets: Upper bounds (in milliseconds) of the pause histogram buckets. A final bucket holds longer pauses.
+        interruption_min_overlap: The overlap (in milliseconds) needed to count as an interruption.
+
+    Returns:
+        A dictionary with per-speaker turn counts, longest turns, overlaps, interruptions and mean response latency, the intra- and inter-speaker pause histograms, the total overlap and the longest monologue.
+    """
+    speakers = {}
+    intra_speaker_pauses = [0] * (len(pause_buckets) + 1)
+    inter_speaker_pauses = [0] * (len(pause_buckets) + 1)
+    overlap_duration = 0
+    longest_monologue = None
+    turn_speaker = turn_start = turn_end = None
+
+    def close_turn():
+        nonlocal longest_monologue
+        duration = turn_end - turn_start
+        stats = speakers[turn_speaker]
+        stats["longest_turn_ms"] = max(stats["longest_turn_ms"], duration)
+        if longest_monologue is None or duration > longest_monologue["duration"]:
+            longest_monologue = {"speaker": turn_speaker, "start": turn_start, "duration": duration}
+
+    for line in transcript_lines:
+        stats = speakers.setdefault(line.speaker, {
+            "turns": 0, "longest_turn_ms": 0, "overlaps": 0, "interruptions": 0, "responses": 0, "total_response_latency_ms": 0
+        })
+        gap = line.start - turn_end if turn_end is not None else None
+
+        if turn_speaker is not None and line.speaker == turn_speaker:
+            # Same speaker continues the turn
+            if gap > 0:
+                intra_speaker_pauses[bisect_right(pause_buckets, gap)] += 1
+            turn_end = max(turn_end, line.end)
+            continue
+
+        if turn_speaker is not None:
+            close_turn()
+            if gap >= 0:
+                inter_speaker_pauses[bisect_right(pause_buckets, gap)] += 1
+            else:
+                overlap_duration += min(turn_end, line.end) - line.start
+                stats["overlaps"] += 1
+                if -gap >= interruption_min_overlap:
+                    stats["interruptions"] += 1
+            stats["responses"] += 1
+            stats["total_response_latency_ms"] += max(gap, 0)
+
+        stats["turns"] += 1
+        turn_speaker, turn_start, turn_end = line.speaker, line.start, line.end
+
+    if turn_speaker is not None:
+        close_turn()
+
+    for stats in speakers.values():
+        responses = stats.pop("responses")
+        total_latency = stats.pop("total_response_latency_ms")
+        stats["mean_response_latency_ms"] = round(total_latency / responses) if responses else None
+
+    return {
+        "speakers": speakers,
+        "pause_buckets_ms": list(pause_buckets),
+        "intra_speaker_pauses": intra_speaker_pauses,
+        "inter_speaker_pauses": inter_speaker_pauses,
+        "overlap_duration": overlap_duration,
+        "longest_monologue": longest_monologue
+    }
+
 def calculate_talk_duration(transcript_lines):
     durations = defaultdict(int)
     for line in transcript_lines:
         durations[line.speaker] += line.end - line.start
     return dict(durations)
 
-def calculate_speaking_rate_variations(transcript_lines, window_size=60):
-    variations = []
-    
+def calculate_speaking_rate_variations(transcript_lines, window_size=SPEAKING_RATE_WINDOW_SECONDS, hop_size=SPEAKING_RATE_HOP_SECONDS):
+    """
+    Calculates a sliding-window words-per-minute series for each speaker.
+
+    A line belongs to a window if it starts inside it. The rate for a window is the number of words the speaker said in it divided by the time they spent talking in it, so pauses don't pull the rate down. Both edges of the window only move forward, so each line is added and removed at most once.
+
+    Args:
+        transcript_lines: Transcript lines ordered by start time.
+        window_size: The length of each window in seconds.
+        hop_size: The distance between the starts of consecutive windows in seconds.
+
+    Returns:
+        A dictionary mapping each speaker to a list of windows with start_time, end_time (in milliseconds) and wpm. Windows where the speaker didn't talk are left out, so each list is bounded by the interview duration divided by hop_size.
+    """
+    window_ms = int(window_size * 1000)
+    hop_ms = int(hop_size * 1000)
+    # Checked in milliseconds, since sizes below a millisecond round down to 0 and the windows would never advance
+    if window_ms <= 0 or hop_ms <= 0:
+        raise ValueError("window_size and hop_size must be at least a millisecond")
+    if not transcript_lines:
+        return {}
+
+    interview_start = transcript_lines[0].start
+    interview_end = max(line.end for line in transcript_lines)
+
+    # (start, talk time, word count) for each line, grouped by speaker
+    lines_by_speaker = defaultdict(list)
     for line in transcript_lines:
-        words = len(line.text.split())
-        duration = (line.end - line.start) / 60000  # Convert to minutes
-        wpm = words / duration if duration > 0 else 0
-        
-        variations.append({
-            "speaker": line.speaker,
-            "start_time": line.start,
-            "end_time": line.end,
-            "wpm": round(wpm, 2)
-        })
-    
+        lines_by_speaker[line.speaker].append((line.start, line.end - line.start, len(line.text.split())))
+
+    variations = {}
+    for speaker, lines in lines_by_speaker.items():
+        series = []
+        left = right = 0
+        words = talk_time = 0
+        window_start = interview_start
+        while window_start < interview_end:
+            window_end = window_start + window_ms
+
+            # Add lines that start before the end of the window
+            while right < len(lines) and lines[right][0] < window_end:
+                talk_time += lines[right][1]
+                words += lines[right][2]
+                right += 1
+
+            # Remove lines that start before the beginning of the window
+            while left < right and lines[left][0] < window_start:
+                talk_time -= lines[left][1]
+                words -= lines[left][2]
+                left += 1
+
+            if talk_time > 0:
+                series.append({
+                    "start_time": window_start,
+                    "end_time": window_end,
+                    "wpm": round(words / (talk_time / 60000), 2)
+                })
+            window_start += hop_ms
+
+        variations[speaker] = series
+
     return variations
 
+# Engagement metrics by interview id, tagged with the transcript version they were calculated from
+engagement_metrics_cache = VersionedLRUCache(ENGAGEMENT_METRICS_CACHE_SIZE)
+
+def bump_transcript_version(interview_id):
+    """
+    Marks an interview's transcript as changed by ingestion so its cached engagement metrics are recalculated. Returns the new version. Does not commit.
+
+    Ingested lines aren't written to the edit log, so versions before this one can no longer be rebuilt.
+    """
+    version = db.session.scalar(
+        update(Interview)
+        .where(Interview.interview_id == interview_id)
+        .values(transcript_version=Interview.transcript_version + 1)
+        .returning(Interview.transcript_version)
+    )
+    engagement_metrics_cache.invalidate(interview_id)
+    return version
+
+def diff_transcript_line(line_id, old_line, new_line):
+    """
+    Builds an edit log entry holding only what changed in a transcript line.
+
+    Args:
+        line_id: The line's id.
+        old_line: The line's fields before the edit, or None if it was created.
+        new_line: The line's fields after the edit (only the changed ones are needed for updates), or None if it was deleted.
+
+    Returns:
+        A dictionary with line_id, op, changes and previous, or None if nothing changed.
+    """
+    if old_line is None:
+        return {"line_id": line_id, "op": "create", "changes": {field: new_line.get(field) for field in TRANSCRIPT_EDIT_FIELDS}, "previous": None}
+    if new_line is None:
+        return {"line_id": line_id, "op": "delete", "changes": None, "previous": {field: old_line[field] for field in TRANSCRIPT_EDIT_FIELDS}}
+
+    changes = {field: new_line[field] for field in TRANSCRIPT_EDIT_FIELDS if field in new_line and new_line[field] != old_line[field]}
+    if not changes:
+        return None
+    return {"line_id": line_id, "op": "update", "changes": changes, "previous": {field: old_line[field] for field in changes}}
+
+def log_transcript_edits(interview_id, edits):
+    """
+    Bumps an interview's transcript version and appends the edits that produced it to the edit log. Does not commit.
+
+    Each entry holds only the changed fields, and earlier versions are rebuilt by undoing entries from the current lines, so no copy of the whole transcript is written.
+
+    Args:
+        interview_id: The interview's id.
+        edits: Entries built by diff_transcript_line. None entries are skipped.
+
+    Returns:
+        The new transcript version, or None if there were no edits to log.
+    """
+    edits = [edit for edit in edits if edit]
+    if not edits:
+        return None
+
+    version = db.session.scalar(
+        update(Interview)
+        .where(Interview.interview_id == interview_id)
+        .values(transcript_version=Interview.transcript_version + 1)
+        .returning(Interview.transcript_version)
+    )
+    engagement_metrics_cache.invalidate(interview_id)
+    db.session.execute(insert(TranscriptEdit), [{"interview_id": interview_id, "version": version, **edit} for edit in edits])
+    return version
+
 def calculate_engagement_metrics(interview_id):
+    """
+    Gets the engagement metrics for an interview, recalculating them only when its transcript has changed.
+
+    Results are looked up in memory first, then in the copy stored with the interview, and are only recalculated from the transcript lines if both are older than the interview's transcript_version. They are the engagement_json calculated by compute_interview_metrics.
+
+    Args:
+        interview_id: The interview's id.
+
+    Returns:
+        A dictionary of engagement metrics, or None if the interview has no transcript.
+    """
     with app.app_context():
-        transcript_lines = TranscriptLine.query.filter_by(interview_id=interview_id).order_by(TranscriptLine.start).all()
-    
-    if not transcript_lines:
-        return None
-    
-    interview_duration = transcript_lines[-1].end - transcript_lines[0].start
-    
-    # Calculate silence duration
-    total_talk_time = sum(line.end - line.start for line in transcript_lines)
-    silence_duration = interview_duration - total_talk_time
-    
-    engagement_json = {
-        "interview_duration": interview_duration,
-        "conversation_silence_duration": silence_duration,
-        "word_count": count_all_words(transcript_lines),
-        "talk_duration_by_speaker": calculate_talk_duration(transcript_lines),
-        "speaking_rate_variations": calculate_speaking_rate_variations(transcript_lines)
-    }
-    
+        version = db.session.scalar(select(Interview.transcript_version).where(Interview.interview_id == interview_id))
+        if version is None:
+            return None
+
+        engagement_json = engagement_metrics_cache.get(interview_id, version)
+        if engagement_json is not None:
+            return engagement_json
+
+        interview = db.session.get(Interview, interview_id)
+        if interview.engagement_metrics_version == version and interview.engagement_metrics_cache is not None:
+            engagement_json = interview.engagement_metrics_cache
+        else:
+            metrics = compute_interview_metrics(get_transcript_analytics_lines(interview_id))
+            if metrics is None:
+                return None
+            engagement_json = metrics["engagement_json"]
+            interview.engagement_metrics_cache = engagement_json
+            interview.engagement_metrics_version = version
+            db.session.commit()
+
+    engagement_metrics_cache.put(interview_id, version, engagement_json)
     return engagement_json
 
+# Matches a single word in lowercased transcript text
+WORD_PATTERN = re.compile(r"\b[a-z']+\b")
+
 def count_words(text):
-    return len(re.findall(r"\b[a-z']+\b", text.lower()))
+    return len(WORD_PATTERN.findall(text.lower()))
 
 def count_words_by_speaker(transcript_lines):
     # Sort the transcript lines by speaker first
@@ -87,48 +297,136 @@ def count_words_by_speaker(transcript_lines):
     
     return word_count_by_speaker
 
-def count_all_words(transcript_lines):
+def count_word_frequencies(transcript_lines):
+    """Counts every word in the transcript, returning a Counter."""
     word_counter = Counter()
-    
     for line in transcript_lines:
-        words = re.findall(r"\b[a-z']+\b", line.text.lower())
-        word_counter.update(words)
-    
-    # Convert to a regular dictionary and sort by count (descending)
-    word_count_dict = dict(word_counter)
-    sorted_word_count = dict(sorted(word_count_dict.items(), key=lambda item: item[1], reverse=True))
-    
-    return sorted_word_count
+        word_counter.update(WORD_PATTERN.findall(line.text.lower()))
+    return word_counter
+
+def most_common_words(word_counter, top_k=None, stop_words=None):
+    """
+    Gets the most frequent words from a word Counter.
+
+    Args:
+        word_counter: A Counter of words, as returned by count_word_frequencies.
+        top_k: If set, only the top_k most frequent words are returned. They are selected with a heap, so the rest of the vocabulary is never sorted.
+        stop_words: Words to leave out of the result.
+
+    Returns:
+        A dictionary mapping words to counts, most frequent first.
+    """
+    items = word_counter.items()
+    if stop_words:
+        items = [(word, count) for word, count in items if word not in stop_words]
+    if top_k is None:
+        return dict(sorted(items, key=itemgetter(1), reverse=True))
+    return dict(heapq.nlargest(top_k, items, key=itemgetter(1)))
+
+def count_all_words(transcript_lines, top_k=None, stop_words=None):
+    return most_common_words(count_word_frequencies(transcript_lines), top_k, stop_words)
+
+# Fields returned for each transcript line by the transcript APIs
+TRANSCRIPT_LINE_FIELDS = ('id', 'text', 'start', 'end', 'confidence', 'sentiment', 'engagement', 'speaker', 'labels')
+
+# Fields of a transcript line recorded in the edit log
+TRANSCRIPT_EDIT_FIELDS = TRANSCRIPT_LINE_FIELDS[1:]
+
+# Fields that must be provided when creating a transcript line
+TRANSCRIPT_LINE_REQUIRED_FIELDS = ['interview_id', 'text', 'start', 'end', 'confidence', 'sentiment', 'engagement', 'speaker', 'labels']
+
+def select_transcript_line_fields(query):
+    """Limits a TranscriptLine query to the serialized fields, returning plain rows that aren't tracked by the session."""
+    return query.with_entities(*[getattr(TranscriptLine, field) for field in TRANSCRIPT_LINE_FIELDS])
+
+def serialize_transcript_line(line):
+    """Converts a TranscriptLine (or a row with the same fields) to a dictionary."""
+    return {field: getattr(line, field) for field in TRANSCRIPT_LINE_FIELDS}
+
+def parse_optional_int(value):
+    """Parses a query parameter as an integer, returning None if it is missing. Raises ValueError if it is invalid."""
+    return None if value in (None, '') else int(value)
+
+def parse_transcript_cursor(cursor):
+    """Parses a "start:id" transcript cursor into a (start, id) tuple. Raises ValueError if it is invalid."""
+    if not cursor:
+        return None
+    start, line_id = cursor.split(':')
+    return int(start), int(line_id)
 
 @app.route('/api/interviews/<int:interview_id>/transcript', methods=['GET'])
 def get_interview_transcript(interview_id):
-    """Gets the transcript for a given interview."""
+    """
+    Gets the transcript for a given interview.
+
+    Query parameters:
+        start_ms, end_ms: Only return lines that overlap this time range (in milliseconds).
+        speaker: Only return lines from this speaker.
+        limit: Return a page of at most this many lines, with a cursor for the next page.
+        after: The cursor returned with the previous page.
+        format: "ndjson" to stream the lines one per row from a server-side cursor instead of returning one payload.
+    """
     # Check if the interview exists
     interview = db.session.get(Interview, interview_id)
     if not interview:
         return jsonify({"error": "Interview not found"}), 404
 
-    # Retrieve all transcript lines for this interview using the existing function
-    transcript_lines = get_transcript_lines_in_order(interview_id)
-
-    # Serialize the transcript lines
-    transcript_data = []
-    for line in transcript_lines:
-        transcript_data.append({
-            "id": line.id,
-            "text": line.text,
-            "start": line.start,
-            "end": line.end,
-            "confidence": line.confidence,
-            "sentiment": line.sentiment,
-            "engagement": line.engagement,
-            "speaker": line.speaker,
-            "labels": line.labels
-        })
-
-    return jsonify(transcript_data), 200
-
-def process_transcript_lines(interview_id, intelligence_data):
+    try:
+        start_ms = parse_optional_int(request.args.get('start_ms'))
+        end_ms = parse_optional_int(request.args.get('end_ms'))
+        limit = parse_optional_int(request.args.get('limit'))
+        after = parse_transcript_cursor(request.args.get('after'))
+    except ValueError:
+        return api_error_response("Invalid transcript query parameters", 400)
+    if limit is not None and not (0 < limit <= TRANSCRIPT_PAGE_SIZE_MAX):
+        return api_error_response(f"limit must be between 1 and {TRANSCRIPT_PAGE_SIZE_MAX}", 400)
+
+    query = get_transcript_lines_query(interview_id, start_ms, end_ms, request.args.get('speaker'), after)
+    query = select_transcript_line_fields(query)
+
+    if request.args.get('format') == 'ndjson':
+        if limit is not None:
+            query = query.limit(limit)
+
+        def generate():
+            for line in query.yield_per(TRANSCRIPT_STREAM_BATCH_SIZE):
+                yield json.dumps(serialize_transcript_line(line)) + "\n"
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    if limit is None:
+        return jsonify([serialize_transcript_line(line) for line in query]), 200
+
+    # Fetch one extra line to find out whether there is another page
+    lines = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(lines) > limit:
+        lines = lines[:limit]
+        next_cursor = f"{lines[-1].start}:{lines[-1].id}"
+
+    return jsonify({
+        "lines": [serialize_transcript_line(line) for line in lines],
+        "next_cursor": next_cursor
+    }), 200
+
+@app.route('/api/interviews/<int:interview_id>/engagement', methods=['GET'])
+def get_interview_engagement(interview_id):
+    """Gets the engagement metrics for a given interview."""
+    engagement_json = calculate_engagement_metrics(interview_id)
+    if engagement_json is None:
+        return api_error_response("No transcript found for interview", 404)
+    return jsonify(engagement_json), 200
+
+def match_transcript_lines(intelligence_data):
+    """
+    Matches each utterance in a Recall intelligence payload with its topic labels and sentiment.
+
+    Args:
+        intelligence_data: The parsed response from Recall's intelligence API.
+
+    Returns:
+        A list of dictionaries holding the TranscriptLine fields for each utterance.
+    """
     # Create a dictionary to store labels for each time range
     label_dict = {}
     for result in intelligence_data['assembly_ai.iab_categories_result']['results']:
@@ -138,6 +436,7 @@ def process_transcript_lines(interview_id, intelligence_data):
         label_dict[(start, end)] = labels
 
     # Process each utterance from the transcript
+    matched_lines = []
     utterances = intelligence_data.get("assembly_ai.iab_categories_result", {}).get("sentiment_analysis_results", {})
     for utterance in utterances:
         # Find matching labels
@@ -151,42 +450,57 @@ def process_transcript_lines(interview_id, intelligence_data):
         matching_sentiment = next((s for s in intelligence_data['assembly_ai.iab_categories_result']['sentiment_analysis_results']
                                    if s['start'] <= utterance['start'] and s['end'] >= utterance['end']), None)
 
+        matched_lines.append({
+            "text": utterance['text'],
+            "start": utterance['start'],
+            "end": utterance['end'],
+            "confidence": utterance['confidence'],
+            "speaker": utterance['speaker'],
+            "labels": json.dumps(matching_labels),
+            "sentiment": matching_sentiment['sentiment'] if matching_sentiment else None
+        })
+
+    return matched_lines
+
+def persist_transcript_lines(interview_id, matched_lines):
+    """Creates or updates the TranscriptLines for an interview from the output of match_transcript_lines. The lines aren't written to the edit log. Does not commit."""
+    for values in matched_lines:
         # Create or update TranscriptLine
         transcript_line = TranscriptLine.query.filter_by(
             interview_id=interview_id,
-            start=utterance['start'],
-            end=utterance['end']
+            start=values['start'],
+            end=values['end']
         ).first()
 
         if transcript_line:
             # Update existing TranscriptLine
-            transcript_line.text = utterance['text']
-            transcript_line.confidence = utterance['confidence']
-            transcript_line.speaker = utterance['speaker']
-            transcript_line.labels = json.dumps(matching_labels)
-            transcript_line.sentiment = matching_sentiment['sentiment'] if matching_sentiment else None
+            for field, value in values.items():
+                setattr(transcript_line, field, value)
         else:
             # Create new TranscriptLine
-            transcript_line = TranscriptLine(
-                interview_id=interview_id,
-                text=utterance['text'],
-                start=utterance['start'],
-                end=utterance['end'],
-                confidence=utterance['confidence'],
-                speaker=utterance['speaker'],
-                labels=json.dumps(matching_labels),
-                sentiment=matching_sentiment['sentiment'] if matching_sentiment else None
-            )
-            db.session.add(transcript_line)
+            db.session.add(TranscriptLine(interview_id=interview_id, **values))
+
+    if matched_lines:
+        bump_transcript_version(interview_id)
+
+def process_transcript_lines(interview_id, intelligence_data):
+    persist_transcript_lines(interview_id, match_transcript_lines(intelligence_data))
 
     # Calculate and update interview metrics
     update_interview_metrics(interview_id)
 
-def update_interview_metrics(interview_id):
-    transcript_lines = db.session.query(TranscriptLine).filter_by(interview_id=interview_id).order_by(TranscriptLine.start).all()
-    
+def compute_interview_metrics(transcript_lines):
+    """
+    Calculates the metrics stored on an interview from its transcript lines, without touching the database.
+
+    Args:
+        transcript_lines: Transcript lines (or rows with start, end, speaker, text and sentiment) ordered by start time.
+
+    Returns:
+        A dictionary of the duration, speaking_time, wpm, sentiment and engagement_json column values, or None if there are no lines.
+    """
     if not transcript_lines:
-        return
+        return None
 
     # 1. Interview duration
     duration = transcript_lines[-1].end - transcript_lines[0].start
@@ -194,7 +508,7 @@ def update_interview_metrics(interview_id):
     # 2. Word count by speaker and overall
     word_count_by_speaker = count_words_by_speaker(transcript_lines)
 
-    word_count = count_all_words(transcript_lines)
+    word_counter = count_word_frequencies(transcript_lines)
 
     # 3. Overall silence duration
     total_speech_duration = sum(line.end - line.start for line in transcript_lines)
@@ -204,34 +518,50 @@ def update_interview_metrics(interview_id):
     silence_duration_by_speaker = calculate_silence_by_speaker(transcript_lines)
 
     # Calculate speaking time and word count
-    word_count = sum(word_count.values())
+    word_count = sum(word_counter.values())
 
     # Calculate WPM
     wpm = (word_count / (total_speech_duration / 60000) if total_speech_duration > 0 else 0)
 
-    # Calculate overall sentiment
-    sentiments = [line.sentiment for line in transcript_lines if line.sentiment]
-    sentiment_scores = {'POSITIVE': 1, 'NEUTRAL': 0, 'NEGATIVE': -1}
-    overall_sentiment = sum(sentiment_scores.get(s, 0) for s in sentiments) / len(sentiments) if sentiments else 0
+    # Calculate overall sentiment, scoring lines the provider didn't label instead of leaving them out
+    sentiments = [line.sentiment for line in transcript_lines]
+    unlabelled = [index for index, sentiment in enumerate(sentiments) if not sentiment]
+    for index, label in zip(unlabelled, label_sentiments(transcript_lines[index].text for index in unlabelled)):
+        sentiments[index] = label
+    overall_sentiment = sum(SENTIMENT_SCORES.get(s.upper(), 0) for s in sentiments) / len(sentiments) if sentiments else 0
 
     engagement_json = {
         "interview_duration": duration,
         "word_count_by_speaker": word_count_by_speaker,
         "overall_silence_duration": overall_silence_duration,
         "silence_duration_by_speaker": silence_duration_by_speaker,
-        "word_counts": count_all_words(transcript_lines),
+        "turn_taking": analyze_turn_taking(transcript_lines),
+        "word_counts": most_common_words(word_counter, WORD_COUNT_TOP_K, STOP_WORDS),
+        "distinct_word_count": len(word_counter),
         "talk_duration_by_speaker": calculate_talk_duration(transcript_lines),
         "speaking_rate_variations": calculate_speaking_rate_variations(transcript_lines)
     }
 
-    # Update Interview object
+    return {
+        "duration": duration,
+        "speaking_time": total_speech_duration,
+        "wpm": wpm,
+        "sentiment": int((overall_sentiment + 1) * 50),  # Convert to 0-100 scale
+        "engagement_json": engagement_json
+    }
+
+def update_interview_metrics(interview_id):
+    metrics = compute_interview_metrics(get_transcript_analytics_lines(interview_id))
+    if metrics is None:
+        return
+
+    # Update Interview object, keeping the engagement metrics for calculate_engagement_metrics
     interview = db.session.get(Interview, interview_id)
     if interview:
-        interview.duration = duration
-        interview.speaking_time = total_speech_duration
-        interview.wpm = wpm
-        interview.sentiment = int((overall_sentiment + 1) * 50)  # Convert to 0-100 scale
-        interview.engagement_json = engagement_json
+        for column, value in metrics.items():
+            setattr(interview, column, value)
+        interview.engagement_metrics_cache = metrics["engagement_json"]
+        interview.engagement_metrics_version = db.session.scalar(select(Interview.transcript_version).where(Interview.interview_id == interview_id))
 
     db.session.commit()
 
@@ -240,49 +570,93 @@ def create_transcript_line():
     data = request.json
     
     # Validate input
-    required_fields = ['interview_id', 'text', 'start', 'end', 'confidence', 'sentiment', 'engagement', 'speaker', 'labels']
-    if not all(field in data for field in required_fields):
+    if not all(field in data for field in TRANSCRIPT_LINE_REQUIRED_FIELDS):
         return jsonify({"error": "Missing required fields"}), 400
+
+    values, error = validate_transcript_line_fields(data)
+    if error:
+        return jsonify({"error": error}), 400
+
+    new_line = TranscriptLine(interview_id=data['interview_id'], **values)
+    db.session.add(new_line)
+    db.session.flush()
+    log_transcript_edits(new_line.interview_id, [diff_transcript_line(new_line.id, None, serialize_transcript_line(new_line))])
+    db.session.commit()
     
+    return jsonify(serialize_transcript_line(new_line)), 201
+
+@app.route('/api/interviews/<int:interview_id>/transcript/batch', methods=['POST'])
+def batch_edit_transcript(interview_id):
+    """
+    Applies a list of transcript edits to an interview in a single transaction.
+
+    The request body has an "operations" list. Each operation has an "op" of "create", "update" or "delete"; updates and deletes also need the line's "id", and creates and updates carry the line's fields. Every operation is validated before anything is written, so either all of them are applied or none are.
+
+    Returns:
+        The interview's transcript after the edits.
+    """
+    interview = db.session.get(Interview, interview_id)
+    if not interview:
+        return api_error_response("Interview not found", 404)
+
+    operations = (request.json or {}).get('operations')
+    if not isinstance(operations, list):
+        return api_error_response("operations must be a list", 400)
+
+    creates, updates, deletes = [], [], []
+    for index, operation in enumerate(operations):
+        op = operation.get('op') if isinstance(operation, dict) else None
+        if op not in ('create', 'update', 'delete'):
+            return api_error_response(f"Operation {index}: op must be create, update or delete", 400)
+        if op != 'create' and not isinstance(operation.get('id'), int):
+            return api_error_response(f"Operation {index}: missing line id", 400)
+        if op == 'delete':
+            deletes.append(operation['id'])
+            continue
+        if op == 'create' and not all(field in operation for field in TRANSCRIPT_LINE_REQUIRED_FIELDS if field != 'interview_id'):
+            return api_error_response(f"Operation {index}: missing required fields", 400)
+
+        values, error = validate_transcript_line_fields(operation)
+        if error:
+            return api_error_response(f"Operation {index}: {error}", 400)
+        if op == 'create':
+            creates.append({"interview_id": interview_id, **values})
+        elif values:
+            updates.append({"id": operation['id'], **values})
+
+    # Updated and deleted lines must belong to this interview
+    line_ids = {update_values['id'] for update_values in updates} | set(deletes)
+    old_lines = {}
+    if line_ids:
+        old_lines = {
+            line.id: serialize_transcript_line(line) for line in
+            select_transcript_line_fields(TranscriptLine.query.filter(TranscriptLine.interview_id == interview_id, TranscriptLine.id.in_(line_ids)))
+        }
+        missing_ids = line_ids - set(old_lines)
+        if missing_ids:
+            return api_error_response(f"Transcript lines not found: {sorted(missing_ids)}", 404)
+
+    # One statement per kind of operation, committed together
     try:
-        new_line = TranscriptLine(
-            interview_id=data['interview_id'],
-            text=data['text'],
-            start=float(data['start']),
-            end=float(data['end']),
-            confidence=float(data['confidence']),
-            sentiment=data['sentiment'],
-            engagement=data['engagement'],
-            speaker=data['speaker'],
-            labels=data['labels']
-        )
-        
-        # Additional validations
-        if not (0 <= new_line.confidence <= 1):
-            return jsonify({"error": "Confidence must be between 0 and 1"}), 400
-        
-        if new_line.sentiment not in ['positive', 'negative', 'neutral', 'very positive', 'very negative']:
-            return jsonify({"error": "Invalid sentiment value"}), 400
-        
-        if new_line.engagement not in ['low', 'medium', 'high']:
-            return jsonify({"error": "Invalid engagement value"}), 400
-        
-        db.session.add(new_line)
+        edits = []
+        if creates:
+            created_ids = db.session.scalars(insert(TranscriptLine).returning(TranscriptLine.id, sort_by_parameter_order=True), creates).all()
+            edits += [diff_transcript_line(line_id, None, values) for line_id, values in zip(created_ids, creates)]
+        if updates:
+            db.session.execute(update(TranscriptLine), updates)
+            edits += [diff_transcript_line(values['id'], old_lines[values['id']], values) for values in updates]
+        if deletes:
+            db.session.execute(delete(TranscriptLine).where(TranscriptLine.id.in_(deletes)))
+            edits += [diff_transcript_line(line_id, old_lines[line_id], None) for line_id in deletes]
+        if creates or updates or deletes:
+            log_transcript_edits(interview_id, edits)
         db.session.commit()
-        
-        return jsonify({
-            "id": new_line.id,
-            "text": new_line.text,
-            "start": new_line.start,
-            "end": new_line.end,
-            "confidence": new_line.confidence,
-            "sentiment": new_line.sentiment,
-            "engagement": new_line.engagement,
-            "speaker": new_line.speaker,
-            "labels": new_line.labels
-        }), 201
-    except ValueError:
-        return jsonify({"error": "Invalid data types provided"}), 400
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return api_error_response(f"Failed to apply transcript edits: {str(e)}", 500)
+
+    lines = select_transcript_line_fields(get_transcript_lines_query(interview_id))
+    return jsonify([serialize_transcript_line(line) for line in lines]), 200
 
 @app.route('/api/transcript_lines/<int:line_id>', methods=['PUT'])
 def update_transcript_line(line_id):
@@ -291,6 +665,7 @@ def update_transcript_line(line_id):
         return jsonify({"error": "Transcript line not found"}), 404
     
     data = request.json
+    old_line = serialize_transcript_line(line)
     
     try:
         if 'text' in data:
@@ -310,19 +685,10 @@ def update_transcript_line(line_id):
         if 'labels' in data:
             line.labels = data['labels']
         
+        log_transcript_edits(line.interview_id, [diff_transcript_line(line.id, old_line, serialize_transcript_line(line))])
         db.session.commit()
         
-        return jsonify({
-            "id": line.id,
-            "text": line.text,
-            "start": line.start,
-            "end": line.end,
-            "confidence": line.confidence,
-            "sentiment": line.sentiment,
-            "engagement": line.engagement,
-            "speaker": line.speaker,
-            "labels": line.labels
-        }), 200
+        return jsonify(serialize_transcript_line(line)), 200
     except ValueError:
         return jsonify({"error": "Invalid data types provided"}), 400
 
@@ -332,7 +698,9 @@ def delete_transcript_line(line_id):
     if not line:
         return jsonify({"error": "Transcript line not found"}), 404
     
+    old_line = serialize_transcript_line(line)
     db.session.delete(line)
+    log_transcript_edits(line.interview_id, [diff_transcript_line(line.id, old_line, None)])
     db.session.commit()
     
     return '', 204
\ No newline at end of file
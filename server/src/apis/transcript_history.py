@@ -0,0 +1,112 @@
+from flask import jsonify, request
+from sqlalchemy import select
+
+from ..app import app
+from ..constants import TRANSCRIPT_PAGE_SIZE_MAX
+from ..database import db, Interview, TranscriptEdit
+from ..queries import get_transcript_lines_query
+from ..utils import api_error_response
+
+from .transcript import select_transcript_line_fields, serialize_transcript_line
+
+def undo_transcript_edit(lines, edit):
+    """Reverts an edit log entry in a dictionary of transcript lines keyed by line id."""
+    if edit.op == "create":
+        lines.pop(edit.line_id, None)
+    elif edit.op == "update" and edit.line_id in lines:
+        lines[edit.line_id].update(edit.previous)
+    elif edit.op == "delete":
+        lines[edit.line_id] = {"id": edit.line_id, **edit.previous}
+
+def reconstruct_transcript(interview_id, version, current_version):
+    """
+    Rebuilds an interview's transcript as it was at an earlier transcript_version.
+
+    Starts from the current lines and undoes the logged edits after the version, newest first.
+    Ingestion changes lines without logging them, so a version can only be rebuilt if every version after it was produced by a logged edit.
+
+    Args:
+        interview_id: The interview's id.
+        version: The transcript_version to rebuild.
+        current_version: The interview's transcript_version. The caller must keep it from changing while the lines are read.
+
+    Returns:
+        A list of line dictionaries ordered by start time, or None if an unlogged change was made after the version.
+    """
+    edits = db.session.scalars(
+        select(TranscriptEdit)
+        .where(TranscriptEdit.interview_id == interview_id, TranscriptEdit.version > version)
+        .order_by(TranscriptEdit.version.desc(), TranscriptEdit.id.desc())
+    ).all()
+    if {edit.version for edit in edits} != set(range(version + 1, current_version + 1)):
+        return None
+
+    lines = {line["id"]: line for line in (serialize_transcript_line(line) for line in select_transcript_line_fields(get_transcript_lines_query(interview_id)))}
+    for edit in edits:
+        undo_transcript_edit(lines, edit)
+
+    return sorted(lines.values(), key=lambda line: (line["start"] is None, line["start"] or 0, line["id"]))
+
+def serialize_transcript_edit(edit):
+    """Converts a TranscriptEdit to a dictionary."""
+    return {
+        "id": edit.id,
+        "version": edit.version,
+        "line_id": edit.line_id,
+        "op": edit.op,
+        "changes": edit.changes,
+        "previous": edit.previous,
+        "created_at": edit.created_at.isoformat() if edit.created_at else None
+    }
+
+@app.route('/api/interviews/<int:interview_id>/transcript/versions/<int:version>', methods=['GET'])
+def get_transcript_version(interview_id, version):
+    """Gets an interview's transcript as it was at an earlier transcript_version."""
+    # Lock the interview against edits, which update it first, so the lines read match its version
+    current_version = db.session.scalar(
+        select(Interview.transcript_version).where(Interview.interview_id == interview_id).with_for_update(read=True)
+    )
+    if current_version is None:
+        return api_error_response("Interview not found", 404)
+    if version > current_version:
+        return api_error_response(f"Transcript version {version} does not exist yet", 404)
+
+    if version == current_version:
+        lines = [serialize_transcript_line(line) for line in select_transcript_line_fields(get_transcript_lines_query(interview_id))]
+    else:
+        lines = reconstruct_transcript(interview_id, version, current_version)
+    # Release the lock
+    db.session.rollback()
+    if lines is None:
+        return api_error_response(f"Transcript version {version} is not in the edit history", 404)
+
+    return jsonify({"version": version, "lines": lines}), 200
+
+@app.route('/api/interviews/<int:interview_id>/transcript/edits', methods=['GET'])
+def get_transcript_edits(interview_id):
+    """
+    Gets the edit log for an interview's transcript, oldest first.
+
+    Query parameters:
+        after_version: Only return edits that produced a later version.
+        limit: Return at most this many edits.
+    """
+    interview = db.session.get(Interview, interview_id)
+    if not interview:
+        return api_error_response("Interview not found", 404)
+
+    after_version = request.args.get('after_version', -1, type=int)
+    limit = request.args.get('limit', TRANSCRIPT_PAGE_SIZE_MAX, type=int)
+    if not (0 < limit <= TRANSCRIPT_PAGE_SIZE_MAX):
+        return api_error_response(f"limit must be between 1 and {TRANSCRIPT_PAGE_SIZE_MAX}", 400)
+
+    edits = db.session.scalars(
+        select(TranscriptEdit)
+        .where(TranscriptEdit.interview_id == interview_id, TranscriptEdit.version > after_version)
+        .order_by(TranscriptEdit.version, TranscriptEdit.id)
+        .limit(limit)
+    )
+    return jsonify({
+        "transcript_version": interview.transcript_version,
+        "edits": [serialize_transcript_edit(edit) for edit in edits]
+    }), 200
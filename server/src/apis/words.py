@@ -0,0 +1,166 @@
+from array import array
+from bisect import bisect_left
+from flask import jsonify, request
+from operator import itemgetter
+from sqlalchemy.dialects.postgresql import insert
+import sys
+
+from ..app import app
+from ..constants import WORD_CONFIDENCE_SCALE
+from ..database import db, Interview, InterviewWords
+from ..utils import api_error_response
+
+from .transcript import parse_optional_int
+
+# Stored in place of a confidence for words that don't have one
+MISSING_CONFIDENCE = 0xFFFFFFFF
+
+# Array typecode of an unsigned 32-bit integer on this platform, so stored timings read the same everywhere
+UINT32_TYPECODE = next(typecode for typecode in 'IL' if array(typecode).itemsize == 4)
+
+class WordTimings:
+    """
+    Decoded word timings for an interview, ordered by start time.
+
+    offsets, starts, ends and confidences are sequences of uint32 with one entry per word, so a time range can be found by bisecting starts without building an object per word.
+    """
+    __slots__ = ('text', 'offsets', 'starts', 'ends', 'confidences')
+
+    def __init__(self, text, offsets, starts, ends, confidences):
+        self.text = text
+        self.offsets = offsets
+        self.starts = starts
+        self.ends = ends
+        self.confidences = confidences
+
+    def __len__(self):
+        return len(self.starts)
+
+    def find_range(self, start_ms=None, end_ms=None):
+        """Gets the (first, last + 1) indexes of the words spoken between start_ms and end_ms."""
+        first = 0 if start_ms is None else bisect_left(self.starts, start_ms)
+        # Include earlier words that are still being spoken at start_ms
+        while start_ms is not None and first > 0 and self.ends[first - 1] > start_ms:
+            first -= 1
+        last = len(self) if end_ms is None else bisect_left(self.starts, end_ms)
+        return first, max(first, last)
+
+    def to_json(self, first, last):
+        """Converts the words between two indexes to dictionaries."""
+        words = []
+        for index in range(first, last):
+            text_end = self.offsets[index + 1] - 1 if index + 1 < len(self) else len(self.text)
+            confidence = self.confidences[index]
+            words.append({
+                "text": self.text[self.offsets[index]:text_end],
+                "start": self.starts[index],
+                "end": self.ends[index],
+                "confidence": None if confidence == MISSING_CONFIDENCE else confidence / WORD_CONFIDENCE_SCALE
+            })
+        return words
+
+def extract_words(transcript_data):
+    """
+    Collects the word timings from a Recall transcript response.
+
+    Words can give their times in seconds (start_timestamp and end_timestamp, as Recall does) or in milliseconds (start and end, as AssemblyAI does).
+
+    Returns:
+        A list of (text, start, end, confidence) tuples ordered by start time, with times in milliseconds.
+    """
+    segments = transcript_data.get("transcript", []) if isinstance(transcript_data, dict) else transcript_data or []
+    words = []
+    for segment in segments:
+        for word in segment.get("words") or []:
+            text = (word.get("text") or "").strip()
+            if not text:
+                continue
+            if "start_timestamp" in word:
+                start, end = round(word["start_timestamp"] * 1000), round(word["end_timestamp"] * 1000)
+            else:
+                start, end = word["start"], word["end"]
+            words.append((text, start, end, word.get("confidence")))
+    words.sort(key=itemgetter(1))
+    return words
+
+def pack_word_timings(words):
+    """
+    Packs word timings into a space-separated text and a bytes value holding four little-endian uint32 arrays: text offsets, starts, ends and confidences.
+
+    Args:
+        words: (text, start, end, confidence) tuples ordered by start time, as returned by extract_words.
+
+    Returns:
+        A (text, timings) tuple.
+    """
+    offsets, starts, ends, confidences = array(UINT32_TYPECODE), array(UINT32_TYPECODE), array(UINT32_TYPECODE), array(UINT32_TYPECODE)
+    texts = []
+    offset = 0
+    for text, start, end, confidence in words:
+        offsets.append(offset)
+        texts.append(text)
+        offset += len(text) + 1
+        starts.append(max(0, int(start)))
+        ends.append(max(0, int(end)))
+        confidences.append(MISSING_CONFIDENCE if confidence is None else round(confidence * WORD_CONFIDENCE_SCALE))
+
+    timings = offsets + starts + ends + confidences
+    if sys.byteorder == 'big':
+        timings.byteswap()
+    return " ".join(texts), timings.tobytes()
+
+def unpack_word_timings(word_count, text, timings):
+    """
+    Decodes the values stored by pack_word_timings into a WordTimings.
+
+    On little-endian machines the stored bytes are viewed as uint32 without copying, so a range request only decodes the values it reads.
+    """
+    if sys.byteorder == 'big':
+        values = array(UINT32_TYPECODE)
+        values.frombytes(timings)
+        values.byteswap()
+    else:
+        values = memoryview(timings).cast(UINT32_TYPECODE)
+    return WordTimings(
+        text,
+        values[:word_count],
+        values[word_count:2 * word_count],
+        values[2 * word_count:3 * word_count],
+        values[3 * word_count:]
+    )
+
+def store_word_timings(interview_id, words):
+    """Replaces the stored word timings for an interview. Interviews are left unchanged if there are no words. Does not commit."""
+    if not words:
+        return
+    text, timings = pack_word_timings(words)
+    statement = insert(InterviewWords).values(interview_id=interview_id, word_count=len(words), text=text, timings=timings)
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=['interview_id'],
+        set_={"word_count": statement.excluded.word_count, "text": statement.excluded.text, "timings": statement.excluded.timings}
+    ))
+
+@app.route('/api/interviews/<int:interview_id>/words', methods=['GET'])
+def get_interview_words(interview_id):
+    """
+    Gets the word-level timings for an interview.
+
+    Query parameters:
+        start_ms, end_ms: Only return words spoken in this time range (in milliseconds).
+    """
+    interview = db.session.get(Interview, interview_id)
+    if not interview:
+        return api_error_response("Interview not found", 404)
+    stored = db.session.get(InterviewWords, interview_id)
+    if not stored:
+        return api_error_response("No word timings found for interview", 404)
+
+    try:
+        start_ms = parse_optional_int(request.args.get('start_ms'))
+        end_ms = parse_optional_int(request.args.get('end_ms'))
+    except ValueError:
+        return api_error_response("Invalid word query parameters", 400)
+
+    word_timings = unpack_word_timings(stored.word_count, stored.text, stored.timings)
+    first, last = word_timings.find_range(start_ms, end_ms)
+    return jsonify({"word_count": stored.word_count, "words": word_timings.to_json(first, last)}), 200
@@ -1,6 +1,9 @@
 import sys 
 import os
 
+# Shared with command_line/recall_tool.py
+from shared.constants import RECALL_FETCH_DEADLINE_SECONDS
+
 # Score required for an application to count for "fitting job application" metric
 MATCH_THRESHOLD = 80
 
@@ -46,6 +49,160 @@ ENABLE_SYNTHETIC_ENGAGEMENT = "pytest" not in sys.modules
 # Percentage of completed interviews to call APIs for during synthetic data generation
 SYNTHETIC_INTERVIEW_PROCESSING_PERCENTAGE = 10
 
+# Length of each window, in seconds, in the speaking rate series stored in engagement_json
+SPEAKING_RATE_WINDOW_SECONDS = 60
+
+# Distance, in seconds, between the starts of consecutive speaking rate windows
+SPEAKING_RATE_HOP_SECONDS = 15
+
+# Largest page of transcript lines returned by the transcript endpoint
+TRANSCRIPT_PAGE_SIZE_MAX = 1000
+
+# Number of transcript lines fetched per round trip when streaming a transcript
+TRANSCRIPT_STREAM_BATCH_SIZE = 500
+
+# Number of background workers that run interview analysis jobs
+ANALYSIS_WORKER_COUNT = 4
+
+# Largest number of analysis jobs that can be queued or running at once
+ANALYSIS_QUEUE_MAX = 100
+
+# Number of finished analysis jobs kept in memory for status requests
+ANALYSIS_JOB_HISTORY = 1000
+
+# Number of most frequent words stored in engagement_json for each interview
+WORD_COUNT_TOP_K = 50
+
+# Common words left out of the most frequent words stored in engagement_json
+STOP_WORDS = frozenset([
+    "a", "about", "all", "also", "am", "an", "and", "any", "are", "as", "at", "be", "because", "been", "but", "by",
+    "can", "could", "did", "do", "does", "for", "from", "had", "has", "have", "he", "her", "him", "his", "how",
+    "i", "i'm", "if", "in", "into", "is", "it", "it's", "its", "just", "like", "me", "my", "no", "not", "of", "oh",
+    "on", "or", "our", "so", "some", "that", "that's", "the", "their", "them", "then", "there", "they", "this",
+    "to", "uh", "um", "up", "was", "we", "were", "what", "when", "which", "who", "will", "with", "would", "yeah",
+    "you", "your"
+])
+
+# Largest number of results returned by the topic index endpoints
+TOPIC_RESULTS_MAX = 100
+
+# Number of interviews whose engagement metrics are kept in memory
+ENGAGEMENT_METRICS_CACHE_SIZE = 256
+
+# Upper bounds, in milliseconds, of the pause histogram buckets in the turn-taking analysis
+PAUSE_HISTOGRAM_BUCKETS_MS = (250, 500, 1000, 2000, 5000)
+
+# Overlap, in milliseconds, needed for a speaker change to count as an interruption
+INTERRUPTION_MIN_OVERLAP_MS = 500
+
+# Public URL of the real-time transcript webhook passed to Recall when a bot joins a meeting (disabled if unset)
+REALTIME_TRANSCRIPT_WEBHOOK_URL = os.environ.get('REALTIME_TRANSCRIPT_WEBHOOK_URL')
+
+# Token that real-time transcript webhook requests must pass as the "token" query parameter (the webhook rejects every request if unset)
+REALTIME_WEBHOOK_TOKEN = os.environ.get('REALTIME_WEBHOOK_TOKEN')
+
+# Token that Recall bot status webhook requests must pass as the "token" query parameter (the webhook rejects every request if unset)
+RECALL_STATUS_WEBHOOK_TOKEN = os.environ.get('RECALL_STATUS_WEBHOOK_TOKEN')
+
+# Recall bot status codes before the recording is available, while neither the recording nor the analysis can be fetched
+RECALL_ACTIVE_STATUSES = frozenset(['ready', 'joining_call', 'in_waiting_room', 'in_call_not_recording', 'recording_permission_allowed', 'recording_permission_denied', 'in_call_recording', 'call_ended'])
+
+# Default width, in milliseconds, of the time bins in an interview timeline
+TIMELINE_BIN_MS = 10000
+
+# Most time bins a single interview timeline request can produce
+TIMELINE_BINS_MAX = 10000
+
+# Most points per series a downsampled interview timeline can return
+TIMELINE_POINTS_MAX = 2000
+
+# Scores used when averaging transcript line sentiments, keyed by every label a line can hold in upper case (the scale ends at 1 and -1, so the "very" labels score the same as the plain ones)
+SENTIMENT_SCORES = {'VERY POSITIVE': 1, 'POSITIVE': 1, 'NEUTRAL': 0, 'NEGATIVE': -1, 'VERY NEGATIVE': -1}
+
+# Number of interviews sent to a worker process at a time when recomputing metrics
+RECOMPUTE_CHUNK_SIZE = 200
+
+# Number of worker processes used when recomputing metrics
+RECOMPUTE_WORKER_COUNT = os.cpu_count() or 1
+
+# Word confidences are stored as integers in this many parts
+WORD_CONFIDENCE_SCALE = 10000
+
+# Compound score above which (or below the negative of which) a locally scored transcript line is labelled positive (or negative)
+SENTIMENT_LABEL_THRESHOLD = 0.05
+
+# Number of keywords extracted from each interview's transcript
+KEYWORD_COUNT = 5
+
+# Shortest word considered as a keyword
+KEYWORD_MIN_LENGTH = 3
+
+# How often, in seconds, the in-memory document frequencies are reloaded to pick up other workers' ingestions
+KEYWORD_DF_REFRESH_SECONDS = 300
+
+# Base URL of the Recall API. Point it at `flask fake-services` (e.g. http://localhost:8081/recall/api) to run without network access
+RECALL_API_BASE_URL = os.environ.get('RECALL_API_BASE_URL', 'https://us-west-2.recall.ai/api')
+
+# Base URL of the Okta authorization server, overridable in the same way (e.g. http://localhost:8081/okta/oauth2)
+OKTA_ISSUER = os.environ.get('OKTA_ISSUER', 'https://dev-05459793.okta.com/oauth2')
+
+# Endpoint of an S3-compatible service to use instead of AWS (unset for AWS)
+S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL')
+
+# Where uploaded documents and media are stored: 's3', or 'local' for a directory on this machine
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 's3')
+
+# Bucket used by the S3 storage backend
+STORAGE_S3_BUCKET = os.environ.get('STORAGE_S3_BUCKET', 'voxai-test-audio-video')
+
+# Directory used by the local storage backend
+STORAGE_LOCAL_ROOT = os.environ.get('STORAGE_LOCAL_ROOT', os.path.expanduser("~/.local/share/voxai/storage"))
+
+# Size in bytes of each part of a multipart S3 upload or copy. Files smaller than this are sent in a single request
+S3_MULTIPART_CHUNK_BYTES = 8 * 1024 ** 2
+
+# Number of parts of a multipart S3 transfer sent at once. A streamed upload buffers at most this many parts in memory
+S3_MULTIPART_CONCURRENCY = 4
+
+# (connect, read) timeouts in seconds for outbound requests to each integration
+HTTP_TIMEOUTS = {
+    'recall': (5, 30),
+    'okta': (5, 10),
+    'greenhouse': (5, 15),
+    'documents': (5, 30),
+    'media': (10, 300),
+}
+
+# Number of times an idempotent outbound request is retried after a connection error, timeout or overload response
+HTTP_RETRIES = 3
+
+# Delay in seconds before the first retry of an outbound request, doubled for each retry after it
+HTTP_BACKOFF_SECONDS = 0.5
+
+# Number of keep-alive connections kept open to each external host
+HTTP_POOL_SIZE = 10
+
+# Number of consecutive failures after which requests to a host are rejected without being sent
+HTTP_CIRCUIT_FAILURE_THRESHOLD = 5
+
+# How long, in seconds, requests to a failing host are rejected before a trial request is let through
+HTTP_CIRCUIT_RESET_SECONDS = 30
+
+# Number of external hosts a connection pool and circuit breaker are kept for, least recently used first out
+HTTP_MAX_HOSTS = 64
+
+# Size in bytes of the chunks a Recall intelligence payload is parsed in as it downloads
+RECALL_STREAM_CHUNK_BYTES = 256 * 1024
+
+# Directory of the on-disk cache of raw Recall payloads
+RECALL_PAYLOAD_CACHE_DIR = os.environ.get('RECALL_PAYLOAD_CACHE_DIR', os.path.expanduser("~/.cache/voxai/recall"))
+
+# Largest total size in bytes of the compressed Recall payload cache, beyond which the least recently used payloads are deleted
+RECALL_PAYLOAD_CACHE_MAX_BYTES = 1024 ** 3
+
+# How long in seconds a cached Recall payload is used before it's fetched again
+RECALL_PAYLOAD_CACHE_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+
 # A list of skills to use during data generation
 SKILL_LIST = set([
     # Technical Skills
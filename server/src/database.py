@@ -207,6 +207,13 @@ class Interview(db.Model):
     keywords = db.Column(db.ARRAY(db.String)) 
     under_review = db.Column(db.Boolean)
     summary = db.Column(db.Text)
+    transcript_version = db.Column(db.Integer, nullable=False, default=0, server_default='0') # Incremented whenever a transcript line changes
+    engagement_metrics_cache = db.Column(db.JSON) # Last result of calculate_engagement_metrics
+    engagement_metrics_version = db.Column(db.Integer) # transcript_version that engagement_metrics_cache was calculated from
+    keyword_terms = db.Column(db.ARRAY(db.String)) # Distinct terms counted for this interview in the document-frequency table
+    recall_status = db.Column(db.String(64)) # Latest status code received from the Recall bot lifecycle webhook
+    recall_status_at = db.Column(db.DateTime) # When Recall recorded recall_status, used to ignore events delivered out of order
+    recall_state = db.Column(db.JSON) # Details of the latest status and the follow-up actions it triggered
 
     # Relationships
     skill_scores = db.relationship("Skill", secondary="interview_skill_score", back_populates="interviews")
@@ -236,9 +243,100 @@ class TranscriptLine(db.Model):
     # Relationships
     interview = db.relationship('Interview', back_populates='transcript_lines')
 
+    # Supports range filters and keyset pagination on (start, id) within an interview
+    __table_args__ = (db.Index('ix_transcript_lines_interview_start_id', 'interview_id', 'start', 'id'),)
+
     def __repr__(self):
         return f'<TranscriptLine {self.id} - Interview: {self.interview_id}, Start: {self.start}>'
 
+class LiveSpeakerMetrics(db.Model):
+    """Running totals of one speaker's lines in an interview whose transcript arrives during the meeting."""
+    __tablename__ = 'live_speaker_metrics'
+
+    interview_id = db.Column(db.Integer, db.ForeignKey('interview.interview_id'), primary_key=True)
+    speaker = db.Column(db.String, primary_key=True) # Empty for segments without a speaker
+    line_count = db.Column(db.Integer, nullable=False, default=0)
+    word_count = db.Column(db.Integer, nullable=False, default=0)
+    talk_duration = db.Column(db.Integer, nullable=False, default=0)
+    start = db.Column(db.Integer, nullable=False) # Earliest start of the speaker's lines
+    end = db.Column(db.Integer, nullable=False) # Latest end of the speaker's lines
+
+    def __repr__(self):
+        return f'<LiveSpeakerMetrics Interview: {self.interview_id}, Speaker: {self.speaker}>'
+
+class TranscriptEdit(db.Model):
+    """One change to a transcript line, appended to its interview's edit log."""
+    __tablename__ = 'transcript_edit'
+
+    id = db.Column(db.Integer, primary_key=True)
+    interview_id = db.Column(db.Integer, db.ForeignKey('interview.interview_id'), nullable=False)
+    version = db.Column(db.Integer, nullable=False) # The interview's transcript_version after the edit
+    line_id = db.Column(db.Integer, nullable=False) # Not a foreign key, since the line may since have been deleted
+    op = db.Column(db.String, nullable=False) # "create", "update" or "delete"
+    changes = db.Column(db.JSON) # New values of the created or changed fields
+    previous = db.Column(db.JSON) # Old values of the changed or deleted fields
+    created_at = db.Column(db.DateTime, default=lambda: datetime.datetime.now(datetime.UTC))
+
+    __table_args__ = (db.Index('ix_transcript_edit_interview_version', 'interview_id', 'version'),)
+
+    def __repr__(self):
+        return f'<TranscriptEdit {self.op} line {self.line_id} - Interview: {self.interview_id}, Version: {self.version}>'
+
+class InterviewWords(db.Model):
+    """Word-level timings for an interview, stored as packed arrays instead of one row per word."""
+    __tablename__ = 'interview_words'
+
+    interview_id = db.Column(db.Integer, db.ForeignKey('interview.interview_id'), primary_key=True)
+    word_count = db.Column(db.Integer, nullable=False)
+    text = db.Column(db.Text, nullable=False) # Every word, separated by single spaces
+    timings = db.Column(db.LargeBinary, nullable=False) # Little-endian uint32 arrays of text offsets, starts, ends and confidences, one after another
+
+    def __repr__(self):
+        return f'<InterviewWords Interview: {self.interview_id}, Words: {self.word_count}>'
+
+class TermDocumentFrequency(db.Model):
+    """Number of ingested interviews whose transcript contains a term, used to weight keywords."""
+    __tablename__ = 'term_document_frequency'
+
+    term = db.Column(db.String, primary_key=True) # The empty term holds the total number of interviews
+    document_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<TermDocumentFrequency {self.term}: {self.document_count}>'
+
+class InterviewTopic(db.Model):
+    """Inverted index entry linking a topic to an interview that covers it."""
+    __tablename__ = 'interview_topic'
+
+    topic = db.Column(db.String, primary_key=True)
+    interview_id = db.Column(db.Integer, db.ForeignKey('interview.interview_id'), primary_key=True)
+    role_id = db.Column(db.Integer, db.ForeignKey('role.role_id'))
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidate.candidate_id'))
+    weight = db.Column(db.Float, nullable=False, default=0) # Relevance of the topic over the whole interview
+    mentions = db.Column(db.Integer, nullable=False, default=0) # Number of transcript lines labelled with the topic
+
+    __table_args__ = (
+        db.Index('ix_interview_topic_topic_weight', 'topic', 'weight'),
+        db.Index('ix_interview_topic_interview_id', 'interview_id'),
+    )
+
+    def __repr__(self):
+        return f'<InterviewTopic {self.topic} - Interview: {self.interview_id}>'
+
+class TopicAggregate(db.Model):
+    """Running totals of a topic over every interview for a role or candidate."""
+    __tablename__ = 'topic_aggregate'
+
+    scope = db.Column(db.String, primary_key=True) # "role" or "candidate"
+    scope_id = db.Column(db.Integer, primary_key=True)
+    topic = db.Column(db.String, primary_key=True)
+    interview_count = db.Column(db.Integer, nullable=False, default=0)
+    total_weight = db.Column(db.Float, nullable=False, default=0)
+    total_mentions = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<TopicAggregate {self.scope} {self.scope_id} - {self.topic}>'
+
 # Skill Scores
 interview_skill_score_table = db.Table(
     "interview_skill_score",
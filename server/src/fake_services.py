@@ -0,0 +1,231 @@
+import click
+import copy
+from flask import Flask, Response, jsonify, request
+import json
+import os
+import random
+from threading import Lock
+import time
+import uuid
+from werkzeug.serving import run_simple
+
+from .app import app
+
+# Functions in this file run local stand-ins for the external services, replaying recorded responses with injected latency and errors.
+# Point RECALL_API_BASE_URL, OKTA_ISSUER and the Greenhouse, document and recording URLs at them to load-test without network access.
+
+# Recorded responses replayed by the fake services
+FAKE_RESPONSES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_responses')
+
+# Fault injection settings, applied to every service unless overridden for it by name (recall, okta, greenhouse, documents or media)
+DEFAULT_FAULTS = {"latency_ms": 0, "jitter_ms": 0, "error_rate": 0.0, "error_status": 503}
+
+# Size of each chunk of a streamed fake recording
+MEDIA_CHUNK_BYTES = 64 * 1024
+
+def load_fake_response(name):
+    """Loads a recorded response from FAKE_RESPONSES_DIR, decoding it if it's JSON."""
+    with open(os.path.join(FAKE_RESPONSES_DIR, name)) as f:
+        return json.load(f) if name.endswith('.json') else f.read()
+
+def scale_transcript(segments, scale):
+    """Repeats a Recall transcript scale times, shifting each copy's word times to follow the previous copy."""
+    span = max((word["end_timestamp"] for segment in segments for word in segment["words"]), default=0)
+    scaled = []
+    for copy_index in range(scale):
+        offset = copy_index * span
+        for segment in segments:
+            scaled.append({**segment, "words": [
+                {**word, "start_timestamp": round(word["start_timestamp"] + offset, 3), "end_timestamp": round(word["end_timestamp"] + offset, 3)}
+                for word in segment["words"]
+            ]})
+    return scaled
+
+def scale_intelligence(intelligence, scale):
+    """Repeats the utterances, topic results and sentiment results of a Recall intelligence payload scale times, in the same way as scale_transcript."""
+    categories = intelligence["assembly_ai.iab_categories_result"]
+    utterances = categories["sentiment_analysis_results"]
+    span = max((utterance["end"] for utterance in utterances), default=0)
+
+    def repeat(items, shift):
+        return [shift(item, copy_index * span) for copy_index in range(scale) for item in items]
+
+    shift_utterance = lambda utterance, offset: {**utterance, "start": utterance["start"] + offset, "end": utterance["end"] + offset}
+    shift_result = lambda result, offset: {**result, "timestamp": {"start": result["timestamp"]["start"] + offset, "end": result["timestamp"]["end"] + offset}}
+
+    scaled = copy.deepcopy(intelligence)
+    scaled["assembly_ai.iab_categories_result"]["results"] = repeat(categories["results"], shift_result)
+    scaled["assembly_ai.iab_categories_result"]["sentiment_analysis_results"] = repeat(utterances, shift_utterance)
+    scaled["assembly_ai.sentiment_analysis_results"] = repeat(intelligence["assembly_ai.sentiment_analysis_results"], shift_utterance)
+    return scaled
+
+def build_pdf(text):
+    """Builds a minimal one-page PDF showing a line of text, standing in for an uploaded job description."""
+    escaped = text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    stream = f"BT /F1 12 Tf 72 720 Td ({escaped}) Tj ET".encode('latin-1')
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref_offset = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    pdf += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return pdf
+
+def create_fake_services_app(faults=None, service_faults=None, payload_scale=1, media_bytes=1024 ** 2, payload_cache=None, seed=None, sleep=time.sleep):
+    """
+    Creates a Flask app serving fake Recall, Okta, Greenhouse, document and recording endpoints.
+
+    Args:
+        faults: Fault injection settings for every service, overriding DEFAULT_FAULTS.
+        service_faults: Dictionary of fault injection settings by service name, overriding faults for that service.
+        payload_scale: How many times the recorded transcript and intelligence payloads are repeated, to test large payloads.
+        media_bytes: The size of the fake recording served for each bot.
+        payload_cache: Optional PayloadCache of real Recall payloads, replayed instead of the recorded sample for bots it has.
+        seed: Optional seed for the random latency jitter and errors, to make runs repeatable.
+        sleep: Function used to wait for the injected latency.
+
+    Requests are counted by service and outcome at /_fake/stats.
+    """
+    fake_app = Flask('fake_services')
+    faults = {**DEFAULT_FAULTS, **(faults or {})}
+    service_faults = service_faults or {}
+    rng = random.Random(seed)
+    rng_lock = Lock()
+    stats = {}
+    stats_lock = Lock()
+
+    transcript = scale_transcript(load_fake_response('recall_transcript.json'), payload_scale)
+    intelligence = scale_intelligence(load_fake_response('recall_intelligence.json'), payload_scale)
+
+    def count(service, outcome):
+        with stats_lock:
+            service_stats = stats.setdefault(service, {"requests": 0, "errors": 0})
+            service_stats["requests"] += 1
+            service_stats["errors"] += outcome == "error"
+
+    @fake_app.before_request
+    def inject_faults():
+        service = request.path.strip('/').split('/', 1)[0]
+        if service == '_fake':
+            return None
+        settings = {**faults, **service_faults.get(service, {})}
+        with rng_lock:
+            delay_ms = max(0, settings["latency_ms"] + rng.uniform(-settings["jitter_ms"], settings["jitter_ms"]))
+            fail = rng.random() < settings["error_rate"]
+        if delay_ms:
+            sleep(delay_ms / 1000)
+        count(service, "error" if fail else "ok")
+        if fail:
+            return jsonify({"error": "Injected failure", "service": service}), settings["error_status"]
+        return None
+
+    def recall_payload(bot_id, kind, recorded):
+        if payload_cache is not None:
+            cached = payload_cache.get(bot_id, kind)
+            if cached is not None:
+                return cached
+        return recorded
+
+    @fake_app.route('/recall/api/v1/bot/', methods=['POST'])
+    def create_bot():
+        return jsonify({"id": str(uuid.uuid4()), "meeting_url": (request.json or {}).get('meeting_url'), "bot_name": (request.json or {}).get('bot_name')}), 201
+
+    @fake_app.route('/recall/api/v2beta/bot/<bot_id>/analyze', methods=['POST'])
+    def analyze_bot(bot_id):
+        return jsonify({"id": bot_id, "status": "queued"}), 201
+
+    @fake_app.route('/recall/api/v1/bot/<bot_id>/', methods=['GET'])
+    def get_bot(bot_id):
+        bot = load_fake_response('recall_bot.json')
+        bot["id"] = bot_id
+        bot["video_url"] = f"{request.host_url}media/{bot_id}.mp4"
+        return jsonify(bot), 200
+
+    @fake_app.route('/recall/api/v1/bot/<bot_id>/transcript', methods=['GET'])
+    def get_transcript(bot_id):
+        return jsonify(recall_payload(bot_id, 'transcript', transcript)), 200
+
+    @fake_app.route('/recall/api/v1/bot/<bot_id>/intelligence', methods=['GET'])
+    def get_intelligence(bot_id):
+        return jsonify(recall_payload(bot_id, 'intelligence', intelligence)), 200
+
+    @fake_app.route('/okta/oauth2/default/v1/token', methods=['POST'])
+    def get_okta_token():
+        if not request.form.get('code'):
+            return jsonify({"error": "invalid_grant"}), 400
+        return jsonify(load_fake_response('okta_token.json')), 200
+
+    @fake_app.route('/okta/oauth2/default/v1/userinfo', methods=['GET'])
+    def get_okta_userinfo():
+        if not request.headers.get('Authorization', '').startswith('Bearer '):
+            return jsonify({"error": "invalid_token"}), 401
+        return jsonify(load_fake_response('okta_userinfo.json')), 200
+
+    @fake_app.route('/greenhouse/<board>', methods=['GET'])
+    def get_greenhouse_board(board):
+        return Response(load_fake_response('greenhouse_board.html'), mimetype='text/html')
+
+    @fake_app.route('/documents/<name>', methods=['GET'])
+    def get_document(name):
+        return Response(build_pdf(f"Job description for {name}. Skills: Python, SQL, communication."), mimetype='application/pdf')
+
+    @fake_app.route('/media/<name>', methods=['GET'])
+    def get_media(name):
+        def generate():
+            remaining = media_bytes
+            chunk = b'\0' * MEDIA_CHUNK_BYTES
+            while remaining > 0:
+                yield chunk[:remaining]
+                remaining -= MEDIA_CHUNK_BYTES
+        return Response(generate(), mimetype='video/mp4', headers={'Content-Length': str(media_bytes)})
+
+    @fake_app.route('/_fake/stats', methods=['GET'])
+    def get_fake_stats():
+        with stats_lock:
+            return jsonify(copy.deepcopy(stats)), 200
+
+    return fake_app
+
+@app.cli.command('fake-services')
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', default=8081, show_default=True)
+@click.option('--latency-ms', default=0.0, show_default=True, help='Delay added to every response.')
+@click.option('--jitter-ms', default=0.0, show_default=True, help='Random variation of the delay, in either direction.')
+@click.option('--error-rate', default=0.0, show_default=True, help='Fraction of requests answered with --error-status.')
+@click.option('--error-status', default=503, show_default=True, help='Status of injected errors.')
+@click.option('--payload-scale', default=1, show_default=True, help='How many times the recorded Recall payloads are repeated.')
+@click.option('--media-bytes', default=1024 ** 2, show_default=True, help='Size of the fake recording served for each bot.')
+@click.option('--config', 'config_path', type=click.Path(exists=True, dir_okay=False), help='JSON file of fault settings by service name, e.g. {"recall": {"latency_ms": 800}}.')
+@click.option('--replay-cache', type=click.Path(file_okay=False), help='Payload cache directory whose Recall payloads are replayed for the bots it has.')
+@click.option('--seed', type=int, help='Seed for the injected jitter and errors.')
+def fake_services_command(host, port, latency_ms, jitter_ms, error_rate, error_status, payload_scale, media_bytes, config_path, replay_cache, seed):
+    """Runs local stand-ins for Recall, Okta, Greenhouse, documents and recordings."""
+    from shared.payload_cache import PayloadCache
+
+    service_faults = {}
+    if config_path:
+        with open(config_path) as f:
+            service_faults = json.load(f)
+    faults = {"latency_ms": latency_ms, "jitter_ms": jitter_ms, "error_rate": error_rate, "error_status": error_status}
+    fake_app = create_fake_services_app(
+        faults, service_faults, payload_scale, media_bytes,
+        payload_cache=PayloadCache(replay_cache, float('inf')) if replay_cache else None,
+        seed=seed
+    )
+
+    base_url = f"http://{host}:{port}"
+    click.echo(f"Fake services listening on {base_url}. Configure the server with:")
+    click.echo(f"  RECALL_API_BASE_URL={base_url}/recall/api")
+    click.echo(f"  OKTA_ISSUER={base_url}/okta/oauth2")
+    click.echo(f"Greenhouse boards are at {base_url}/greenhouse/<board>, documents at {base_url}/documents/<name>.pdf")
+    run_simple(host, port, fake_app, threaded=True)
@@ -30,3 +30,33 @@ def validate_field_onboarding(field, value):
     elif field in ['hardSkills', 'softSkills', 'behavioralSkills']:
         return None if value and len(value) > 0 else f"At least one {' '.join(re.findall('[A-Z][^A-Z]*', field)).lower()} is required"
     return None
+
+# Allowed values for the sentiment and engagement fields of a TranscriptLine
+TRANSCRIPT_LINE_SENTIMENTS = ['positive', 'negative', 'neutral', 'very positive', 'very negative']
+TRANSCRIPT_LINE_ENGAGEMENTS = ['low', 'medium', 'high']
+
+def validate_transcript_line_fields(data):
+    """
+    Converts and validates the editable TranscriptLine fields present in a request payload.
+
+    Args:
+        data: A dictionary that may contain any of text, start, end, confidence, sentiment, engagement, speaker and labels.
+
+    Returns:
+        A (values, error) tuple. values holds the converted fields, and error is a message describing the first invalid field, or None.
+    """
+    values = {field: data[field] for field in ['text', 'sentiment', 'engagement', 'speaker', 'labels'] if field in data}
+    try:
+        for field in ['start', 'end', 'confidence']:
+            if field in data:
+                values[field] = float(data[field])
+    except (TypeError, ValueError):
+        return None, "Invalid data types provided"
+
+    if 'confidence' in values and not (0 <= values['confidence'] <= 1):
+        return None, "Confidence must be between 0 and 1"
+    if 'sentiment' in values and values['sentiment'] not in TRANSCRIPT_LINE_SENTIMENTS:
+        return None, "Invalid sentiment value"
+    if 'engagement' in values and values['engagement'] not in TRANSCRIPT_LINE_ENGAGEMENTS:
+        return None, "Invalid engagement value"
+    return values, None
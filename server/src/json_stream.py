@@ -0,0 +1,206 @@
+import codecs
+import json
+import re
+
+# Functions in this file decode selected fields of large JSON documents while they download, without building the rest.
+# Like shared/payload_cache.py, the module only uses the standard library.
+
+# Size in characters beyond which an array or object that can't be decoded yet is entered rather than waited for
+DESCEND_CHARS = 64 * 1024
+
+# Characters a JSON number is made of
+NUMBER_CHARS = '+-.0123456789eE'
+
+# Matches the whitespace, commas and colons between the members of an array or object
+SEPARATORS = re.compile(r'[\s,:]*')
+
+# Matches the characters of a string up to the next quote or escape
+STRING_CHARS = re.compile(r'[^"\\]*')
+
+# Matches the separator and key before a field of an object, up to the first character of its value
+FIELD_HEADER = re.compile(r'\s*(,?)\s*("(?:[^"\\]|\\.)*")\s*:\s*(?=\S)', re.S)
+
+# Matches the end of an object
+OBJECT_END = re.compile(r'\s*}')
+
+class ObjectFieldParser:
+    """
+    Incremental parser for a JSON object that decodes only the named fields, in any order, as their values arrive.
+
+    The values of other fields are scanned for their end and discarded as they're read, so memory use is bounded by the chunk size and the largest selected value rather than by the whole document.
+
+    Args:
+        fields: The names of the top-level fields to decode, or None to decode every field.
+    """
+
+    def __init__(self, fields=None):
+        self.fields = None if fields is None else set(fields)
+        self.results = {}
+        self.buffer = ''
+        self.position = 0
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.state = 'start'
+        # Scanning state of the current value
+        self.key = None
+        self.value_start = None
+        self.containers = 0
+        self.in_string = False
+        self.json_decoder = json.JSONDecoder()
+
+    def feed(self, chunk):
+        """Parses the next chunk of the document, given as bytes or text."""
+        if isinstance(chunk, bytes):
+            chunk = self.decoder.decode(chunk)
+        self.buffer += chunk
+        while self.state != 'done' and self.step():
+            pass
+        self.discard_consumed()
+
+    def close(self):
+        """
+        Finishes parsing.
+
+        Returns:
+            A dictionary of the decoded fields that were present.
+
+        Raises:
+            ValueError: If the document ended before its object did.
+        """
+        self.feed(self.decoder.decode(b'', final=True))
+        if self.state != 'done':
+            raise ValueError("JSON document ended before its top-level object")
+        return self.results
+
+    def discard_consumed(self):
+        """Drops the text before the current position, keeping a selected value that's still being scanned."""
+        keep_from = self.position
+        if self.state == 'value' and self.value_start is not None:
+            keep_from = self.value_start
+        if keep_from:
+            self.buffer = self.buffer[keep_from:]
+            self.position -= keep_from
+            if self.value_start is not None:
+                self.value_start -= keep_from
+
+    def step(self):
+        """Advances past the next token or value. Returns False if more input is needed."""
+        if self.state == 'start':
+            stripped = self.buffer[self.position:].lstrip()
+            if not stripped:
+                self.position = len(self.buffer)
+                return False
+            if stripped[0] != '{':
+                raise ValueError("JSON document is not an object")
+            self.position = len(self.buffer) - len(stripped) + 1
+            self.state = 'field'
+            return True
+
+        if self.state == 'field':
+            end = OBJECT_END.match(self.buffer, self.position)
+            if end:
+                self.position = end.end()
+                self.state = 'done'
+                return True
+            header = FIELD_HEADER.match(self.buffer, self.position)
+            if not header:
+                return False
+            if bool(header.group(1)) != (self.key is not None):
+                # The first field has no comma before it and every later field does
+                raise ValueError("Malformed JSON object field")
+            self.key = json.loads(header.group(2))
+            self.position = header.end()
+            selected = self.fields is None or self.key in self.fields
+            self.value_start = self.position if selected else None
+            self.containers = 0
+            self.in_string = False
+            self.state = 'value'
+            return True
+
+        # Scan to the end of the current value
+        if not self.scan_value():
+            return False
+        if self.value_start is not None:
+            self.results[self.key] = json.loads(self.buffer[self.value_start:self.position])
+            self.value_start = None
+        self.state = 'field'
+        return True
+
+    def scan_value(self):
+        """
+        Moves the position to the end of the current value. Returns False if more input is needed.
+
+        Values are decoded whole where they fit in DESCEND_CHARS, which runs at the speed of the json module. Larger arrays and objects are entered instead and their members decoded one by one, and larger strings are scanned for their closing quote as they arrive, so a skipped value is never held in memory whole.
+        """
+        buffer = self.buffer
+        position = self.position
+        while True:
+            if self.in_string:
+                position = STRING_CHARS.match(buffer, position).end()
+                if position == len(buffer) or (buffer[position] == '\\' and position + 1 == len(buffer)):
+                    # Resume at the escape, if any, once the character after it arrives
+                    self.position = position
+                    return False
+                if buffer[position] == '\\':
+                    position += 2
+                    continue
+                self.in_string = False
+                position += 1
+                if not self.containers:
+                    self.position = position
+                    return True
+
+            if self.containers:
+                position = SEPARATORS.match(buffer, position).end()
+            if position == len(buffer):
+                self.position = position
+                return False
+
+            character = buffer[position]
+            if character in '}]':
+                if not self.containers:
+                    raise ValueError("Malformed JSON value")
+                self.containers -= 1
+                position += 1
+            else:
+                try:
+                    _, end = self.json_decoder.raw_decode(buffer, position)
+                    if character in NUMBER_CHARS and (end == len(buffer) or buffer[end] in NUMBER_CHARS):
+                        # The chunk may have cut the number short
+                        self.position = position
+                        return False
+                    position = end
+                except json.JSONDecodeError:
+                    if len(buffer) - position <= DESCEND_CHARS:
+                        # Most likely cut off by the end of the chunk, so wait for more
+                        self.position = position
+                        return False
+                    if character == '"':
+                        self.in_string = True
+                    elif character in '{[':
+                        self.containers += 1
+                    else:
+                        raise
+                    position += 1
+
+            if not self.containers and not self.in_string:
+                self.position = position
+                return True
+
+def extract_fields(chunks, fields=None):
+    """
+    Decodes the named top-level fields of a JSON object that arrives in chunks, such as a streamed response body.
+
+    Args:
+        chunks: An iterable of bytes or text.
+        fields: The names of the fields to decode, or None to decode every field.
+
+    Returns:
+        A dictionary of the decoded fields that were present.
+
+    Raises:
+        ValueError: If the document isn't a JSON object.
+    """
+    parser = ObjectFieldParser(fields)
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.close()
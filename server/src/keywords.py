@@ -0,0 +1,145 @@
+from collections import Counter
+import heapq
+import math
+from sqlalchemy import delete, event, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from threading import Lock
+import time
+
+from .constants import KEYWORD_COUNT, KEYWORD_DF_REFRESH_SECONDS, KEYWORD_MIN_LENGTH, STOP_WORDS
+from .database import db, Interview, TermDocumentFrequency
+from .apis.transcript import WORD_PATTERN
+
+# Term whose document_count holds the number of interviews in the corpus (WORD_PATTERN never matches it)
+CORPUS_TERM = ''
+
+# Key in Session.info of the document-frequency changes written in the session's transaction but not committed yet
+PENDING_DELTAS_KEY = 'document_frequency_deltas'
+
+class DocumentFrequencies:
+    """
+    In-memory copy of the document-frequency table, so weighting an interview's terms doesn't query the database.
+
+    The copy is updated with this process's own ingestions once they commit and reloaded every refresh_seconds to pick up the others'.
+    """
+
+    def __init__(self, refresh_seconds=KEYWORD_DF_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.counts = {}
+        self.loaded_at = None
+        self.lock = Lock()
+
+    def ensure_loaded(self):
+        """Loads the table if it hasn't been loaded yet or the copy is older than refresh_seconds."""
+        with self.lock:
+            if self.loaded_at is not None and time.monotonic() - self.loaded_at < self.refresh_seconds:
+                return
+        counts = dict(db.session.execute(select(TermDocumentFrequency.term, TermDocumentFrequency.document_count)).all())
+        with self.lock:
+            self.counts = counts
+            self.loaded_at = time.monotonic()
+
+    def apply(self, deltas):
+        """Adds a dictionary of per-term count changes to the in-memory copy."""
+        with self.lock:
+            for term, delta in deltas.items():
+                count = self.counts.get(term, 0) + delta
+                if count > 0:
+                    self.counts[term] = count
+                else:
+                    self.counts.pop(term, None)
+
+    def idf(self, terms, deltas=None):
+        """Gets the smoothed inverse document frequency of each term, counting the uncommitted changes in deltas as well."""
+        deltas = deltas or {}
+        with self.lock:
+            document_count = self.counts.get(CORPUS_TERM, 0) + deltas.get(CORPUS_TERM, 0)
+            return {term: math.log((document_count + 1) / (self.counts.get(term, 0) + deltas.get(term, 0) + 1)) + 1 for term in terms}
+
+    def invalidate(self):
+        """Forces the next lookup to reload the table."""
+        with self.lock:
+            self.loaded_at = None
+
+document_frequencies = DocumentFrequencies()
+
+@event.listens_for(Session, 'after_commit')
+def apply_committed_deltas(session):
+    """Adds the document-frequency changes of a committed transaction to the in-memory copy."""
+    deltas = session.info.pop(PENDING_DELTAS_KEY, None)
+    if deltas:
+        document_frequencies.apply(deltas)
+
+@event.listens_for(Session, 'after_rollback')
+def discard_rolled_back_deltas(session):
+    """Drops the document-frequency changes of a rolled back transaction, which never reached the table."""
+    session.info.pop(PENDING_DELTAS_KEY, None)
+
+def count_terms(texts, stop_words=STOP_WORDS, min_length=KEYWORD_MIN_LENGTH):
+    """Counts the candidate keyword terms in some texts, leaving out stop words and short words."""
+    terms = Counter()
+    for text in texts:
+        terms.update(word for word in WORD_PATTERN.findall((text or "").lower()) if len(word) >= min_length and word not in stop_words)
+    return terms
+
+def update_document_frequencies(interview_id, terms):
+    """
+    Records an interview's distinct terms in the document-frequency table, replacing the ones counted for it before. Does not commit.
+
+    Only the difference from the terms stored on the interview is written, so the cost depends on the interview's own text rather than the corpus.
+    """
+    interview = db.session.get(Interview, interview_id)
+    old_terms = set(interview.keyword_terms) if interview.keyword_terms is not None else None
+    new_terms = set(terms)
+
+    deltas = {term: 1 for term in new_terms - (old_terms or set())}
+    deltas.update({term: -1 for term in (old_terms or set()) - new_terms})
+    if old_terms is None:
+        deltas[CORPUS_TERM] = 1
+    interview.keyword_terms = sorted(new_terms)
+    if not deltas:
+        return
+
+    # Rows are written in term order so concurrent ingestions lock them in the same order
+    statement = insert(TermDocumentFrequency).values([{"term": term, "document_count": delta} for term, delta in sorted(deltas.items())])
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=['term'],
+        set_={"document_count": TermDocumentFrequency.document_count + statement.excluded.document_count}
+    ))
+    decremented_terms = sorted(term for term, delta in deltas.items() if delta < 0)
+    if decremented_terms:
+        db.session.execute(delete(TermDocumentFrequency).where(
+            TermDocumentFrequency.term.in_(decremented_terms),
+            TermDocumentFrequency.document_count <= 0
+        ))
+    # Applied to the in-memory copy by apply_committed_deltas, so a rollback leaves it unchanged
+    db.session.info.setdefault(PENDING_DELTAS_KEY, Counter()).update(deltas)
+
+def rank_keywords(term_counts, idf, count=KEYWORD_COUNT):
+    """Gets the terms with the highest TF-IDF weight, most relevant first, breaking ties alphabetically."""
+    total = sum(term_counts.values())
+    if not total:
+        return []
+    weights = ((term_count / total * idf[term], term) for term, term_count in term_counts.items())
+    return [term for _, term in heapq.nsmallest(count, weights, key=lambda weight: (-weight[0], weight[1]))]
+
+def extract_interview_keywords(interview_id, texts, count=KEYWORD_COUNT):
+    """
+    Extracts an interview's keywords from its transcript text with TF-IDF, and adds the text to the document frequencies. Does not commit.
+
+    Args:
+        interview_id: The interview's id.
+        texts: The text of each transcript line.
+        count: The number of keywords to return.
+
+    Returns:
+        The keywords, most relevant first. Empty if the text has no candidate terms, in which case the document frequencies aren't changed.
+    """
+    term_counts = count_terms(texts)
+    if not term_counts:
+        return []
+
+    document_frequencies.ensure_loaded()
+    update_document_frequencies(interview_id, term_counts)
+    return rank_keywords(term_counts, document_frequencies.idf(term_counts, db.session.info.get(PENDING_DELTAS_KEY)), count)
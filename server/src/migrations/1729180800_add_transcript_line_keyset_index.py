@@ -0,0 +1,26 @@
+"""Add transcript line keyset index
+
+Revision ID: 1729180800
+Revises: 1728761698
+Create Date: 2024-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1729180800'
+down_revision: Union[str, None] = '1728761698'
+branch_labels: Union[str, Sequence[str], None] = ()
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_transcript_lines_interview_start_id', 'transcript_lines', ['interview_id', 'start', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transcript_lines_interview_start_id', table_name='transcript_lines')
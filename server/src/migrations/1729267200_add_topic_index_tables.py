@@ -0,0 +1,51 @@
+"""Add topic index tables
+
+Revision ID: 1729267200
+Revises: 1729180800
+Create Date: 2024-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1729267200'
+down_revision: Union[str, None] = '1729180800'
+branch_labels: Union[str, Sequence[str], None] = ()
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('interview_topic',
+    sa.Column('topic', sa.String(), nullable=False),
+    sa.Column('interview_id', sa.Integer(), nullable=False),
+    sa.Column('role_id', sa.Integer(), nullable=True),
+    sa.Column('candidate_id', sa.Integer(), nullable=True),
+    sa.Column('weight', sa.Float(), nullable=False),
+    sa.Column('mentions', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['candidate_id'], ['candidate.candidate_id'], ),
+    sa.ForeignKeyConstraint(['interview_id'], ['interview.interview_id'], ),
+    sa.ForeignKeyConstraint(['role_id'], ['role.role_id'], ),
+    sa.PrimaryKeyConstraint('topic', 'interview_id')
+    )
+    op.create_index('ix_interview_topic_topic_weight', 'interview_topic', ['topic', 'weight'], unique=False)
+    op.create_index('ix_interview_topic_interview_id', 'interview_topic', ['interview_id'], unique=False)
+    op.create_table('topic_aggregate',
+    sa.Column('scope', sa.String(), nullable=False),
+    sa.Column('scope_id', sa.Integer(), nullable=False),
+    sa.Column('topic', sa.String(), nullable=False),
+    sa.Column('interview_count', sa.Integer(), nullable=False),
+    sa.Column('total_weight', sa.Float(), nullable=False),
+    sa.Column('total_mentions', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('scope', 'scope_id', 'topic')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('topic_aggregate')
+    op.drop_index('ix_interview_topic_interview_id', table_name='interview_topic')
+    op.drop_index('ix_interview_topic_topic_weight', table_name='interview_topic')
+    op.drop_table('interview_topic')
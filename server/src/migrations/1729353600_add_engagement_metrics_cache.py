@@ -0,0 +1,30 @@
+"""Add engagement metrics cache
+
+Revision ID: 1729353600
+Revises: 1729267200
+Create Date: 2024-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1729353600'
+down_revision: Union[str, None] = '1729267200'
+branch_labels: Union[str, Sequence[str], None] = ()
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('interview', sa.Column('transcript_version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('interview', sa.Column('engagement_metrics_cache', sa.JSON(), nullable=True))
+    op.add_column('interview', sa.Column('engagement_metrics_version', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('interview', 'engagement_metrics_version')
+    op.drop_column('interview', 'engagement_metrics_cache')
+    op.drop_column('interview', 'transcript_version')
@@ -0,0 +1,48 @@
+"""Add transcript edit log
+
+Revision ID: 1729440000
+Revises: 1729353600
+Create Date: 2024-10-20 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1729440000'
+down_revision: Union[str, None] = '1729353600'
+branch_labels: Union[str, Sequence[str], None] = ()
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('transcript_edit',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('interview_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('line_id', sa.Integer(), nullable=False),
+    sa.Column('op', sa.String(), nullable=False),
+    sa.Column('changes', sa.JSON(), nullable=True),
+    sa.Column('previous', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['interview_id'], ['interview.interview_id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_transcript_edit_interview_version', 'transcript_edit', ['interview_id', 'version'], unique=False)
+    op.create_table('transcript_checkpoint',
+    sa.Column('interview_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('lines', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['interview_id'], ['interview.interview_id'], ),
+    sa.PrimaryKeyConstraint('interview_id', 'version')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('transcript_checkpoint')
+    op.drop_index('ix_transcript_edit_interview_version', table_name='transcript_edit')
+    op.drop_table('transcript_edit')
@@ -0,0 +1,33 @@
+"""Add interview words
+
+Revision ID: 1729526400
+Revises: 1729440000
+Create Date: 2024-10-21 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1729526400'
+down_revision: Union[str, None] = '1729440000'
+branch_labels: Union[str, Sequence[str], None] = ()
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('interview_words',
+    sa.Column('interview_id', sa.Integer(), nullable=False),
+    sa.Column('word_count', sa.Integer(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('timings', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['interview_id'], ['interview.interview_id'], ),
+    sa.PrimaryKeyConstraint('interview_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('interview_words')
@@ -0,0 +1,32 @@
+"""Add term document frequency
+
+Revision ID: 1729612800
+Revises: 1729526400
+Create Date: 2024-10-22 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1729612800'
+down_revision: Union[str, None] = '1729526400'
+branch_labels: Union[str, Sequence[str], None] = ()
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('term_document_frequency',
+    sa.Column('term', sa.String(), nullable=False),
+    sa.Column('document_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('term')
+    )
+    op.add_column('interview', sa.Column('keyword_terms', sa.ARRAY(sa.String()), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('interview', 'keyword_terms')
+    op.drop_table('term_document_frequency')
@@ -0,0 +1,30 @@
+"""Add interview recall status
+
+Revision ID: 1729699200
+Revises: 1729612800
+Create Date: 2024-10-23 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1729699200'
+down_revision: Union[str, None] = '1729612800'
+branch_labels: Union[str, Sequence[str], None] = ()
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('interview', sa.Column('recall_status', sa.String(length=64), nullable=True))
+    op.add_column('interview', sa.Column('recall_status_at', sa.DateTime(), nullable=True))
+    op.add_column('interview', sa.Column('recall_state', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('interview', 'recall_state')
+    op.drop_column('interview', 'recall_status_at')
+    op.drop_column('interview', 'recall_status')
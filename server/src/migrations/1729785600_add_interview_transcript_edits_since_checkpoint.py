@@ -0,0 +1,26 @@
+"""Add interview transcript edits since checkpoint
+
+Revision ID: 1729785600
+Revises: 1729699200
+Create Date: 2024-10-24 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1729785600'
+down_revision: Union[str, None] = '1729699200'
+branch_labels: Union[str, Sequence[str], None] = ()
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('interview', sa.Column('transcript_edits_since_checkpoint', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('interview', 'transcript_edits_since_checkpoint')
@@ -0,0 +1,36 @@
+"""Add live speaker metrics
+
+Revision ID: 1729872000
+Revises: 1729785600
+Create Date: 2024-10-25 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1729872000'
+down_revision: Union[str, None] = '1729785600'
+branch_labels: Union[str, Sequence[str], None] = ()
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('live_speaker_metrics',
+    sa.Column('interview_id', sa.Integer(), nullable=False),
+    sa.Column('speaker', sa.String(), nullable=False),
+    sa.Column('line_count', sa.Integer(), nullable=False),
+    sa.Column('word_count', sa.Integer(), nullable=False),
+    sa.Column('talk_duration', sa.Integer(), nullable=False),
+    sa.Column('start', sa.Integer(), nullable=False),
+    sa.Column('end', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['interview_id'], ['interview.interview_id'], ),
+    sa.PrimaryKeyConstraint('interview_id', 'speaker')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('live_speaker_metrics')
@@ -0,0 +1,35 @@
+"""Drop transcript checkpoint
+
+Revision ID: 1729958400
+Revises: 1729872000
+Create Date: 2024-10-26 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1729958400'
+down_revision: Union[str, None] = '1729872000'
+branch_labels: Union[str, Sequence[str], None] = ()
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_column('interview', 'transcript_edits_since_checkpoint')
+    op.drop_table('transcript_checkpoint')
+
+
+def downgrade() -> None:
+    op.create_table('transcript_checkpoint',
+    sa.Column('interview_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('lines', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['interview_id'], ['interview.interview_id'], ),
+    sa.PrimaryKeyConstraint('interview_id', 'version')
+    )
+    op.add_column('interview', sa.Column('transcript_edits_since_checkpoint', sa.Integer(), nullable=True))
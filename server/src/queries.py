@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta
+from sqlalchemy import select, tuple_
 
 from .constants import MATCH_THRESHOLD, METRIC_HISTORY_DAYS_TO_AVERAGE, INTERVIEW_PACE_DAYS_TO_AVERAGE, INTERVIEW_PACE_CHANGE_DAYS_TO_AVERAGE
 from .database import db, Application, Role, MetricHistory, Interview, Account, TranscriptLine, interview_interviewer_speaking_table
@@ -202,5 +203,45 @@ def get_account_interviews(account_id, interviewer=True):
 
     return interview_data
 
+def get_transcript_lines_query(interview_id, start_ms=None, end_ms=None, speaker=None, after=None):
+    """
+    Builds a query for an interview's transcript lines in (start, id) order.
+
+    Args:
+        interview_id: The interview's id.
+        start_ms: If set, only lines that end after this time (in milliseconds) are included.
+        end_ms: If set, only lines that start before this time (in milliseconds) are included.
+        speaker: If set, only lines from this speaker are included.
+        after: A (start, id) tuple. If set, only lines after this position are included, for keyset pagination.
+
+    Returns:
+        An unexecuted query, so callers can page, stream or load all of it.
+    """
+    query = TranscriptLine.query.filter_by(interview_id=interview_id)
+    if start_ms is not None:
+        query = query.filter(TranscriptLine.end > start_ms)
+    if end_ms is not None:
+        query = query.filter(TranscriptLine.start < end_ms)
+    if speaker is not None:
+        query = query.filter(TranscriptLine.speaker == speaker)
+    if after is not None:
+        query = query.filter(tuple_(TranscriptLine.start, TranscriptLine.id) > tuple_(*after))
+    return query.order_by(TranscriptLine.start, TranscriptLine.id)
+
 def get_transcript_lines_in_order(interview_id):
-    return TranscriptLine.query.filter_by(interview_id=interview_id).order_by(TranscriptLine.start).all()
\ No newline at end of file
+    return get_transcript_lines_query(interview_id).all()
+
+# Columns read by the transcript metric functions
+TRANSCRIPT_ANALYTICS_COLUMNS = (TranscriptLine.start, TranscriptLine.end, TranscriptLine.speaker, TranscriptLine.text, TranscriptLine.sentiment)
+
+def get_transcript_analytics_lines(interview_id):
+    """
+    Loads only the columns the transcript metrics read for an interview's lines, in (start, id) order.
+
+    The result is a list of read-only rows with attribute access (line.start, line.speaker, ...) instead of TranscriptLine objects, so large transcripts skip the identity map and change tracking. Use get_transcript_lines_in_order when the lines will be modified.
+    """
+    return db.session.execute(
+        select(*TRANSCRIPT_ANALYTICS_COLUMNS)
+        .where(TranscriptLine.interview_id == interview_id)
+        .order_by(TranscriptLine.start, TranscriptLine.id)
+    ).all()
\ No newline at end of file
@@ -0,0 +1,194 @@
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import click
+import json
+import os
+from sqlalchemy import func, select, update
+import time
+
+from .app import app
+from .constants import RECOMPUTE_CHUNK_SIZE, RECOMPUTE_WORKER_COUNT
+from .database import db, Interview, TranscriptLine
+from .queries import TRANSCRIPT_ANALYTICS_COLUMNS
+from .apis.transcript import compute_interview_metrics, diff_transcript_line, log_transcript_edits
+from .sentiment import label_sentiments
+
+# A transcript line as sent to a worker process, holding only the columns the metrics read
+MetricsLine = namedtuple('MetricsLine', ['start', 'end', 'speaker', 'text', 'sentiment'])
+
+def iterate_interview_id_chunks(filters, after_id, chunk_size):
+    """Yields lists of interview ids matching filters in ascending order, one page at a time, starting after after_id."""
+    while True:
+        interview_ids = db.session.scalars(
+            select(Interview.interview_id)
+            .where(*filters, Interview.interview_id > after_id)
+            .order_by(Interview.interview_id)
+            .limit(chunk_size)
+        ).all()
+        if not interview_ids:
+            return
+        yield interview_ids
+        after_id = interview_ids[-1]
+
+def load_metrics_lines(interview_ids):
+    """Loads the transcript lines of several interviews in one query, as a list of (interview_id, lines) tuples."""
+    lines_by_interview = {interview_id: [] for interview_id in interview_ids}
+    rows = db.session.execute(
+        select(TranscriptLine.interview_id, *TRANSCRIPT_ANALYTICS_COLUMNS)
+        .where(TranscriptLine.interview_id.in_(interview_ids))
+        .order_by(TranscriptLine.interview_id, TranscriptLine.start, TranscriptLine.id)
+    )
+    for row in rows:
+        lines_by_interview[row.interview_id].append(MetricsLine(*row[1:]))
+    return list(lines_by_interview.items())
+
+def compute_metrics_chunk(chunk):
+    """Calculates the metrics for a chunk of interviews. Runs in a worker process, so it doesn't use the database."""
+    return [(interview_id, compute_interview_metrics(lines)) for interview_id, lines in chunk]
+
+def recompute_interview_metrics(filters=(), after_id=0, workers=RECOMPUTE_WORKER_COUNT, chunk_size=RECOMPUTE_CHUNK_SIZE, on_chunk=None):
+    """
+    Recalculates the stored metrics of every interview matching filters.
+
+    Interview ids are read in pages, the transcript lines for each page are loaded in one query, and the metrics are calculated on a pool of worker processes. Results are written back with one batched UPDATE per chunk, in id order, so a run that stops part way can be resumed from the last id passed to on_chunk. Interviews without transcript lines are left unchanged.
+
+    Args:
+        filters: SQLAlchemy conditions on Interview limiting which interviews are recomputed.
+        after_id: Only interviews with a larger id are recomputed.
+        workers: The number of worker processes. With 1, the metrics are calculated on a single background thread instead.
+        chunk_size: The number of interviews loaded, calculated and written together.
+        on_chunk: Optional callback, called with the last interview id and the number of interviews after each chunk is committed.
+
+    Returns:
+        The number of interviews whose metrics were updated.
+    """
+    updated = 0
+    pending = deque()
+
+    def finish_oldest_chunk():
+        nonlocal updated
+        last_id, count, future = pending.popleft()
+        results = [{"interview_id": interview_id, **metrics} for interview_id, metrics in future.result() if metrics is not None]
+        if results:
+            db.session.execute(update(Interview), results)
+        db.session.commit()
+        updated += len(results)
+        if on_chunk:
+            on_chunk(last_id, count)
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else ThreadPoolExecutor(max_workers=1)
+    with executor:
+        for interview_ids in iterate_interview_id_chunks(filters, after_id, chunk_size):
+            pending.append((interview_ids[-1], len(interview_ids), executor.submit(compute_metrics_chunk, load_metrics_lines(interview_ids))))
+            # Keep every worker busy without loading the whole table into memory
+            if len(pending) > workers * 2:
+                finish_oldest_chunk()
+        while pending:
+            finish_oldest_chunk()
+
+    return updated
+
+def read_checkpoint(path):
+    """Gets the last interview id recorded in a checkpoint file, or None if the file doesn't exist."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)["last_interview_id"]
+
+def write_checkpoint(path, last_interview_id):
+    """Records the last recomputed interview id, replacing the file atomically so an interrupted write can't corrupt it."""
+    temporary_path = path + ".tmp"
+    with open(temporary_path, 'w') as f:
+        json.dump({"last_interview_id": last_interview_id}, f)
+    os.replace(temporary_path, path)
+
+@app.cli.command('recompute-metrics')
+@click.option('--workers', default=RECOMPUTE_WORKER_COUNT, show_default=True, help='Number of worker processes.')
+@click.option('--chunk-size', default=RECOMPUTE_CHUNK_SIZE, show_default=True, help='Number of interviews calculated and written together.')
+@click.option('--candidate-id', type=int, help='Only recompute interviews with this candidate.')
+@click.option('--since', type=click.DateTime(), help='Only recompute interviews at or after this time.')
+@click.option('--until', type=click.DateTime(), help='Only recompute interviews before this time.')
+@click.option('--missing-only', is_flag=True, help='Only recompute interviews without stored metrics.')
+@click.option('--after-id', type=int, default=0, help='Only recompute interviews with a larger id.')
+@click.option('--checkpoint', type=click.Path(dir_okay=False), help='File to record progress in. If it exists, the run resumes from it.')
+def recompute_metrics_command(workers, chunk_size, candidate_id, since, until, missing_only, after_id, checkpoint):
+    """Recalculates the stored metrics of existing interviews from their transcripts."""
+    filters = []
+    if candidate_id is not None:
+        filters.append(Interview.candidate_id == candidate_id)
+    if since is not None:
+        filters.append(Interview.interview_time >= since)
+    if until is not None:
+        filters.append(Interview.interview_time < until)
+    if missing_only:
+        filters.append(Interview.engagement_json.is_(None))
+
+    resume_id = read_checkpoint(checkpoint)
+    if resume_id is not None:
+        after_id = max(after_id, resume_id)
+        click.echo(f"Resuming after interview {after_id}")
+
+    total = db.session.scalar(select(func.count(Interview.interview_id)).where(*filters, Interview.interview_id > after_id))
+    done = 0
+    start_time = time.monotonic()
+
+    def report_progress(last_id, count):
+        nonlocal done
+        done += count
+        if checkpoint:
+            write_checkpoint(checkpoint, last_id)
+        rate = done / max(time.monotonic() - start_time, 1e-9)
+        click.echo(f"Recomputed {done}/{total} interviews ({rate:.0f}/s), last id {last_id}")
+
+    updated = recompute_interview_metrics(filters, after_id, workers, chunk_size, report_progress)
+
+    if checkpoint and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    click.echo(f"Updated metrics for {updated} interviews")
+
+def rescore_interview_sentiments(interview_ids, overwrite=False):
+    """
+    Labels the transcript lines of several interviews with the local sentiment scorer and logs the changes as transcript edits. Does not commit.
+
+    Args:
+        interview_ids: The interviews to rescore.
+        overwrite: Whether to replace sentiments from the transcription provider too, rather than only filling missing ones.
+
+    Returns:
+        The number of lines whose sentiment changed.
+    """
+    query = select(TranscriptLine.interview_id, TranscriptLine.id, TranscriptLine.text, TranscriptLine.sentiment).where(TranscriptLine.interview_id.in_(interview_ids))
+    if not overwrite:
+        query = query.where((TranscriptLine.sentiment.is_(None)) | (TranscriptLine.sentiment == ''))
+    rows = db.session.execute(query.order_by(TranscriptLine.interview_id, TranscriptLine.id)).all()
+
+    # Score every line in the chunk in one batch, then keep only the ones that changed
+    changes_by_interview = {}
+    for row, label in zip(rows, label_sentiments(row.text for row in rows)):
+        if label != row.sentiment:
+            changes_by_interview.setdefault(row.interview_id, []).append((row.id, row.sentiment, label))
+
+    changed = 0
+    for interview_id, changes in changes_by_interview.items():
+        db.session.execute(update(TranscriptLine), [{"id": line_id, "sentiment": label} for line_id, _, label in changes])
+        log_transcript_edits(interview_id, [
+            diff_transcript_line(line_id, {"sentiment": old_label}, {"sentiment": label}) for line_id, old_label, label in changes
+        ])
+        changed += len(changes)
+    return changed
+
+@app.cli.command('rescore-sentiment')
+@click.option('--chunk-size', default=RECOMPUTE_CHUNK_SIZE, show_default=True, help='Number of interviews rescored and committed together.')
+@click.option('--candidate-id', type=int, help='Only rescore interviews with this candidate.')
+@click.option('--overwrite', is_flag=True, help='Replace sentiments from the transcription provider too, instead of only filling missing ones.')
+@click.option('--after-id', type=int, default=0, help='Only rescore interviews with a larger id.')
+def rescore_sentiment_command(chunk_size, candidate_id, overwrite, after_id):
+    """Labels the sentiment of existing transcript lines with the local scorer. Run recompute-metrics afterwards to update interview scores."""
+    filters = [Interview.candidate_id == candidate_id] if candidate_id is not None else []
+    changed = 0
+    start_time = time.monotonic()
+    for interview_ids in iterate_interview_id_chunks(filters, after_id, chunk_size):
+        changed += rescore_interview_sentiments(interview_ids, overwrite)
+        db.session.commit()
+        click.echo(f"Rescored {changed} lines ({changed / max(time.monotonic() - start_time, 1e-9):.0f}/s), last id {interview_ids[-1]}")
+    click.echo(f"Updated sentiment for {changed} lines")
@@ -1,3 +1,3 @@
 from flask_cors import CORS
 
-from ..apis import analysis, greenhouse, preprocess, recall, transcript
\ No newline at end of file
+from ..apis import analysis, bot_status, greenhouse, preprocess, realtime, recall, timeline, topics, transcript, transcript_history, words
\ No newline at end of file
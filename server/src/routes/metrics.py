@@ -0,0 +1,15 @@
+from flask import jsonify
+
+from .auth import sessions
+
+from ..app import app
+from ..utils import handle_auth_token, get_http_client, valid_token_response
+
+@app.route('/api/metrics/http', methods=['GET'])
+def get_http_metrics():
+    """Gets the latency metrics of outbound requests by integration, and the circuit breaker state of each external host."""
+    current_user_id = handle_auth_token(sessions)
+    if current_user_id is None:
+        return valid_token_response(False)
+
+    return jsonify(get_http_client().metrics_snapshot()), 200
@@ -9,10 +9,10 @@ import time
 from .auth import sessions
 
 from ..app import app 
-from ..constants import DEBUG_OKTA
+from ..constants import DEBUG_OKTA, OKTA_ISSUER
 from ..database import Account, db
 from ..synthetic_data import generate_synthetic_data_on_account_creation
-from ..utils import get_random_string
+from ..utils import get_random_string, get_http_client
 
 isAccepted = False
 
@@ -24,7 +24,6 @@ pending_requests_lock = Lock()
 # TODO: Set this information in environment variables (client id is set in the front end as well)
 OKTA_CLIENT_ID = '0oaitt4y79BThLYvY5d7'
 OKTA_CLIENT_SECRET = '6Mw9w_N7FIYvvsntXy1shnSKHexnEBZMNyiGqC9XF53Hzq6win2cIdKBGamxG_cm'
-OKTA_ISSUER = 'https://dev-05459793.okta.com/oauth2'
 OKTA_REDIRECT_URI = 'http://localhost:5000/okta'
 
 # TODO: Refactor account creation via okta to use a shared function with regular account creation and remove repeated code
@@ -47,7 +46,7 @@ def process_okta():
             'client_id': OKTA_CLIENT_ID,
             'client_secret': OKTA_CLIENT_SECRET
         }
-        token_response = requests.post(token_url, data=token_payload)
+        token_response = get_http_client().post(token_url, 'okta', data=token_payload)
         tokens = token_response.json()
 
         if "access_token" not in tokens:
@@ -56,7 +55,7 @@ def process_okta():
         # Get user info
         userinfo_url = f"{OKTA_ISSUER}/default/v1/userinfo"
         userinfo_headers = {'Authorization': f"Bearer {tokens['access_token']}"}
-        userinfo_response = requests.get(userinfo_url, headers=userinfo_headers)
+        userinfo_response = get_http_client().get(userinfo_url, 'okta', headers=userinfo_headers)
         userinfo = userinfo_response.json()
 
         email = userinfo.get('email')
@@ -4,7 +4,6 @@ import io
 import json
 import os
 from pdfminer.high_level import extract_text
-import requests
 import time
 import random
 import re
@@ -14,7 +13,7 @@ from .auth import sessions
 from ..app import app 
 from ..database import Account, db, Organization, Role, Skill
 from ..input_validation import validate_field_onboarding
-from ..utils import handle_auth_token, upload_file
+from ..utils import handle_auth_token, get_http_client, upload_file
 
 @app.route('/api/onboarding', methods=['POST'])
 def onboarding():
@@ -228,7 +227,7 @@ def process_files():
         # Process job description URL
         job_description_url = data.get('jobDescriptionUrl')
         if job_description_url:
-            response = requests.get(job_description_url)
+            response = get_http_client().get(job_description_url, 'documents')
             if response.status_code == 200:
                 pdf_content = io.BytesIO(response.content)
                 extracted_data.update(extract_data_from_pdf(pdf_content, skills))
@@ -236,7 +235,7 @@ def process_files():
         # Process hiring document URL
         hiring_document_url = data.get('hiringDocumentUrl')
         if hiring_document_url:
-            response = requests.get(hiring_document_url)
+            response = get_http_client().get(hiring_document_url, 'documents')
             if response.status_code == 200:
                 pdf_content = io.BytesIO(response.content)
                 hiring_data = extract_data_from_pdf(pdf_content, skills)
@@ -0,0 +1,108 @@
+import math
+import re
+
+from .constants import SENTIMENT_LABEL_THRESHOLD
+
+# Functions in this file score sentiment locally, for transcript lines the transcription provider didn't label.
+
+# Valence of sentiment-bearing words, from -3 (most negative) to 3 (most positive)
+SENTIMENT_LEXICON = {
+    # Positive
+    'good': 1.9, 'great': 3.0, 'excellent': 3.0, 'amazing': 2.8, 'awesome': 3.0, 'fantastic': 2.9, 'wonderful': 2.7,
+    'nice': 1.8, 'love': 3.0, 'loved': 2.9, 'liked': 1.8, 'enjoy': 2.2, 'enjoyed': 2.3, 'happy': 2.7,
+    'glad': 2.0, 'excited': 2.2, 'exciting': 2.2, 'interesting': 1.7, 'interested': 1.7, 'passionate': 2.1,
+    'thanks': 1.9, 'thank': 1.5, 'appreciate': 2.0, 'appreciated': 2.1, 'helpful': 1.8, 'successful': 2.4,
+    'success': 2.7, 'succeeded': 2.2, 'achieve': 1.8, 'achieved': 2.0, 'accomplished': 2.1, 'improve': 1.6,
+    'improved': 2.0, 'strong': 1.6, 'confident': 2.2, 'comfortable': 1.5, 'perfect': 2.7, 'best': 3.0,
+    'better': 1.9, 'easy': 1.9, 'fun': 2.3, 'impressive': 2.3, 'impressed': 2.2, 'proud': 2.1, 'solid': 1.3,
+    'effective': 1.9, 'efficient': 1.8, 'productive': 1.7, 'reliable': 1.6, 'motivated': 1.8, 'agree': 1.5,
+    'yes': 1.2, 'sure': 1.3, 'absolutely': 1.4, 'definitely': 1.2, 'fit': 1.0, 'opportunity': 1.6, 'win': 2.8,
+    'won': 2.7, 'growth': 1.6, 'learned': 1.3, 'learning': 1.3, 'collaborative': 1.7, 'supportive': 2.1,
+    # Negative
+    'bad': -2.5, 'terrible': -3.0, 'awful': -3.0, 'horrible': -3.0, 'poor': -2.1, 'worse': -2.1, 'worst': -3.0,
+    'hate': -2.7, 'hated': -3.0, 'dislike': -1.6, 'disliked': -1.7, 'unhappy': -1.8, 'sad': -2.1, 'angry': -2.3,
+    'frustrated': -2.4, 'frustrating': -2.2, 'annoying': -1.9, 'annoyed': -1.9, 'difficult': -1.5, 'hard': -0.4,
+    'problem': -1.7, 'problems': -1.7, 'issue': -1.1, 'issues': -1.1, 'fail': -2.5, 'failed': -2.3, 'failure': -2.3,
+    'mistake': -1.8, 'mistakes': -1.8, 'wrong': -2.1, 'struggle': -2.0, 'struggled': -2.0, 'stress': -1.8,
+    'stressful': -1.9, 'stressed': -1.9, 'worried': -1.8, 'worry': -1.9, 'concern': -1.2, 'concerned': -1.3,
+    'confused': -1.3, 'confusing': -1.4, 'boring': -1.3, 'bored': -1.1, 'disappointed': -1.9, 'disappointing': -2.2,
+    'unfortunately': -1.6, 'sorry': -0.3, 'lost': -1.3, 'lose': -1.7, 'quit': -1.0, 'fired': -2.6,
+    'conflict': -1.3, 'toxic': -2.4, 'weak': -1.9, 'slow': -0.8, 'tired': -1.6, 'uncomfortable': -1.6, 'unclear': -1.0,
+    'impossible': -1.3, 'rejected': -2.0, 'broke': -1.4, 'broken': -1.6, 'crisis': -3.0, 'blame': -1.4,
+}
+
+# Words that flip the valence of the words after them
+NEGATIONS = frozenset(['not', 'no', 'never', 'neither', 'nor', 'none', 'nothing', 'nobody', 'cannot', 'without', 'hardly', 'barely'])
+
+# Number of words after a negation whose valence is flipped
+NEGATION_SCOPE = 3
+
+# Factor applied to the valence of a negated word ("not good" is less negative than "bad")
+NEGATION_FACTOR = -0.74
+
+# Words that strengthen or weaken the word after them, and by how much
+INTENSIFIERS = {
+    'very': 1.3, 'really': 1.3, 'extremely': 1.5, 'incredibly': 1.5, 'super': 1.3, 'so': 1.2, 'totally': 1.3,
+    'quite': 1.1, 'pretty': 1.1, 'somewhat': 0.8, 'slightly': 0.7, 'kind': 0.8, 'little': 0.8
+}
+
+# Smoothing constant used to map summed valences into (-1, 1)
+NORMALIZATION_ALPHA = 15
+
+# Matches a token in lowercased text, keeping contractions like "don't" whole
+TOKEN_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+def score_sentiment(text, lexicon=SENTIMENT_LEXICON, negations=NEGATIONS, intensifiers=INTENSIFIERS):
+    """
+    Scores the sentiment of a piece of text.
+
+    Returns:
+        A compound score between -1 (most negative) and 1 (most positive).
+    """
+    total = 0.0
+    negated_until = -1
+    boost = 1.0
+    for index, token in enumerate(TOKEN_PATTERN.findall(text.lower())):
+        if token in negations or token.endswith("n't"):
+            negated_until = index + NEGATION_SCOPE
+            continue
+        if token in intensifiers:
+            boost = intensifiers[token]
+            continue
+
+        valence = lexicon.get(token)
+        if valence is not None:
+            valence *= boost
+            if index <= negated_until:
+                valence *= NEGATION_FACTOR
+            total += valence
+        boost = 1.0
+
+    return total / math.sqrt(total * total + NORMALIZATION_ALPHA) if total else 0.0
+
+def label_sentiment(score, threshold=SENTIMENT_LABEL_THRESHOLD):
+    """Converts a compound score into the POSITIVE, NEUTRAL or NEGATIVE labels used by the transcription provider."""
+    if score >= threshold:
+        return 'POSITIVE'
+    if score <= -threshold:
+        return 'NEGATIVE'
+    return 'NEUTRAL'
+
+def label_sentiments(texts):
+    """Labels a batch of texts, such as every line of an interview, in one pass."""
+    return [label_sentiment(score_sentiment(text or "")) for text in texts]
+
+def fill_missing_sentiments(lines):
+    """
+    Labels the lines that have no sentiment, in one batch.
+
+    Args:
+        lines: Dictionaries with text and (optionally) sentiment, such as the output of match_transcript_lines. Updated in place.
+
+    Returns:
+        The number of lines that were labelled.
+    """
+    missing = [line for line in lines if not line.get("sentiment")]
+    for line, label in zip(missing, label_sentiments(line.get("text") for line in missing)):
+        line["sentiment"] = label
+    return len(missing)
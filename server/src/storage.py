@@ -0,0 +1,199 @@
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import BotoCoreError, ClientError
+from contextlib import contextmanager
+import json
+import os
+import shutil
+import tempfile
+from threading import Lock
+from urllib.parse import unquote, urlparse
+
+from .constants import AWS_CREDENTIAL_FILEPATH, S3_ENDPOINT_URL, S3_MULTIPART_CHUNK_BYTES, S3_MULTIPART_CONCURRENCY, STORAGE_BACKEND, STORAGE_LOCAL_ROOT, STORAGE_S3_BUCKET
+
+# Functions in this file store uploaded documents and media, in S3 or in a directory on this machine, selected by STORAGE_BACKEND.
+# Both backends take the same keys and return URLs for what they store, so callers don't depend on where files are kept.
+
+class StorageError(Exception):
+    """Raised when a storage backend can't read or write a file."""
+
+@contextmanager
+def translate_errors(*error_types):
+    """Re-raises the given backend-specific errors as StorageError."""
+    try:
+        yield
+    except error_types as e:
+        raise StorageError(str(e)) from e
+
+class S3Storage:
+    """
+    Stores files in an S3 bucket, as s3://<bucket>/<key> URLs.
+
+    Uploads and copies are multipart above S3_MULTIPART_CHUNK_BYTES, so memory use stays bounded by the chunk size times S3_MULTIPART_CONCURRENCY.
+
+    Args:
+        bucket: The bucket to store files in.
+        client: Optional boto3 S3 client. By default one is created on first use from the AWS credentials file, so importing this module doesn't need credentials.
+    """
+
+    scheme = 's3'
+
+    def __init__(self, bucket, client=None):
+        self.bucket = bucket
+        self._client = client
+        self.lock = Lock()
+        self.transfer_config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_CHUNK_BYTES,
+            multipart_chunksize=S3_MULTIPART_CHUNK_BYTES,
+            max_concurrency=S3_MULTIPART_CONCURRENCY
+        )
+
+    @property
+    def client(self):
+        with self.lock:
+            if self._client is None:
+                with open(AWS_CREDENTIAL_FILEPATH) as f:
+                    aws_credentials = json.load(f)
+                self._client = boto3.client('s3', aws_access_key_id=aws_credentials['aws_access_key_id'], aws_secret_access_key=aws_credentials['aws_secret_access_key'], endpoint_url=S3_ENDPOINT_URL)
+            return self._client
+
+    def url(self, key):
+        return f's3://{self.bucket}/{key}'
+
+    def owns(self, url):
+        """Returns whether url points into this backend, so it can be read or copied from without downloading it."""
+        return urlparse(url).scheme == self.scheme
+
+    def put(self, key, content):
+        """
+        Stores a file.
+
+        Args:
+            key: The key to store it under.
+            content: The file's bytes, or a readable binary file object, which is streamed into a multipart upload.
+
+        Returns:
+            The file's URL.
+        """
+        with translate_errors(BotoCoreError, ClientError):
+            if isinstance(content, (bytes, bytearray, str)):
+                self.client.put_object(Bucket=self.bucket, Key=key, Body=content)
+            else:
+                self.client.upload_fileobj(content, self.bucket, key, Config=self.transfer_config)
+        return self.url(key)
+
+    def copy(self, source_url, key):
+        """Copies a file this backend owns to key server-side, using part copies above the multipart threshold. Returns the new URL."""
+        parsed_url = urlparse(source_url)
+        copy_source = {'Bucket': parsed_url.netloc, 'Key': parsed_url.path.lstrip('/')}
+        with translate_errors(BotoCoreError, ClientError):
+            self.client.copy(copy_source, self.bucket, key, Config=self.transfer_config)
+        return self.url(key)
+
+    def open(self, key):
+        """Opens a stored file for streaming reads. The caller closes it."""
+        with translate_errors(BotoCoreError, ClientError):
+            return self.client.get_object(Bucket=self.bucket, Key=key)['Body']
+
+    def read_range(self, key, start, end):
+        """Reads bytes start to end (exclusive) of a stored file without downloading the rest."""
+        with translate_errors(BotoCoreError, ClientError):
+            return self.client.get_object(Bucket=self.bucket, Key=key, Range=f'bytes={start}-{end - 1}')['Body'].read()
+
+    def size(self, key):
+        with translate_errors(BotoCoreError, ClientError):
+            return self.client.head_object(Bucket=self.bucket, Key=key)['ContentLength']
+
+class LocalStorage:
+    """
+    Stores files in a directory on this machine, as file:// URLs, for development, tests and deployments without S3.
+
+    Writes go through a temporary file and a rename, so readers never see a partial file.
+
+    Args:
+        root: The directory to store files in. Created on first write.
+    """
+
+    scheme = 'file'
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+
+    def path(self, key):
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise StorageError(f"Invalid storage key: {key}")
+        return path
+
+    def url(self, key):
+        return 'file://' + self.path(key)
+
+    def owns(self, url):
+        """Returns whether url points into this backend, so it can be read or copied from without downloading it."""
+        parsed_url = urlparse(url)
+        return parsed_url.scheme == self.scheme and os.path.normpath(unquote(parsed_url.path)).startswith(self.root + os.sep)
+
+    def put(self, key, content):
+        """
+        Stores a file.
+
+        Args:
+            key: The key to store it under.
+            content: The file's bytes, or a readable binary file object, which is copied in chunks.
+
+        Returns:
+            The file's URL.
+        """
+        path = self.path(key)
+        with translate_errors(OSError):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Named uniquely, since the analysis workers can write the same key at once
+            f = tempfile.NamedTemporaryFile(dir=os.path.dirname(path), suffix='.tmp', delete=False)
+            temporary_path = f.name
+            try:
+                with f:
+                    if isinstance(content, str):
+                        content = content.encode('utf-8')
+                    if isinstance(content, (bytes, bytearray)):
+                        f.write(content)
+                    else:
+                        shutil.copyfileobj(content, f)
+                os.replace(temporary_path, path)
+            except BaseException:
+                # Don't leave partial files behind when the source or the disk fails
+                if os.path.exists(temporary_path):
+                    os.remove(temporary_path)
+                raise
+        return self.url(key)
+
+    def copy(self, source_url, key):
+        """Copies a file this backend owns to key, letting the kernel copy the data where it can. Returns the new URL."""
+        path = self.path(key)
+        with translate_errors(OSError):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copyfile(unquote(urlparse(source_url).path), path)
+        return self.url(key)
+
+    def open(self, key):
+        """Opens a stored file for streaming reads. The caller closes it."""
+        with translate_errors(OSError):
+            return open(self.path(key), 'rb')
+
+    def read_range(self, key, start, end):
+        """Reads bytes start to end (exclusive) of a stored file, without reading the rest of it."""
+        with translate_errors(OSError):
+            with open(self.path(key), 'rb') as f:
+                f.seek(start)
+                return f.read(max(end - start, 0))
+
+    def size(self, key):
+        with translate_errors(OSError):
+            return os.path.getsize(self.path(key))
+
+def create_storage(backend=STORAGE_BACKEND):
+    """Creates the storage backend named by backend: 's3' or 'local'."""
+    if backend == 's3':
+        return S3Storage(STORAGE_S3_BUCKET)
+    if backend == 'local':
+        return LocalStorage(STORAGE_LOCAL_ROOT)
+    raise ValueError(f"Unknown storage backend: {backend}")
@@ -1,6 +1,6 @@
 from faker import Faker
 from .database import Account, Role, Application, Candidate, Interview, Skill, MetricHistory, Organization, db, interview_skill_score_table, interview_interviewer_speaking_table
-from .utils import get_random_time, get_random_date
+from .utils import get_random_time, get_random_date, get_storage
 from .queries import fitting_job_applications_percentage
 from os import environ
 from .app import app as app
@@ -246,8 +246,8 @@ def generate_interview_data(num_records, applications, interviewers, candidates,
             application = data_generator.random_element(applications)
             interview_time = data_generator.date_time_between(start_date='-1y', end_date='+2m')
         if interview_time < datetime.now() and n % int(100 / SYNTHETIC_INTERVIEW_PROCESSING_PERCENTAGE) == 0:
-            audio_url = 's3://voxai-test-audio-video/file_example_MP3_700KB.mp3'
-            video_url = 's3://voxai-test-audio-video/file_example_MP4_480_1_5MG.mp4'
+            audio_url = get_storage().url('file_example_MP3_700KB.mp3')
+            video_url = get_storage().url('file_example_MP4_480_1_5MG.mp4')
         else:
             audio_url = data_generator.url()
             video_url = data_generator.url()
@@ -277,7 +277,7 @@ def generate_interview_data(num_records, applications, interviewers, candidates,
     # Preprocess audio and video, then get sentiment and engagement if interview time is in the past
     if ENABLE_SYNTHETIC_PREPROCESSING:
         for interview in interviews:
-            if "s3://" not in interview.audio_url and "s3://" not in interview.video_url:
+            if not get_storage().owns(interview.audio_url) and not get_storage().owns(interview.video_url):
                 continue
             if interview.interview_time < datetime.now():
                 preprocess_audio = bool(interview.audio_url)
@@ -291,7 +291,7 @@ def generate_interview_data(num_records, applications, interviewers, candidates,
     # Get sentiment and engagement if the interview time is in the past
     if ENABLE_SYNTHETIC_SENTIMENT or ENABLE_SYNTHETIC_ENGAGEMENT:
         for interview in interviews:
-            if "s3://" not in interview.audio_url and "s3://" not in interview.video_url:
+            if not get_storage().owns(interview.audio_url) and not get_storage().owns(interview.video_url):
                 continue
             if ENABLE_SYNTHETIC_PREPROCESSING:
                 audio_url = interview.audio_url_preprocessed 
@@ -1,5 +1,5 @@
-import boto3
-from botocore.exceptions import BotoCoreError, ClientError
+from collections import OrderedDict
+from contextlib import closing
 from datetime import date, timedelta
 from flask import jsonify, make_response, request
 import json
@@ -7,14 +7,46 @@ from os import environ
 import random
 import requests
 import string
+from threading import Lock
+import urllib3
 from urllib.parse import urlparse
 
-from .constants import RECALL_CREDENTIAL_FILEPATH, AWS_CREDENTIAL_FILEPATH, DEBUG_RECALL_INTELLIGENCE, DEBUG_RECALL_RECORDING_RETRIEVAL, DEBUG_SESSIONS
+from shared.http_client import HttpClient
 
-# Configure S3 settings and create an S3 client
-S3_BUCKET_NAME = 'voxai-test-audio-video'
-aws_credentials = json.load(open(AWS_CREDENTIAL_FILEPATH))
-s3_client = boto3.client('s3', aws_access_key_id=aws_credentials['aws_access_key_id'], aws_secret_access_key=aws_credentials['aws_secret_access_key'])
+from .constants import RECALL_CREDENTIAL_FILEPATH, DEBUG_RECALL_INTELLIGENCE, DEBUG_RECALL_RECORDING_RETRIEVAL, DEBUG_SESSIONS, HTTP_BACKOFF_SECONDS, HTTP_CIRCUIT_FAILURE_THRESHOLD, HTTP_CIRCUIT_RESET_SECONDS, HTTP_MAX_HOSTS, HTTP_POOL_SIZE, HTTP_RETRIES, HTTP_TIMEOUTS
+from .storage import S3Storage, StorageError, create_storage
+
+# Backend that uploaded documents and media are stored in, selected by STORAGE_BACKEND. Created on first use by get_storage
+storage = None
+
+# Shared client for every outbound HTTP request. Created on first use by get_http_client
+http_client = None
+
+shared_clients_lock = Lock()
+
+def get_storage():
+    """Gets the storage backend, creating it on first use so importing this module doesn't depend on the storage configuration."""
+    global storage
+    with shared_clients_lock:
+        if storage is None:
+            storage = create_storage()
+        return storage
+
+def get_http_client():
+    """Gets the shared HTTP client, creating it on first use."""
+    global http_client
+    with shared_clients_lock:
+        if http_client is None:
+            http_client = HttpClient(
+                HTTP_TIMEOUTS,
+                retries=HTTP_RETRIES,
+                backoff_seconds=HTTP_BACKOFF_SECONDS,
+                pool_size=HTTP_POOL_SIZE,
+                failure_threshold=HTTP_CIRCUIT_FAILURE_THRESHOLD,
+                reset_seconds=HTTP_CIRCUIT_RESET_SECONDS,
+                max_hosts=HTTP_MAX_HOSTS
+            )
+        return http_client
 
 def get_random(max_value, negative=False):
     """Generates a random integer within a specified range."""
@@ -96,9 +128,57 @@ def get_recall_headers():
         'Authorization': f'Token {recall_api_key}'
     }
 
+class VersionedLRUCache:
+    """
+    A thread-safe, size-bounded cache whose entries are only returned while their version is current.
+
+    Args:
+        max_size: The number of entries to keep before evicting the least recently used one.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key, version):
+        """Returns the value stored for key at this version, or None if there isn't one."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, version, value):
+        """Stores a value for key at this version, replacing any other version."""
+        with self.lock:
+            self.entries[key] = (version, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """Removes the entry for key, if there is one."""
+        with self.lock:
+            self.entries.pop(key, None)
+
 def api_error_response(message, status_code):
     return jsonify({"error": message}), status_code
 
+def webhook_token_error(expected_token):
+    """
+    Checks the "token" query parameter of a webhook request.
+
+    Returns:
+        An error response if the token is wrong, or if no token is configured so the webhook can't be authenticated; otherwise None.
+    """
+    if not expected_token:
+        return api_error_response("Webhook is not configured", 503)
+    if request.args.get('token') != expected_token:
+        return api_error_response("Invalid webhook token", 401)
+    return None
+
 def valid_token_response(valid_token):
     """Returns a response informing the client of whether the auth token is valid."""
     response = make_response(jsonify({"validToken": valid_token}))
@@ -144,48 +224,47 @@ def handle_auth_token(sessions, auth_token=None):
 
 # TODO: move to utils
 def upload_file(output_key, file_content):
-    """Uploads a file to s3."""
+    """Uploads a file to the storage backend."""
     try:
-        # Upload to the new location
-        s3_client.put_object(Bucket=S3_BUCKET_NAME, Key=output_key, Body=file_content)
-        
-        # Return the new S3 URL
-        return f's3://{S3_BUCKET_NAME}/{output_key}'
-    except (BotoCoreError, ClientError) as e:
-        print(f"Error in S3 operation: {str(e)}")
-        return None
-    except ValueError as e:
-        print(str(e))
+        # Upload to the new location and return its URL
+        return get_storage().put(output_key, file_content)
+    except StorageError as e:
+        print(f"Error in storage operation: {str(e)}")
         return None
 
 
 def download_and_reupload_file(input_url, output_key):
-    """Download a file from input_url (S3 or HTTP) and re-upload it to a new S3 key."""
+    """
+    Copies a file from input_url (HTTP, S3 or the storage backend) to a new key in the storage backend without holding it in memory.
+
+    HTTP downloads and S3 files outside the backend, such as recordings made before STORAGE_BACKEND was 'local', are streamed into the backend.
+    Files already in the backend are copied there directly (server-side for S3), so memory use doesn't grow with the file's size.
+    """
     try:
         parsed_url = urlparse(input_url)
+        storage = get_storage()
         
         if parsed_url.scheme in ['http', 'https']:
             # Handle HTTP/HTTPS URL
-            response = requests.get(input_url)
-            response.raise_for_status()  # Raise an exception for bad status codes
-            file_content = response.content
-        elif parsed_url.scheme == 's3':
-            # Handle S3 URL
-            bucket_name = parsed_url.netloc
-            input_key = parsed_url.path.lstrip('/')
-            file_content = s3_client.get_object(Bucket=bucket_name, Key=input_key)['Body'].read()
+            with get_http_client().get(input_url, 'media', stream=True) as response:
+                response.raise_for_status()  # Raise an exception for bad status codes
+                # Undo any content encoding, as response.content would
+                response.raw.decode_content = True
+                return storage.put(output_key, response.raw)
+        elif storage.owns(input_url):
+            # Handle a URL in the storage backend
+            return storage.copy(input_url, output_key)
+        elif parsed_url.scheme == S3Storage.scheme:
+            # Handle an S3 URL when files are stored elsewhere
+            with closing(S3Storage(parsed_url.netloc).open(parsed_url.path.lstrip('/'))) as body:
+                return storage.put(output_key, body)
         else:
             raise ValueError(f"Unsupported URL scheme: {parsed_url.scheme}")
-        
-        # Upload to the new location
-        s3_client.put_object(Bucket=S3_BUCKET_NAME, Key=output_key, Body=file_content)
-        
-        # Return the new S3 URL
-        return f's3://{S3_BUCKET_NAME}/{output_key}'
-    except (BotoCoreError, ClientError) as e:
-        print(f"Error in S3 operation: {str(e)}")
+    except StorageError as e:
+        print(f"Error in storage operation: {str(e)}")
         return None
-    except requests.RequestException as e:
+    except (requests.RequestException, urllib3.exceptions.HTTPError) as e:
+        # Reading response.raw raises urllib3's errors, such as a dropped connection, without wrapping them as requests does
         print(f"Error downloading file from URL: {str(e)}")
         return None
     except ValueError as e:
@@ -1,7 +1,14 @@
 import pytest
 from server.src.database import Account, db
+from server.src.apis.ingestion import recall_payload_cache
 from server.app import app as flask_app
 
+@pytest.fixture(autouse=True)
+def isolated_payload_cache(tmp_path, monkeypatch):
+    # Keep each test's Recall payloads out of the real cache and away from other tests
+    monkeypatch.setattr(recall_payload_cache, 'root', str(tmp_path / 'recall_payloads'))
+    monkeypatch.setattr(recall_payload_cache, 'total_bytes', None)
+
 @pytest.fixture
 def client(init_database):
     with flask_app.test_client() as client:
@@ -7,12 +7,16 @@ from server.src.database import db, Interview, TranscriptLine
 from server.src.apis.preprocess import preprocess
 from server.src.apis.analysis import get_sentiment, get_engagement
 import server.src.utils 
+from server.src.storage import S3Storage
+from .utils.realtime_sender import build_realtime_segment, replay_transcript
 from .utils.synthetic_data import create_synthetic_data
 from unittest.mock import patch, Mock
 import requests
 import boto3
+import time
 from datetime import datetime as datetime
 from botocore.exceptions import BotoCoreError
+from urllib3.exceptions import ProtocolError
 from unittest import mock
 
 @pytest.fixture
@@ -89,6 +93,20 @@ def mock_interview(sample_data):
         assert interview is not None, "Interview not found"
         return interview
 
+def recall_responses(transcript_response, intelligence_response):
+    """
+    Returns a requests.Session.request side effect answering the Recall transcript and intelligence URLs, which are fetched concurrently and so in no fixed order.
+
+    The intelligence payload is parsed as it streams, so its body is served in small chunks from the mock's json() return value.
+    """
+    if isinstance(intelligence_response, Mock) and intelligence_response.status_code == 200:
+        body = json.dumps(intelligence_response.json()).encode()
+        intelligence_response.iter_content = lambda chunk_size=1, decode_unicode=False: (body[i:i + 7] for i in range(0, len(body), 7))
+
+    def get(method, url, **kwargs):
+        return transcript_response if url.endswith('/transcript') else intelligence_response
+    return get
+
 @patch('requests.post')  # Mock external API calls
 def test_preprocess(mock_post):
     """Test the preprocess function."""
@@ -203,7 +221,7 @@ def test_preprocess(client, audio_url, video_url, expected_status, expected_prep
     else:
         assert "error" in response.json
 
-@patch('requests.post')
+@patch('requests.Session.request')
 def test_join_meeting_success(mock_post, client):
     mock_response = Mock()
     mock_response.status_code = 201
@@ -216,7 +234,7 @@ def test_join_meeting_success(mock_post, client):
     data = json.loads(response.data)
     assert 'id' in data
 
-@patch('requests.post')
+@patch('requests.Session.request')
 def test_join_meeting_failure(mock_post, client):
     mock_response = Mock()
     mock_response.status_code = 400
@@ -237,7 +255,7 @@ def test_join_meeting_missing_url(client):
     assert 'meeting_url' in data
     assert data['meeting_url'] == ['This field may not be null.']
 
-@patch('requests.post')
+@patch('requests.Session.request')
 def test_generate_transcript_success(mock_post, client):
     mock_response = Mock()
     mock_response.status_code = 201
@@ -250,7 +268,7 @@ def test_generate_transcript_success(mock_post, client):
     data = json.loads(response.data)
     assert 'transcript_id' in data
 
-@patch('requests.post')
+@patch('requests.Session.request')
 def test_generate_transcript_failure(mock_post, client):
     mock_response = Mock()
     mock_response.status_code = 400
@@ -271,7 +289,7 @@ def test_generate_transcript_missing_id(client):
     assert 'error' in data
     assert 'id' in data['error']
 
-@patch('requests.get')
+@patch('requests.Session.request')
 def test_analyze_interview_success(mock_requests_get, client, sample_data, sample_transcript):
     # Mock the responses
     mock_transcript_response = Mock()
@@ -315,9 +333,9 @@ def test_analyze_interview_success(mock_requests_get, client, sample_data, sampl
         ]
     }
 
-    mock_requests_get.side_effect = [mock_transcript_response, mock_intelligence_response]
+    mock_requests_get.side_effect = recall_responses(mock_transcript_response, mock_intelligence_response)
 
-    response = client.post('/api/analyze_interview', json={'id': 'test_bot_id'})
+    response = client.post('/api/analyze_interview', json={'id': 'test_bot_id', 'sync': True})
 
     assert response.status_code == 200
     data = json.loads(response.data)
@@ -347,14 +365,14 @@ def test_analyze_interview_header_error(mock_get_recall_headers, client):
     mock_get_recall_headers.return_value = {"error": "Failed to get headers"}
     
     # Make the request
-    response = client.post('/api/analyze_interview', json={'id': 'test_bot_id'})
+    response = client.post('/api/analyze_interview', json={'id': 'test_bot_id', 'sync': True})
     
     # Assert the response
     assert response.status_code == 500
     data = json.loads(response.data)
     assert "error" in data
 
-@patch('requests.get')
+@patch('requests.Session.request')
 def test_analyze_interview_api_error(mock_requests_get, client):
     # Mock a failed response
     mock_response = Mock()
@@ -362,7 +380,7 @@ def test_analyze_interview_api_error(mock_requests_get, client):
     mock_response.text = "Not Found"
     mock_requests_get.return_value = mock_response
 
-    response = client.post('/api/analyze_interview', json={'id': 'test_bot_id'})
+    response = client.post('/api/analyze_interview', json={'id': 'test_bot_id', 'sync': True})
     
     assert response.status_code == 500
     data = json.loads(response.data)
@@ -371,7 +389,7 @@ def test_analyze_interview_api_error(mock_requests_get, client):
     assert "details" in data
     assert data["details"] == "Not Found"
 
-@patch('requests.get')
+@patch('requests.Session.request')
 def test_analyze_interview_missing_data(mock_requests_get, client, sample_data):
     # Mock the requests.get responses with missing data
     mock_transcript_response = Mock()
@@ -389,10 +407,10 @@ def test_analyze_interview_missing_data(mock_requests_get, client, sample_data):
         "assembly_ai.sentiment_analysis_results": []
     }
     
-    mock_requests_get.side_effect = [mock_transcript_response, mock_intelligence_response]
+    mock_requests_get.side_effect = recall_responses(mock_transcript_response, mock_intelligence_response)
     
     # Make the request
-    response = client.post('/api/analyze_interview', json={'id': 'test_bot_id'})
+    response = client.post('/api/analyze_interview', json={'id': 'test_bot_id', 'sync': True})
     
     # Assert the response
     assert response.status_code == 200
@@ -413,6 +431,41 @@ def test_analyze_interview_missing_data(mock_requests_get, client, sample_data):
         transcript_lines = TranscriptLine.query.filter_by(interview_id=updated_interview.interview_id).all()
         assert len(transcript_lines) == 0
 
+@patch('requests.Session.request')
+def test_analyze_interview_runs_in_background(mock_requests_get, client, sample_data):
+    mock_transcript_response = Mock()
+    mock_transcript_response.status_code = 200
+    mock_transcript_response.json.return_value = {"transcript": []}
+
+    mock_intelligence_response = Mock()
+    mock_intelligence_response.status_code = 200
+    mock_intelligence_response.json.return_value = {
+        "assembly_ai.summary": "Async summary",
+        "assembly_ai.iab_categories_result": {"summary": {"topic1": 0.9}, "results": []},
+        "assembly_ai.sentiment_analysis_results": []
+    }
+    mock_requests_get.side_effect = recall_responses(mock_transcript_response, mock_intelligence_response)
+
+    response = client.post('/api/analyze_interview', json={'id': 'test_bot_id'})
+    assert response.status_code == 202
+    job_id = json.loads(response.data)["job_id"]
+
+    # Poll until the background worker finishes
+    for _ in range(100):
+        job = json.loads(client.get(f'/api/analyze_interview/{job_id}').data)
+        if job["status"] in ("completed", "failed"):
+            break
+        time.sleep(0.05)
+
+    assert job["status"] == "completed"
+    assert job["result"]["summary"] == "Async summary"
+    with flask_app.app_context():
+        assert Interview.query.filter_by(recall_id='test_bot_id').first().summary == "Async summary"
+
+def test_analyze_interview_job_not_found(client):
+    response = client.get('/api/analyze_interview/nonexistent_job')
+    assert response.status_code == 404
+
 def test_analyze_interview_nonexistent_id(client):
     response = client.post('/api/analyze_interview', json={'id': 'nonexistent_id'})
     
@@ -458,6 +511,41 @@ def test_get_transcript_lines(client, sample_data, sample_transcript):
     assert "speaker" in data[0]
     assert "labels" in data[0]
 
+def test_get_transcript_lines_filtered(client, sample_data, sample_transcript):
+    response = client.get(f'/api/interviews/{sample_data}/transcript?start_ms=3200&end_ms=10000')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [line["text"] for line in data] == ["I'm doing well, thank you."]
+
+    response = client.get(f'/api/interviews/{sample_data}/transcript?speaker=interviewer')
+    data = json.loads(response.data)
+    assert [line["speaker"] for line in data] == ["interviewer"]
+
+def test_get_transcript_lines_paginated(client, sample_data, sample_transcript):
+    response = client.get(f'/api/interviews/{sample_data}/transcript?limit=1')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [line["text"] for line in data["lines"]] == ["Hello, how are you?"]
+    assert data["next_cursor"] == f"0:{sample_transcript[0]}"
+
+    response = client.get(f'/api/interviews/{sample_data}/transcript?limit=1&after={data["next_cursor"]}')
+    data = json.loads(response.data)
+    assert [line["text"] for line in data["lines"]] == ["I'm doing well, thank you."]
+    assert data["next_cursor"] is None
+
+def test_get_transcript_lines_ndjson(client, sample_data, sample_transcript):
+    response = client.get(f'/api/interviews/{sample_data}/transcript?format=ndjson')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(row) for row in response.data.decode().splitlines()]
+    assert [line["id"] for line in lines] == sample_transcript
+
+@pytest.mark.parametrize("query", ["start_ms=abc", "limit=0", "after=notacursor"])
+def test_get_transcript_lines_invalid_query(client, sample_data, query):
+    response = client.get(f'/api/interviews/{sample_data}/transcript?{query}')
+    assert response.status_code == 400
+    assert "error" in json.loads(response.data)
+
 def test_update_transcript_line(client, sample_transcript):
     line_id = sample_transcript[0]
     updated_data = {
@@ -482,6 +570,77 @@ def test_delete_transcript_line(client, sample_transcript):
         deleted_line = db.session.get(TranscriptLine, line_id)
         assert deleted_line is None
 
+def test_batch_edit_transcript(client, sample_data, sample_transcript):
+    operations = [
+        {"op": "update", "id": sample_transcript[0], "text": "Hi, how are you?"},
+        {"op": "delete", "id": sample_transcript[1]},
+        {"op": "create", "text": "New line.", "start": 7000, "end": 8000, "confidence": 0.9,
+         "sentiment": "neutral", "engagement": "low", "speaker": "candidate", "labels": "[]"}
+    ]
+    response = client.post(f'/api/interviews/{sample_data}/transcript/batch', json={"operations": operations})
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [line["text"] for line in data] == ["Hi, how are you?", "New line."]
+
+def test_batch_edit_transcript_is_atomic(client, sample_data, sample_transcript):
+    operations = [
+        {"op": "update", "id": sample_transcript[0], "text": "Changed"},
+        {"op": "update", "id": sample_transcript[1], "confidence": 2}
+    ]
+    response = client.post(f'/api/interviews/{sample_data}/transcript/batch', json={"operations": operations})
+    assert response.status_code == 400
+    assert "Operation 1" in json.loads(response.data)["error"]
+
+    with flask_app.app_context():
+        assert db.session.get(TranscriptLine, sample_transcript[0]).text == "Hello, how are you?"
+
+def test_batch_edit_transcript_unknown_line(client, sample_data, sample_transcript):
+    response = client.post(f'/api/interviews/{sample_data}/transcript/batch', json={"operations": [{"op": "delete", "id": 99999}]})
+    assert response.status_code == 404
+
+@pytest.fixture
+def realtime_token(monkeypatch):
+    monkeypatch.setattr('server.src.apis.realtime.REALTIME_WEBHOOK_TOKEN', 'secret')
+    return 'secret'
+
+def test_realtime_transcript_webhook(client, sample_data, realtime_token):
+    lines = [
+        {"text": "Hello, how are you?", "start": 0, "end": 3000, "speaker": "interviewer"},
+        {"text": "I'm doing well, thank you.", "start": 3500, "end": 6000, "speaker": "candidate"}
+    ]
+    responses = replay_transcript(client.post, f'/api/webhooks/recall/transcript?token={realtime_token}', 'test_bot_id', lines, speed=100)
+    assert all(response.status_code == 200 for response in responses)
+
+    # Each segment is stored as it arrives
+    with flask_app.app_context():
+        transcript_lines = TranscriptLine.query.filter_by(interview_id=sample_data).order_by(TranscriptLine.start).all()
+        assert [line.text for line in transcript_lines] == ["Hello, how are you?", "I'm doing well, thank you."]
+        assert db.session.get(Interview, sample_data).duration == 6000
+
+    response = client.get(f'/api/interviews/{sample_data}/live')
+    assert response.status_code == 200
+    live = json.loads(response.data)
+    assert live["line_count"] == 2
+    assert live["interview_duration"] == 6000
+    assert live["word_count_by_speaker"] == {"interviewer": 4, "candidate": 5}
+
+def test_get_live_metrics_without_live_transcript(client, sample_data):
+    response = client.get(f'/api/interviews/{sample_data}/live')
+    assert response.status_code == 404
+
+def test_realtime_transcript_webhook_unknown_bot(client, sample_data, realtime_token):
+    response = client.post(f'/api/webhooks/recall/transcript?token={realtime_token}', json=build_realtime_segment('unknown_bot', {"text": "Hi", "start": 0, "end": 500, "speaker": "a"}))
+    assert response.status_code == 404
+
+def test_realtime_transcript_webhook_requires_token(client, monkeypatch):
+    segment = build_realtime_segment('test_bot_id', {"text": "Hi", "start": 0, "end": 500, "speaker": "a"})
+    monkeypatch.setattr('server.src.apis.realtime.REALTIME_WEBHOOK_TOKEN', None)
+    assert client.post('/api/webhooks/recall/transcript', json=segment).status_code == 503
+
+    monkeypatch.setattr('server.src.apis.realtime.REALTIME_WEBHOOK_TOKEN', 'secret')
+    assert client.post('/api/webhooks/recall/transcript', json=segment).status_code == 401
+    assert client.post('/api/webhooks/recall/transcript?token=wrong', json=segment).status_code == 401
+
 def test_get_nonexistent_transcript(client):
     response = client.get('/api/interviews/9999/transcript')
     assert response.status_code == 404
@@ -519,7 +678,7 @@ def test_delete_nonexistent_transcript_line(client):
     response = client.delete('/api/transcript_lines/9999')
     assert response.status_code == 404
 
-@patch('requests.get')
+@patch('requests.Session.request')
 @patch('server.src.apis.recall.download_and_reupload_file')
 def test_save_recording_success(mock_download, mock_requests_get, client, sample_data):
     mock_response = Mock()
@@ -545,7 +704,7 @@ def test_save_recording_success(mock_download, mock_requests_get, client, sample
     updated_interview = Interview.query.filter_by(recall_id='test_bot_id').first()
     assert updated_interview.video_url == 'https://example.com/video.mp4'
 
-@patch('requests.get')
+@patch('requests.Session.request')
 def test_save_recording_api_error(mock_requests_get, client, sample_data):
     mock_response = Mock()
     mock_response.status_code = 404
@@ -559,7 +718,7 @@ def test_save_recording_api_error(mock_requests_get, client, sample_data):
     assert "error" in data
     assert "Failed to retrieve bot information: Bot not found" in data["error"]
 
-@patch('requests.get')
+@patch('requests.Session.request')
 def test_save_recording_interview_not_found(mock_requests_get, client, sample_data):
     mock_response = Mock()
     mock_response.status_code = 200
@@ -569,4 +728,50 @@ def test_save_recording_interview_not_found(mock_requests_get, client, sample_da
     assert response.status_code == 404
     data = json.loads(response.data)
     assert "error" in data
-    assert data["error"] == "Interview not found"
\ No newline at end of file
+    assert data["error"] == "Interview not found"
+@patch('requests.Session.request')
+def test_download_and_reupload_file_streams_http(mock_get, monkeypatch):
+    mock_s3 = Mock()
+    monkeypatch.setattr(server.src.utils, 'storage', S3Storage('voxai-test-audio-video', client=mock_s3))
+    response = Mock(status_code=200)
+    response.__enter__ = Mock(return_value=response)
+    response.__exit__ = Mock(return_value=False)
+    mock_get.return_value = response
+
+    result = server.src.utils.download_and_reupload_file('https://example.com/video.mp4', 'bot.mp4')
+
+    assert result == 's3://voxai-test-audio-video/bot.mp4'
+    assert mock_get.call_args.kwargs['stream'] is True
+    assert response.raw.decode_content is True
+    mock_s3.upload_fileobj.assert_called_once()
+    assert mock_s3.upload_fileobj.call_args.args == (response.raw, 'voxai-test-audio-video', 'bot.mp4')
+    mock_s3.put_object.assert_not_called()
+    response.__exit__.assert_called_once()
+
+@patch('requests.Session.request')
+def test_download_and_reupload_file_dropped_download(mock_get, monkeypatch):
+    mock_s3 = Mock()
+    mock_s3.upload_fileobj.side_effect = lambda fileobj, bucket, key, Config: [fileobj.read(1024) for _ in range(2)]
+    monkeypatch.setattr(server.src.utils, 'storage', S3Storage('voxai-test-audio-video', client=mock_s3))
+    response = Mock(status_code=200)
+    response.__enter__ = Mock(return_value=response)
+    response.__exit__ = Mock(return_value=False)
+    response.raw.read.side_effect = [b'partial recording', ProtocolError("Connection broken: connection reset")]
+    mock_get.return_value = response
+
+    assert server.src.utils.download_and_reupload_file('https://example.com/video.mp4', 'bot.mp4') is None
+    response.__exit__.assert_called_once()
+
+def test_download_and_reupload_file_copies_s3_server_side(monkeypatch):
+    mock_s3 = Mock()
+    monkeypatch.setattr(server.src.utils, 'storage', S3Storage('voxai-test-audio-video', client=mock_s3))
+
+    result = server.src.utils.download_and_reupload_file('s3://source-bucket/path/video.mp4', 'bot.mp4')
+
+    assert result == 's3://voxai-test-audio-video/bot.mp4'
+    assert mock_s3.copy.call_args.args == ({'Bucket': 'source-bucket', 'Key': 'path/video.mp4'}, 'voxai-test-audio-video', 'bot.mp4')
+    mock_s3.get_object.assert_not_called()
+
+    mock_s3.copy.side_effect = BotoCoreError()
+    assert server.src.utils.download_and_reupload_file('s3://source-bucket/video.mp4', 'bot.mp4') is None
+    assert server.src.utils.download_and_reupload_file('ftp://example.com/video.mp4', 'bot.mp4') is None
@@ -0,0 +1,120 @@
+from datetime import datetime
+import pytest
+from unittest.mock import Mock, patch
+
+from server.app import app as flask_app
+from server.src.database import db, Interview
+from server.src.apis.bot_status import parse_bot_status_event, process_finished_recording
+from server.src.apis.ingestion import create_analysis_job, get_analysis_job, run_analysis_job
+
+from .test_apis import client, sample_data
+
+STATUS_WEBHOOK_URL = '/api/webhooks/recall/status?token=secret'
+
+@pytest.fixture(autouse=True)
+def status_token(monkeypatch):
+    monkeypatch.setattr('server.src.apis.bot_status.RECALL_STATUS_WEBHOOK_TOKEN', 'secret')
+
+def status_event(code, created_at, bot_id='test_bot_id'):
+    return {
+        "event": "bot.status_change",
+        "data": {"bot_id": bot_id, "status": {"code": code, "sub_code": None, "message": None, "created_at": created_at}}
+    }
+
+def test_parse_bot_status_event():
+    bot_id, status = parse_bot_status_event(status_event("in_call_recording", "2024-10-23T16:00:00.500000Z"))
+    assert bot_id == 'test_bot_id'
+    assert status["code"] == "in_call_recording"
+    assert status["created_at"] == datetime(2024, 10, 23, 16, 0, 0, 500000)
+    assert parse_bot_status_event({"event": "bot.transcription", "data": {}}) == (None, None)
+
+def test_bot_status_webhook_stores_latest_status(client, sample_data):
+    response = client.post(STATUS_WEBHOOK_URL, json=status_event("in_call_recording", "2024-10-23T16:00:00Z"))
+    assert response.status_code == 200
+    assert response.json["stored"]
+
+    # Duplicate and out-of-order deliveries don't replace the latest status
+    assert not client.post(STATUS_WEBHOOK_URL, json=status_event("in_call_recording", "2024-10-23T16:00:00Z")).json["stored"]
+    assert not client.post(STATUS_WEBHOOK_URL, json=status_event("joining_call", "2024-10-23T15:59:00Z")).json["stored"]
+
+    response = client.get(f'/api/interviews/{sample_data}/recall_status')
+    assert response.status_code == 200
+    assert response.json["status"] == "in_call_recording"
+    assert response.json["status_at"] == "2024-10-23T16:00:00"
+
+def test_bot_status_blocks_recall_calls_while_recording(client, sample_data):
+    client.post(STATUS_WEBHOOK_URL, json=status_event("in_call_recording", "2024-10-23T16:00:00Z"))
+
+    with patch('requests.Session.request') as mock_request:
+        response = client.post('/api/analyze_interview', json={'id': 'test_bot_id'})
+        assert response.status_code == 409
+        response = client.get('/api/save_recording/test_bot_id')
+        assert response.status_code == 409
+        mock_request.assert_not_called()
+
+@patch('server.src.apis.bot_status.analysis_executor')
+def test_bot_status_webhook_recording_done(mock_executor, client, sample_data):
+    response = client.post(STATUS_WEBHOOK_URL, json=status_event("done", "2024-10-23T17:00:00Z"))
+    assert response.status_code == 200
+    mock_executor.submit.assert_called_once()
+    assert mock_executor.submit.call_args.args[:2] == (process_finished_recording, response.json["recording_job_id"])
+
+    # A repeated delivery doesn't start the work again
+    client.post(STATUS_WEBHOOK_URL, json=status_event("done", "2024-10-23T17:00:00Z"))
+    assert mock_executor.submit.call_count == 1
+
+@patch('server.src.apis.recall.download_and_reupload_file')
+@patch('requests.Session.request')
+def test_process_finished_recording(mock_request, mock_download, sample_data):
+    responses = {
+        'GET': Mock(status_code=200, json=lambda: {"video_url": "https://example.com/video.mp4"}),
+        'POST': Mock(status_code=201)
+    }
+    mock_request.side_effect = lambda method, url, **kwargs: responses[method]
+
+    job_id = create_analysis_job(sample_data, 'test_bot_id')
+    process_finished_recording(job_id, sample_data, 'test_bot_id', {})
+
+    mock_download.assert_called_once_with('https://example.com/video.mp4', 'test_bot_id.mp4')
+    assert mock_request.call_args.args[0] == 'POST' and mock_request.call_args.args[1].endswith('/test_bot_id/analyze')
+    with flask_app.app_context():
+        interview = db.session.get(Interview, sample_data)
+        assert interview.video_url == "https://example.com/video.mp4"
+        assert interview.recall_state == {"recording_saved": True, "analysis_requested": True}
+    assert get_analysis_job(job_id)["status"] == "completed"
+
+@patch('server.src.apis.bot_status.analysis_executor')
+def test_bot_status_webhook_analysis_done(mock_executor, client, sample_data):
+    response = client.post(STATUS_WEBHOOK_URL, json=status_event("analysis_done", "2024-10-23T18:00:00Z"))
+    assert response.status_code == 200
+    job_id = response.json["analysis_job_id"]
+    assert mock_executor.submit.call_args.args[:4] == (run_analysis_job, job_id, sample_data, 'test_bot_id')
+    assert get_analysis_job(job_id)["status"] == "queued"
+
+    response = client.get(f'/api/interviews/{sample_data}/recall_status')
+    assert response.json["status"] == "analysis_done"
+    assert response.json["analysis_job_id"] == job_id
+
+@patch('server.src.apis.bot_status.analysis_executor')
+@patch('server.src.apis.bot_status.create_analysis_job', return_value=None)
+def test_bot_status_webhook_full_queue(mock_create, mock_executor, client, sample_data):
+    response = client.post(STATUS_WEBHOOK_URL, json=status_event("analysis_done", "2024-10-23T18:00:00Z"))
+    assert response.status_code == 503
+    mock_executor.submit.assert_not_called()
+
+    # The status isn't stored, so Recall's redelivery is processed
+    assert client.get(f'/api/interviews/{sample_data}/recall_status').json["status"] is None
+    mock_create.return_value = 'job-1'
+    assert client.post(STATUS_WEBHOOK_URL, json=status_event("analysis_done", "2024-10-23T18:00:00Z")).json["stored"]
+
+def test_bot_status_webhook_unknown_bot(client, sample_data):
+    response = client.post(STATUS_WEBHOOK_URL, json=status_event("done", "2024-10-23T17:00:00Z", bot_id='missing'))
+    assert response.status_code == 404
+
+def test_bot_status_webhook_requires_token(client, monkeypatch):
+    event = status_event("done", "2024-10-23T17:00:00Z")
+    assert client.post('/api/webhooks/recall/status', json=event).status_code == 401
+    assert client.post('/api/webhooks/recall/status?token=wrong', json=event).status_code == 401
+
+    monkeypatch.setattr('server.src.apis.bot_status.RECALL_STATUS_WEBHOOK_TOKEN', None)
+    assert client.post(STATUS_WEBHOOK_URL, json=event).status_code == 503
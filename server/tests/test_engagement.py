@@ -1,16 +1,20 @@
 import pytest
 from server.src.database import TranscriptLine, Interview, db
 from server.app import app as flask_app
+from server.src.constants import STOP_WORDS
+from server.src.queries import get_transcript_analytics_lines
 from server.src.apis.transcript import (
+    analyze_turn_taking,
     count_all_words,
     calculate_talk_duration,
     calculate_speaking_rate_variations,
     calculate_engagement_metrics,
+    compute_interview_metrics,
     update_interview_metrics
 )
 from datetime import datetime as datetime
 
-from .test_apis import sample_data
+from .test_apis import client, sample_data, sample_transcript
 
 EXPECTED_WORD_COUNT_TRANSCRIPT = {
     'hello': 1, 'how': 1, 'are': 1, 'you': 2, 'today': 1, 'i\'m': 1, 'doing': 1, 'well': 1, 'thank': 1, 'for': 1, 'asking': 1, 'great': 1, 'let\'s': 1, 'begin': 1, 'the': 1, 'interview': 1
@@ -122,6 +126,10 @@ def test_count_all_words(transcript_lines, expected_word_count, request):
     word_count = count_all_words(lines)
     assert word_count == expected_word_count
 
+def test_count_all_words_top_k(extended_sample_transcript_lines):
+    assert count_all_words(extended_sample_transcript_lines, top_k=2) == {'you': 3, 'experience': 2}
+    assert count_all_words(extended_sample_transcript_lines, top_k=2, stop_words=STOP_WORDS) == {'experience': 2, 'hello': 1}
+
 @pytest.mark.parametrize("transcript_lines, expected_durations", [
     ("sample_transcript_lines", {
         'interviewer': 5500,
@@ -138,72 +146,87 @@ def test_calculate_talk_duration(transcript_lines, expected_durations, request):
     durations = calculate_talk_duration(lines)
     assert durations == expected_durations
 
-@pytest.mark.parametrize("transcript_lines, expected_variations", [
-    ("sample_transcript_lines", [
-        {
-            'speaker': 'interviewer',
-            'start_time': 0,
-            'end_time': 3000,
-            'wpm': 100.0
-        },
-        {
-            'speaker': 'candidate',
-            'start_time': 3500,
-            'end_time': 7000,
-            'wpm': 120.0
-        },
-        {
-            'speaker': 'interviewer',
-            'start_time': 7500,
-            'end_time': 10000,
-            'wpm': 120.0
-        }
-    ]),
-    ("extended_sample_transcript_lines", [
-        {
-            'speaker': 'interviewer',
-            'start_time': 0,
-            'end_time': 3000,
-            'wpm': 100.0
-        },
-        {
-            'speaker': 'candidate',
-            'start_time': 3500,
-            'end_time': 7000,
-            'wpm': 120.0
-        },
-        {
-            'speaker': 'interviewer',
-            'start_time': 7500,
-            'end_time': 10000,
-            'wpm': 120.0
-        },
-        {
-            'speaker': 'interviewer',
-            'start_time': 11000,
-            'end_time': 13000,
-            'wpm': 210.0
-        },
-        {
-            'speaker': 'candidate',
-            'start_time': 14000,
-            'end_time': 18000,
-            'wpm': 150.0
-        }
-    ])
+@pytest.mark.parametrize("transcript_lines, window_size, hop_size, expected_variations", [
+    ("sample_transcript_lines", 60, 15, {
+        'interviewer': [{'start_time': 0, 'end_time': 60000, 'wpm': 109.09}],
+        'candidate': [{'start_time': 0, 'end_time': 60000, 'wpm': 120.0}]
+    }),
+    ("sample_transcript_lines", 5, 5, {
+        'interviewer': [
+            {'start_time': 0, 'end_time': 5000, 'wpm': 100.0},
+            {'start_time': 5000, 'end_time': 10000, 'wpm': 120.0}
+        ],
+        'candidate': [{'start_time': 0, 'end_time': 5000, 'wpm': 120.0}]
+    }),
+    ("extended_sample_transcript_lines", 10, 5, {
+        'interviewer': [
+            {'start_time': 0, 'end_time': 10000, 'wpm': 109.09},
+            {'start_time': 5000, 'end_time': 15000, 'wpm': 160.0},
+            {'start_time': 10000, 'end_time': 20000, 'wpm': 210.0}
+        ],
+        'candidate': [
+            {'start_time': 0, 'end_time': 10000, 'wpm': 120.0},
+            {'start_time': 5000, 'end_time': 15000, 'wpm': 150.0},
+            {'start_time': 10000, 'end_time': 20000, 'wpm': 150.0}
+        ]
+    })
 ])
 
-def test_calculate_speaking_rate_variations(transcript_lines, expected_variations, request):
+def test_calculate_speaking_rate_variations(transcript_lines, window_size, hop_size, expected_variations, request):
     lines = request.getfixturevalue(transcript_lines)
-    variations = calculate_speaking_rate_variations(lines)
-    
-    assert len(variations) == len(expected_variations)
-    
-    for actual, expected in zip(variations, expected_variations):
-        assert actual['speaker'] == expected['speaker']
-        assert actual['start_time'] == expected['start_time']
-        assert actual['end_time'] == expected['end_time']
-        assert round(actual['wpm'], 1) == expected['wpm']
+    variations = calculate_speaking_rate_variations(lines, window_size, hop_size)
+    assert variations == expected_variations
+
+def test_calculate_speaking_rate_variations_bounded_by_duration():
+    # Many short lines in one window still produce a single entry per speaker
+    lines = [
+        TranscriptLine(interview_id=1, text="one two three", start=i * 1000, end=i * 1000 + 900, speaker="candidate")
+        for i in range(50)
+    ]
+    variations = calculate_speaking_rate_variations(lines, window_size=60, hop_size=60)
+    assert len(variations['candidate']) == 1
+    assert variations['candidate'][0]['wpm'] == 200.0
+
+@pytest.mark.parametrize("window_size, hop_size", [(60, 0), (60, 0.0005), (0.0001, 1), (-1, 1)])
+def test_calculate_speaking_rate_variations_rejects_sizes_below_a_millisecond(window_size, hop_size):
+    lines = [TranscriptLine(interview_id=1, text="one two", start=0, end=1000, speaker="candidate")]
+    with pytest.raises(ValueError):
+        calculate_speaking_rate_variations(lines, window_size, hop_size)
+
+def test_compute_interview_metrics_scores_every_sentiment_label():
+    labels = ["very positive", "very negative", "positive", "neutral"]
+    lines = [
+        TranscriptLine(interview_id=1, text="fine", start=i * 1000, end=i * 1000 + 900, sentiment=label, speaker="candidate")
+        for i, label in enumerate(labels)
+    ]
+    assert compute_interview_metrics(lines)["sentiment"] == 62
+
+def test_analyze_turn_taking(extended_sample_transcript_lines):
+    turn_taking = analyze_turn_taking(extended_sample_transcript_lines)
+
+    assert turn_taking['speakers'] == {
+        'interviewer': {'turns': 2, 'longest_turn_ms': 5500, 'overlaps': 0, 'interruptions': 0, 'mean_response_latency_ms': 500},
+        'candidate': {'turns': 2, 'longest_turn_ms': 4000, 'overlaps': 0, 'interruptions': 0, 'mean_response_latency_ms': 750}
+    }
+    assert turn_taking['intra_speaker_pauses'] == [0, 0, 0, 1, 0, 0]
+    assert turn_taking['inter_speaker_pauses'] == [0, 0, 2, 1, 0, 0]
+    assert turn_taking['overlap_duration'] == 0
+    assert turn_taking['longest_monologue'] == {'speaker': 'interviewer', 'start': 7500, 'duration': 5500}
+
+def test_analyze_turn_taking_overlaps():
+    lines = [
+        TranscriptLine(text="I was saying that", start=0, end=5000, speaker="interviewer"),
+        TranscriptLine(text="Sorry to cut in", start=4000, end=6000, speaker="candidate"),
+        TranscriptLine(text="Go ahead", start=5900, end=7000, speaker="interviewer")
+    ]
+    turn_taking = analyze_turn_taking(lines)
+
+    assert turn_taking['speakers']['candidate']['overlaps'] == 1
+    assert turn_taking['speakers']['candidate']['interruptions'] == 1
+    assert turn_taking['speakers']['interviewer']['overlaps'] == 1
+    assert turn_taking['speakers']['interviewer']['interruptions'] == 0
+    assert turn_taking['speakers']['interviewer']['mean_response_latency_ms'] == 0
+    assert turn_taking['overlap_duration'] == 1100
 
 @pytest.fixture
 def mock_interview(sample_transcript_lines):
@@ -239,6 +262,9 @@ def test_update_interview_metrics(sample_data, extended_sample_transcript_lines)
         assert engagement_json['overall_silence_duration'] == 3000
         assert engagement_json['word_count_by_speaker'] == {'interviewer': 17, 'candidate': 17}
         assert engagement_json['silence_duration_by_speaker'] == {'interviewer': 1500, 'candidate': 1500}
+        assert engagement_json['distinct_word_count'] == 31
+        assert list(engagement_json['word_counts'])[0] == 'experience'
+        assert engagement_json['turn_taking']['speakers']['interviewer']['turns'] == 2
 
 def test_engagement_metrics_single_speaker(sample_data):
     with flask_app.app_context():
@@ -271,4 +297,31 @@ def test_engagement_metrics_single_speaker(sample_data):
         assert engagement_json['interview_duration'] == 5000
         assert engagement_json['overall_silence_duration'] == 0
         assert engagement_json['word_count_by_speaker'] == {'interviewer': 8}
-        assert engagement_json['silence_duration_by_speaker'] == {}
\ No newline at end of file
+        assert engagement_json['silence_duration_by_speaker'] == {}
+
+def test_calculate_engagement_metrics_cached_until_transcript_changes(client, sample_data, sample_transcript):
+    first = calculate_engagement_metrics(sample_data)
+    assert first['interview_duration'] == 6000
+    assert 'overall_silence_duration' in first and 'word_counts' in first
+    assert calculate_engagement_metrics(sample_data) is first
+
+    with flask_app.app_context():
+        assert db.session.get(Interview, sample_data).engagement_metrics_cache == first
+
+    response = client.put(f'/api/transcript_lines/{sample_transcript[1]}', json={"end": 9000})
+    assert response.status_code == 200
+
+    updated = calculate_engagement_metrics(sample_data)
+    assert updated['interview_duration'] == 9000
+
+    response = client.get(f'/api/interviews/{sample_data}/engagement')
+    assert response.status_code == 200
+    assert response.get_json()['interview_duration'] == 9000
+
+def test_get_transcript_analytics_lines(client, sample_data, sample_transcript):
+    with flask_app.app_context():
+        lines = get_transcript_analytics_lines(sample_data)
+        assert [(line.start, line.speaker) for line in lines] == [(0, "interviewer"), (3500, "candidate")]
+        assert not any(isinstance(line, TranscriptLine) for line in lines)
+        orm_lines = TranscriptLine.query.filter_by(interview_id=sample_data).order_by(TranscriptLine.start).all()
+        assert compute_interview_metrics(lines) == compute_interview_metrics(orm_lines)
@@ -0,0 +1,63 @@
+from server.src.fake_services import create_fake_services_app, scale_transcript
+from shared.payload_cache import PayloadCache
+
+def fake_client(**kwargs):
+    return create_fake_services_app(seed=0, **kwargs).test_client()
+
+def test_fake_recall_endpoints():
+    client = fake_client(media_bytes=100000)
+    response = client.post('/recall/api/v1/bot/', json={'meeting_url': 'https://zoom.us/j/1', 'bot_name': 'Bot'})
+    assert response.status_code == 201
+    bot_id = response.json["id"]
+
+    response = client.get(f'/recall/api/v1/bot/{bot_id}/')
+    assert response.json["video_url"] == f'http://localhost/media/{bot_id}.mp4'
+    assert len(client.get(f'/media/{bot_id}.mp4').data) == 100000
+
+    assert client.get(f'/recall/api/v1/bot/{bot_id}/transcript').json[0]["words"]
+    assert client.post(f'/recall/api/v2beta/bot/{bot_id}/analyze').status_code == 201
+
+def test_fake_services_inject_latency_and_errors():
+    delays = []
+    client = create_fake_services_app(
+        faults={"latency_ms": 200}, service_faults={"okta": {"error_rate": 1.0, "error_status": 502}}, sleep=delays.append
+    ).test_client()
+
+    assert client.get('/greenhouse/voxai').status_code == 200
+    assert client.post('/okta/oauth2/default/v1/token', data={'code': 'abc'}).status_code == 502
+    assert delays == [0.2, 0.2]
+
+    stats = client.get('/_fake/stats').json
+    assert stats["greenhouse"] == {"requests": 1, "errors": 0}
+    assert stats["okta"] == {"requests": 1, "errors": 1}
+
+def test_fake_services_scale_payloads():
+    client = fake_client(payload_scale=3)
+    transcript = client.get('/recall/api/v1/bot/test_bot_id/transcript').json
+    single = fake_client().get('/recall/api/v1/bot/test_bot_id/transcript').json
+    assert len(transcript) == 3 * len(single)
+    starts = [word["start_timestamp"] for segment in transcript for word in segment["words"]]
+    assert starts == sorted(starts)
+
+    intelligence = client.get('/recall/api/v1/bot/test_bot_id/intelligence').json
+    assert len(intelligence["assembly_ai.sentiment_analysis_results"]) % 3 == 0
+
+def test_scale_transcript_shifts_times():
+    segments = [{"speaker": "A", "words": [{"text": "hi", "start_timestamp": 0.5, "end_timestamp": 2.0}]}]
+    scaled = scale_transcript(segments, 2)
+    assert [segment["words"][0]["start_timestamp"] for segment in scaled] == [0.5, 2.5]
+
+def test_fake_services_replay_payload_cache(tmp_path):
+    cache = PayloadCache(str(tmp_path), 1024 ** 2)
+    cache.put('recorded_bot', 'transcript', [{"speaker": "Recorded", "words": []}])
+    client = fake_client(payload_cache=cache)
+    assert client.get('/recall/api/v1/bot/recorded_bot/transcript').json == [{"speaker": "Recorded", "words": []}]
+    assert client.get('/recall/api/v1/bot/other_bot/transcript').json[0]["speaker"] != "Recorded"
+
+def test_fake_okta_and_documents():
+    client = fake_client()
+    assert client.post('/okta/oauth2/default/v1/token', data={}).status_code == 400
+    assert client.get('/okta/oauth2/default/v1/userinfo').status_code == 401
+    response = client.get('/okta/oauth2/default/v1/userinfo', headers={'Authorization': 'Bearer token'})
+    assert response.json["email"] == 'fake.user@example.com'
+    assert client.get('/documents/engineer.pdf').data.startswith(b'%PDF')
@@ -20,7 +20,7 @@ def test_parse_greenhouse_jobs_success(client):
 
     create_test_account_and_set_token(client, "test_greenhouse@test.com", "AUTHTOKENGREENHOUSE", 10, 3)
 
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.request') as mock_get:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.content = html_content
@@ -50,7 +50,7 @@ def test_parse_greenhouse_jobs_missing_url(client):
 def test_parse_greenhouse_jobs_request_error(client):
     """Test handling a request error when fetching the Greenhouse page."""
     create_test_account_and_set_token(client, "test_greenhouse@test.com", "AUTHTOKENGREENHOUSE", 10, 3)
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.request') as mock_get:
         mock_get.side_effect = requests.RequestException('Test Exception')
 
         response = client.post('/api/greenhouse', json={'url': 'https://example.com/jobs'})
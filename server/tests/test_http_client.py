@@ -0,0 +1,189 @@
+import pytest
+import requests
+import threading
+import time
+from unittest.mock import Mock, patch
+
+from shared.http_client import CircuitBreaker, CircuitOpenError, HttpClient, LatencyMetrics, limit_timeout
+
+from .test_apis import client
+from .utils.synthetic_data import create_test_account_and_set_token
+
+def make_client(**kwargs):
+    return HttpClient({'recall': (1, 2)}, sleep=lambda seconds: None, **kwargs)
+
+@patch('requests.Session.request')
+def test_http_client_uses_integration_timeout(mock_get):
+    mock_get.return_value = Mock(status_code=200)
+    http_client = make_client()
+
+    http_client.get('https://recall.example.com/bot/', 'recall', headers={'a': 'b'})
+    http_client.get('https://other.example.com/', timeout=7)
+
+    assert mock_get.call_args_list[0].kwargs == {'headers': {'a': 'b'}, 'timeout': (1, 2)}
+    assert mock_get.call_args_list[1].kwargs == {'timeout': 7}
+    assert set(http_client.sessions) == {'recall.example.com', 'other.example.com'}
+
+@patch('requests.Session.request')
+def test_http_client_retries_idempotent_requests(mock_get):
+    mock_get.side_effect = [requests.ConnectionError('reset'), Mock(status_code=503), Mock(status_code=200)]
+    delays = []
+    http_client = HttpClient(retries=3, backoff_seconds=1, sleep=delays.append)
+
+    assert http_client.get('https://recall.example.com/bot/', 'recall').status_code == 200
+    assert mock_get.call_count == 3
+    assert len(delays) == 2 and 0 <= delays[0] <= 1 and 0 <= delays[1] <= 2
+
+    metrics = http_client.metrics_snapshot()["integrations"]["recall"]
+    assert metrics["requests"] == 3
+    assert metrics["errors"] == 2
+    assert metrics["retries"] == 2
+
+@patch('requests.Session.request')
+def test_http_client_does_not_retry_posts_or_client_errors(mock_request):
+    mock_request.side_effect = requests.ConnectionError('reset')
+    http_client = make_client()
+    with pytest.raises(requests.ConnectionError):
+        http_client.post('https://recall.example.com/bot/', 'recall')
+    assert mock_request.call_count == 1
+    assert mock_request.call_args.args == ('POST', 'https://recall.example.com/bot/')
+
+    mock_request.reset_mock(side_effect=True)
+    mock_request.return_value = Mock(status_code=404)
+    assert http_client.get('https://recall.example.com/bot/', 'recall').status_code == 404
+    assert mock_request.call_count == 1
+
+@patch('requests.Session.request')
+def test_http_client_circuit_breaker(mock_get):
+    mock_get.side_effect = requests.Timeout('timed out')
+    http_client = make_client(retries=0, failure_threshold=2, reset_seconds=60)
+
+    for _ in range(2):
+        with pytest.raises(requests.Timeout):
+            http_client.get('https://okta.example.com/userinfo', 'okta')
+    with pytest.raises(CircuitOpenError):
+        http_client.get('https://okta.example.com/userinfo', 'okta')
+
+    # Only the failing host is rejected
+    mock_get.side_effect = None
+    mock_get.return_value = Mock(status_code=200)
+    assert http_client.get('https://recall.example.com/bot/', 'recall').status_code == 200
+
+    snapshot = http_client.metrics_snapshot()
+    assert snapshot["circuits"] == {'okta.example.com': 'open', 'recall.example.com': 'closed'}
+    assert snapshot["integrations"]["okta"]["rejected"] == 1
+    assert mock_get.call_count == 3
+
+@patch('requests.Session.request')
+def test_http_client_circuit_breaker_ignores_invalid_requests(mock_request):
+    mock_request.side_effect = requests.exceptions.MissingSchema('no scheme')
+    http_client = make_client(failure_threshold=1)
+    for _ in range(3):
+        with pytest.raises(requests.exceptions.MissingSchema):
+            http_client.get('https://recall.example.com/bot/', 'recall')
+    assert mock_request.call_count == 3
+    assert http_client.metrics_snapshot()["circuits"] == {'recall.example.com': 'closed'}
+
+def test_http_client_bounds_hosts():
+    http_client = make_client(max_hosts=2)
+    first_session = http_client.get_session('a.example.com')
+    http_client.get_breaker('a.example.com')
+    for host in ['b.example.com', 'a.example.com', 'c.example.com']:
+        http_client.get_session(host)
+        http_client.get_breaker(host)
+
+    # b was used least recently, so it's dropped
+    assert list(http_client.sessions) == ['a.example.com', 'c.example.com']
+    assert list(http_client.breakers) == ['a.example.com', 'c.example.com']
+    assert http_client.get_session('a.example.com') is first_session
+
+def test_circuit_breaker_half_open():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    breaker.record_failure()
+    assert breaker.state == 'half_open'
+
+    # One trial request is let through; a failed trial reopens the circuit
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow_request() and breaker.allow_request()
+
+def test_latency_metrics_histogram():
+    metrics = LatencyMetrics(buckets_ms=(10, 100))
+    for elapsed_ms in [5, 5, 50, 500]:
+        metrics.record(elapsed_ms, False)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["histogram_ms"] == {"le_10": 2, "le_100": 1, "inf": 1}
+    assert snapshot["p50_ms"] == 10
+    assert snapshot["p95_ms"] == 500
+    assert snapshot["max_ms"] == 500
+    assert snapshot["mean_ms"] == 140.0
+
+@patch('requests.Session.request')
+def test_get_http_metrics(mock_get, client):
+    mock_get.return_value = Mock(status_code=404, text="Not found")
+    response = client.get('/api/save_recording/test_bot_id')
+    assert response.status_code == 404
+
+    assert client.get('/api/metrics/http').status_code == 401
+
+    create_test_account_and_set_token(client, "test_http_metrics@test.com", "AUTHTOKENHTTPMETRICS", 10, 3)
+    response = client.get('/api/metrics/http')
+    assert response.status_code == 200
+    assert response.json["integrations"]["recall"]["requests"] >= 1
+    assert response.json["circuits"]["us-west-2.recall.ai"] == 'closed'
+
+def test_limit_timeout():
+    assert limit_timeout((5, 30), 10) == (5, 10)
+    assert limit_timeout(30, 2.5) == 2.5
+    assert limit_timeout(None, 3) == 3
+
+def test_http_client_get_many_runs_concurrently():
+    started = threading.Barrier(2, timeout=5)
+
+    def get(method, url, **kwargs):
+        # Both requests must be in flight at once for the barrier to release
+        started.wait()
+        return Mock(status_code=200, url=url)
+
+    http_client = make_client()
+    with patch('requests.Session.request', side_effect=get):
+        responses = http_client.get_many(['https://recall.example.com/a', 'https://recall.example.com/b'], 'recall', 5)
+    assert [response.url for response in responses] == ['https://recall.example.com/a', 'https://recall.example.com/b']
+
+def test_http_client_get_many_partial_failure_and_deadline():
+    release = threading.Event()
+    closed = threading.Event()
+    slow_response = Mock(status_code=200)
+    slow_response.close.side_effect = closed.set
+
+    def get(method, url, **kwargs):
+        if url.endswith('/slow'):
+            release.wait(5)
+            return slow_response
+        raise requests.ConnectionError('refused')
+
+    http_client = make_client(retries=0)
+    with patch('requests.Session.request', side_effect=get):
+        start_time = time.monotonic()
+        failed, slow = http_client.get_many(['https://down.example.com/', 'https://recall.example.com/slow'], 'recall', 0.2)
+        release.set()
+    assert time.monotonic() - start_time < 2
+    assert isinstance(failed, requests.ConnectionError)
+    assert isinstance(slow, requests.Timeout)
+    # The response that arrived after the deadline gives its connection back
+    assert closed.wait(5)
+
+@patch('requests.Session.request')
+def test_http_client_deadline_stops_retries(mock_get):
+    mock_get.return_value = Mock(status_code=503)
+    http_client = HttpClient(retries=3, backoff_seconds=10, sleep=lambda seconds: pytest.fail("slept past the deadline"))
+    with patch('random.uniform', return_value=10):
+        response = http_client.get('https://recall.example.com/', deadline=time.monotonic() + 1)
+    assert response.status_code == 503
+    assert mock_get.call_count == 1
+    assert mock_get.call_args.kwargs['timeout'][1] <= 1
@@ -0,0 +1,57 @@
+import json
+import pytest
+import tracemalloc
+
+from server.src.json_stream import ObjectFieldParser, extract_fields
+
+DOCUMENT = {
+    "assembly_ai.summary": "A \"quoted\" summary with unicode: é ☃",
+    "assembly_ai.words": [{"text": "}]{[", "start": 0, "end": 1.5e3, "confidence": -0.25}] * 3,
+    "assembly_ai.iab_categories_result": {"summary": {"topic": 0.9}, "results": [], "status": None},
+    "flags": [True, False, None],
+    "count": 123456,
+}
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 64, 100000])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_extract_fields_in_any_chunking(chunk_size, indent):
+    body = json.dumps(DOCUMENT, ensure_ascii=False, indent=indent).encode()
+    chunks = chunked(body, chunk_size)
+
+    assert extract_fields(chunks) == DOCUMENT
+    fields = extract_fields(chunks, ["assembly_ai.summary", "assembly_ai.iab_categories_result", "count", "missing"])
+    assert fields == {key: DOCUMENT[key] for key in ["assembly_ai.summary", "assembly_ai.iab_categories_result", "count"]}
+
+@pytest.mark.parametrize("chunk_size", [1000, 8 * 1024, 64 * 1024, 100000])
+def test_extract_fields_long_strings(chunk_size):
+    # Longer than DESCEND_CHARS, with escapes that chunks can split
+    text = ('A "long" \\ transcript é ☃ \n' * 10000)[:200000]
+    document = {"skipped": text, "words": [text, {"text": text}], "summary": text, "count": 1}
+    chunks = chunked(json.dumps(document, ensure_ascii=False).encode(), chunk_size)
+
+    assert extract_fields(chunks, ["summary", "count"]) == {"summary": text, "count": 1}
+    assert extract_fields(chunks, ["words"]) == {"words": [text, {"text": text}]}
+
+@pytest.mark.parametrize("body", [b'[1, 2]', b'{"a": 1', b'{"a" 1}', b'{"a": 1 "b": 2}', b'{"a": [1, x' + b' ' * 100000 + b']}', b'{"a": "' + b'x' * 100000])
+def test_extract_fields_rejects_malformed_documents(body):
+    with pytest.raises(ValueError):
+        extract_fields(chunked(body, 10))
+
+def test_extract_fields_skips_large_values_in_bounded_memory():
+    words = [{"text": f"word{index}", "start": index, "end": index + 1, "confidence": 0.9} for index in range(50000)]
+    body = json.dumps({"assembly_ai.words": words, "assembly_ai.summary": "Summary"}).encode()
+    chunks = chunked(body, 16 * 1024)
+    del words
+
+    parser = ObjectFieldParser(["assembly_ai.summary"])
+    tracemalloc.start()
+    for chunk in chunks:
+        parser.feed(chunk)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    assert parser.close() == {"assembly_ai.summary": "Summary"}
+    assert peak < len(body) / 4
@@ -0,0 +1,48 @@
+from server.app import app as flask_app
+from server.src.database import db, Interview, TermDocumentFrequency
+from server.src.keywords import CORPUS_TERM, count_terms, document_frequencies, extract_interview_keywords, rank_keywords
+
+from .test_apis import client, sample_data
+
+def test_count_terms():
+    assert count_terms(["I built the Kubernetes cluster", "The cluster is fast", None]) == {"built": 1, "kubernetes": 1, "cluster": 2, "fast": 1}
+
+def test_rank_keywords_prefers_rare_terms():
+    term_counts = {"project": 3, "kubernetes": 2, "team": 3}
+    idf = {"project": 1.0, "kubernetes": 3.0, "team": 1.1}
+    assert rank_keywords(term_counts, idf, 2) == ["kubernetes", "team"]
+    assert rank_keywords({}, {}, 2) == []
+
+def test_extract_interview_keywords_updates_document_frequencies(client, sample_data):
+    with flask_app.app_context():
+        document_frequencies.invalidate()
+        other_interview_id = Interview.query.filter(Interview.interview_id != sample_data).first().interview_id
+
+        extract_interview_keywords(other_interview_id, ["The project team shipped the project"])
+        keywords = extract_interview_keywords(sample_data, ["Our project used Kubernetes and Kubernetes operators"])
+        db.session.commit()
+        assert keywords[0] == "kubernetes"
+
+        # Extracting again replaces the interview's terms rather than counting them twice
+        extract_interview_keywords(sample_data, ["Our project used Terraform"])
+        db.session.commit()
+        counts = dict(db.session.execute(db.select(TermDocumentFrequency.term, TermDocumentFrequency.document_count)).all())
+        assert counts[CORPUS_TERM] == 2
+        assert counts["project"] == 2
+        assert counts["terraform"] == 1
+        assert "kubernetes" not in counts
+
+def test_document_frequencies_change_on_commit(client, sample_data):
+    with flask_app.app_context():
+        document_frequencies.ensure_loaded()
+        corpus_count = document_frequencies.counts.get(CORPUS_TERM, 0)
+
+        extract_interview_keywords(sample_data, ["Our project used Kubernetes"])
+        db.session.rollback()
+        assert "kubernetes" not in document_frequencies.counts
+
+        extract_interview_keywords(sample_data, ["Our project used Kubernetes"])
+        assert "kubernetes" not in document_frequencies.counts
+        db.session.commit()
+        assert document_frequencies.counts["kubernetes"] == 1
+        assert document_frequencies.counts[CORPUS_TERM] == corpus_count + 1
@@ -12,7 +12,7 @@
 #     with flask_app.test_client() as client:
 #         yield client
 
-# @patch('requests.post')
+# @patch('requests.Session.post')
 # def test_okta_callback_success_existing_user(mock_post, client):
 #     # Mock the token exchange
 #     mock_post.return_value.json.return_value = {
@@ -20,7 +20,7 @@
 #     }
     
 #     # Mock the userinfo request
-#     with patch('requests.get') as mock_get:
+#     with patch('requests.Session.get') as mock_get:
 #         mock_get.return_value.json.return_value = {
 #             'email': 'existing@example.com',
 #             'name': 'Existing User'
@@ -38,7 +38,7 @@
 #         assert response.headers['Location'] == url_for('serve')
 #         assert 'authToken' in response.headers['Set-Cookie']
 
-# @patch('requests.post')
+# @patch('requests.Session.post')
 # def test_okta_callback_success_new_user(mock_post, client):
 #     # Mock the token exchange
 #     mock_post.return_value.json.return_value = {
@@ -46,7 +46,7 @@
 #     }
     
 #     # Mock the userinfo request
-#     with patch('requests.get') as mock_get:
+#     with patch('requests.Session.get') as mock_get:
 #         mock_get.return_value.json.return_value = {
 #             'email': 'new@example.com',
 #             'name': 'New User'
@@ -69,7 +69,7 @@
 #     assert response.status_code == 400
 #     assert b'Error: No code provided' in response.data
 
-# @patch('requests.post')
+# @patch('requests.Session.post')
 # def test_okta_callback_token_exchange_failure(mock_post, client):
 #     mock_response = Mock()
 #     mock_response.json.return_value = {}
@@ -80,8 +80,8 @@
 #     assert response.status_code == 500
 #     assert b'Error during token exchange' in response.data
 
-# @patch('requests.post')
-# @patch('requests.get')
+# @patch('requests.Session.post')
+# @patch('requests.Session.get')
 # def test_okta_callback_userinfo_failure(mock_get, mock_post, client):
 #     # Mock the token exchange response
 #     mock_post_response = Mock()
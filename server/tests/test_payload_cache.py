@@ -0,0 +1,132 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import pytest
+from unittest.mock import Mock, patch
+
+from server.src.apis.ingestion import IngestionError, fetch_recall_payloads, recall_payload_cache
+from shared.http_client import HttpClient
+from shared.payload_cache import PayloadCache
+
+from .test_apis import client, recall_responses, sample_data
+
+def test_payload_cache_round_trip(tmp_path):
+    cache = PayloadCache(str(tmp_path), max_bytes=1024 ** 2)
+    assert cache.get('bot-1', 'intelligence') is None
+
+    payload_hash = cache.put('bot-1', 'intelligence', {"assembly_ai.summary": "Summary", "words": ["a"] * 100})
+    assert cache.get('bot-1', 'intelligence') == {"assembly_ai.summary": "Summary", "words": ["a"] * 100}
+
+    # Equal payloads share one object, whatever their key order
+    assert cache.put('bot-2', 'intelligence', {"words": ["a"] * 100, "assembly_ai.summary": "Summary"}) == payload_hash
+    assert cache.stats()["objects"] == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+def test_payload_cache_concurrent_writers(tmp_path):
+    cache = PayloadCache(str(tmp_path), max_bytes=1024 ** 2)
+    payload = {"words": ["a"] * 1000}
+    # Writers of the same ref and object each get their own temporary file
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        hashes = set(executor.map(lambda _: cache.put('bot-1', 'transcript', payload), range(32)))
+
+    assert len(hashes) == 1
+    assert cache.get('bot-1', 'transcript') == payload
+    assert not [name for _, _, names in os.walk(tmp_path) for name in names if name.endswith('.tmp')]
+
+def test_payload_cache_max_age(tmp_path):
+    cache = PayloadCache(str(tmp_path), max_bytes=1024 ** 2, max_age_seconds=60)
+    cache.put('bot-1', 'transcript', {"transcript": []})
+    with patch('time.time', return_value=os.path.getmtime(cache.ref_path('bot-1', 'transcript')) + 120):
+        assert cache.get('bot-1', 'transcript') is None
+
+def test_payload_cache_evicts_least_recently_used(tmp_path):
+    cache = PayloadCache(str(tmp_path), max_bytes=10 ** 6)
+    for index in range(3):
+        payload_hash = cache.put(f'bot-{index}', 'intelligence', {"index": index, "data": os.urandom(1000).hex()})
+        os.utime(cache.object_path(payload_hash), (index + 1, index + 1))
+
+    # Reading bot-0 makes it the most recently used, so bot-1 is evicted first
+    cache.get('bot-0', 'intelligence')
+    cache.max_bytes = cache.stats()["bytes"] - 1
+    assert cache.evict() == 1
+    assert cache.get('bot-0', 'intelligence') is not None
+    assert cache.get('bot-1', 'intelligence') is None
+    assert cache.get('bot-2', 'intelligence') is not None
+
+def test_payload_cache_invalidate(tmp_path):
+    cache = PayloadCache(str(tmp_path), max_bytes=1024 ** 2)
+    cache.put('bot-1', 'transcript', {"transcript": []})
+    cache.put('bot-1', 'intelligence', {"assembly_ai.summary": "Summary"})
+    cache.put('bot-2', 'transcript', {"transcript": []})
+
+    cache.invalidate('bot-1')
+    assert cache.get('bot-1', 'transcript') is None and cache.get('bot-1', 'intelligence') is None
+    # The object shared with another bot is kept
+    assert cache.get('bot-2', 'transcript') == {"transcript": []}
+    cache.invalidate('bot-1')
+    with pytest.raises(ValueError):
+        cache.invalidate('..')
+
+def test_payload_cache_rejects_unsafe_keys(tmp_path):
+    cache = PayloadCache(str(tmp_path), max_bytes=1024)
+    assert cache.get('../bot', 'transcript') is None
+    with pytest.raises(ValueError):
+        cache.put('../bot', 'transcript', {})
+
+@patch('requests.Session.request')
+def test_analyze_interview_uses_payload_cache(mock_requests_get, client, sample_data):
+    transcript_response = Mock(status_code=200)
+    transcript_response.json.return_value = {"transcript": []}
+    intelligence_response = Mock(status_code=200)
+    intelligence_response.json.return_value = {
+        "assembly_ai.summary": "Cached summary",
+        "assembly_ai.iab_categories_result": {"summary": {"topic1": 0.9}, "results": []},
+        "assembly_ai.sentiment_analysis_results": []
+    }
+    mock_requests_get.side_effect = recall_responses(transcript_response, intelligence_response)
+
+    assert client.post('/api/analyze_interview', json={'id': 'test_bot_id', 'sync': True}).status_code == 200
+    assert mock_requests_get.call_count == 2
+
+    # The second analysis reads both payloads from the cache
+    response = client.post('/api/analyze_interview', json={'id': 'test_bot_id', 'sync': True})
+    assert response.status_code == 200
+    assert response.json["summary"] == "Cached summary"
+    assert mock_requests_get.call_count == 2
+
+    client.post('/api/analyze_interview', json={'id': 'test_bot_id', 'refresh': True, 'sync': True})
+    assert mock_requests_get.call_count == 4
+
+@patch.object(HttpClient, 'get_many')
+def test_fetch_recall_payloads_caches_intelligence_fields_apart(mock_get_many):
+    transcript_response = Mock(status_code=200)
+    transcript_response.json.return_value = {"transcript": []}
+    body = json.dumps({"assembly_ai.summary": "Summary", "assembly_ai.words": ["a"] * 10}).encode()
+    intelligence_response = Mock(status_code=200)
+    intelligence_response.iter_content = lambda chunk_size=1, decode_unicode=False: iter([body])
+    mock_get_many.return_value = [transcript_response, intelligence_response]
+
+    _, intelligence = fetch_recall_payloads('test_bot_id', {})
+    assert intelligence == {"assembly_ai.summary": "Summary"}
+    # recall_tool reads the whole payload under "intelligence" from the same directory, so the extracted fields don't take its place
+    assert recall_payload_cache.get('test_bot_id', 'intelligence') is None
+    assert recall_payload_cache.get('test_bot_id', 'intelligence_fields') == intelligence
+
+@patch.object(HttpClient, 'get_many')
+def test_fetch_recall_payloads_closes_responses_when_a_request_fails(mock_get_many):
+    transcript_response = Mock(status_code=200)
+    intelligence_response = Mock(status_code=500, text="Server error")
+    mock_get_many.return_value = [transcript_response, intelligence_response]
+
+    with pytest.raises(IngestionError):
+        fetch_recall_payloads('test_bot_id', {}, use_cache=False)
+    transcript_response.close.assert_called()
+    intelligence_response.close.assert_called()
+
+@patch('requests.Session.request')
+def test_generate_transcript_invalidates_payload_cache(mock_request, client, sample_data):
+    recall_payload_cache.put('test_bot_id', 'intelligence_fields', {"assembly_ai.summary": "Old summary"})
+    mock_request.return_value = Mock(status_code=201, json=lambda: {"id": "test_bot_id"})
+
+    assert client.post('/api/generate_transcript', json={'id': 'test_bot_id'}).status_code == 201
+    assert recall_payload_cache.get('test_bot_id', 'intelligence_fields') is None
@@ -0,0 +1,80 @@
+import argparse
+import io
+import json
+import pytest
+import sys
+import threading
+
+from command_line import recall_tool
+from command_line.recall_tool import read_bot_ids, run_batch
+
+class StubRecallAPI:
+    """Answers the per-bot commands without Recall, failing for the bots it's told to."""
+
+    def __init__(self, errors=None, statuses=None):
+        self.errors = errors or {}
+        self.statuses = statuses or {}
+        self.calls = []
+        self.lock = threading.Lock()
+        self.payload_cache = None
+
+    def save_recording(self, bot_id):
+        with self.lock:
+            self.calls.append(bot_id)
+        if bot_id in self.errors:
+            raise self.errors[bot_id]
+        status_code = self.statuses.get(bot_id, 200)
+        return ({"video_url": f"https://example.com/{bot_id}.mp4"} if status_code == 200 else "Not found"), status_code
+
+def run_save_batch(api, bot_ids, concurrency=4):
+    output = io.StringIO()
+    summary = run_batch(api, 'save', bot_ids, argparse.Namespace(), concurrency, output, progress=None)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    return summary, {result["bot_id"]: result for result in results}, len(results)
+
+def test_read_bot_ids():
+    lines = ["bot-1\n", "\n", "  # a comment\n", "bot-2  # trailing comment\n", "   \n", "bot-1\n", "bot-3"]
+    assert read_bot_ids(lines) == ["bot-1", "bot-2", "bot-3"]
+    assert read_bot_ids([]) == []
+
+def test_run_batch_writes_one_result_per_bot():
+    api = StubRecallAPI()
+    summary, results, result_count = run_save_batch(api, ["bot-1", "bot-2", "bot-3"])
+
+    assert result_count == 3
+    assert sorted(api.calls) == ["bot-1", "bot-2", "bot-3"]
+    assert results["bot-2"]["ok"] is True
+    assert results["bot-2"]["status_code"] == 200
+    assert results["bot-2"]["response"] == {"video_url": "https://example.com/bot-2.mp4"}
+    assert isinstance(results["bot-2"]["elapsed_ms"], int)
+    assert summary["total"] == 3 and summary["succeeded"] == 3 and summary["failed"] == 0
+    assert summary["failed_bot_ids"] == []
+
+def test_run_batch_isolates_failures():
+    api = StubRecallAPI(errors={"bot-2": ConnectionError("reset")}, statuses={"bot-3": 404})
+    summary, results, result_count = run_save_batch(api, ["bot-1", "bot-2", "bot-3", "bot-4"], concurrency=2)
+
+    # One bot raising doesn't stop the others
+    assert result_count == 4
+    assert results["bot-1"]["ok"] and results["bot-4"]["ok"]
+    assert (results["bot-2"]["ok"], results["bot-2"]["status_code"], results["bot-2"]["error"]) == (False, None, "ConnectionError: reset")
+    assert (results["bot-3"]["ok"], results["bot-3"]["status_code"], results["bot-3"]["error"]) == (False, 404, "Not found")
+    assert summary["succeeded"] == 2 and summary["failed"] == 2
+    assert sorted(summary["failed_bot_ids"]) == ["bot-2", "bot-3"]
+
+@pytest.mark.parametrize("errors, exit_status", [({}, 0), ({"bot-2": ValueError("bad bot")}, 1)])
+def test_batch_command_exit_status(errors, exit_status, tmp_path, monkeypatch, capsys):
+    bot_ids_path = tmp_path / "bot_ids.txt"
+    bot_ids_path.write_text("bot-1\n# skipped\nbot-2\n")
+    api = StubRecallAPI(errors=errors)
+    monkeypatch.setattr(recall_tool, 'RecallAPI', lambda *args, **kwargs: api)
+    monkeypatch.setattr(sys, 'argv', ['recall_tool', 'save', '--bot-ids', str(bot_ids_path), '--concurrency', '2'])
+
+    with pytest.raises(SystemExit) as exit_info:
+        recall_tool.main()
+    assert exit_info.value.code == exit_status
+
+    captured = capsys.readouterr()
+    assert sorted(json.loads(line)["bot_id"] for line in captured.out.splitlines()) == ["bot-1", "bot-2"]
+    summary = json.loads(captured.err[captured.err.index('{\n'):])
+    assert summary["total"] == 2 and summary["failed"] == exit_status
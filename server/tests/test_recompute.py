@@ -0,0 +1,46 @@
+import pytest
+
+from server.app import app as flask_app
+from server.src.database import db, Interview
+from server.src.recompute import MetricsLine, compute_metrics_chunk, read_checkpoint, write_checkpoint
+
+from .test_apis import client, sample_data, sample_transcript
+
+def test_compute_metrics_chunk():
+    lines = [
+        MetricsLine(0, 3000, "interviewer", "Hello, how are you?", "POSITIVE"),
+        MetricsLine(3500, 6000, "candidate", "I'm doing well, thank you.", "POSITIVE")
+    ]
+    results = dict(compute_metrics_chunk([(1, lines), (2, [])]))
+    assert results[2] is None
+    assert results[1]["duration"] == 6000
+    assert results[1]["speaking_time"] == 5500
+    assert results[1]["sentiment"] == 100
+    assert results[1]["engagement_json"]["word_count_by_speaker"] == {"interviewer": 4, "candidate": 5}
+
+def test_checkpoint_round_trip(tmp_path):
+    path = str(tmp_path / "recompute.json")
+    assert read_checkpoint(path) is None
+    write_checkpoint(path, 42)
+    assert read_checkpoint(path) == 42
+
+def test_recompute_metrics_command(client, sample_data, sample_transcript, tmp_path):
+    with flask_app.app_context():
+        interview = db.session.get(Interview, sample_data)
+        interview.duration = None
+        interview.engagement_json = None
+        candidate_id = interview.candidate_id
+        db.session.commit()
+
+    checkpoint = str(tmp_path / "recompute.json")
+    result = flask_app.test_cli_runner().invoke(args=[
+        'recompute-metrics', '--workers', '1', '--chunk-size', '1', '--candidate-id', str(candidate_id), '--checkpoint', checkpoint
+    ])
+    assert result.exit_code == 0, result.output
+    assert "Updated metrics for" in result.output
+    assert read_checkpoint(checkpoint) is None
+
+    with flask_app.app_context():
+        interview = db.session.get(Interview, sample_data)
+        assert interview.duration == 6000
+        assert interview.engagement_json["interview_duration"] == 6000
@@ -0,0 +1,37 @@
+from server.app import app as flask_app
+from server.src.database import db, TranscriptLine
+from server.src.sentiment import fill_missing_sentiments, label_sentiments, score_sentiment
+
+from .test_apis import client, sample_data, sample_transcript
+
+def test_score_sentiment():
+    assert score_sentiment("I really enjoyed working with that team") > 0.5
+    assert score_sentiment("The project was a frustrating failure") < -0.5
+    assert score_sentiment("We met on Tuesday") == 0
+    assert -1 < score_sentiment("great " * 50) < 1
+
+def test_score_sentiment_negation():
+    assert score_sentiment("it was not good") < 0
+    assert score_sentiment("I didn't hate it") > 0
+    assert score_sentiment("not good") > score_sentiment("bad")
+
+def test_label_sentiments():
+    assert label_sentiments(["This is great", "This is terrible", "This is a table", None]) == ["POSITIVE", "NEGATIVE", "NEUTRAL", "NEUTRAL"]
+
+def test_fill_missing_sentiments():
+    lines = [{"text": "I love it", "sentiment": None}, {"text": "I love it", "sentiment": "NEGATIVE"}, {"text": "Awful"}]
+    assert fill_missing_sentiments(lines) == 2
+    assert [line["sentiment"] for line in lines] == ["POSITIVE", "NEGATIVE", "NEGATIVE"]
+
+def test_rescore_sentiment_command(client, sample_data, sample_transcript):
+    with flask_app.app_context():
+        line = db.session.get(TranscriptLine, sample_transcript[1])
+        line.sentiment = None
+        db.session.commit()
+
+    result = flask_app.test_cli_runner().invoke(args=['rescore-sentiment'])
+    assert result.exit_code == 0, result.output
+
+    with flask_app.app_context():
+        assert db.session.get(TranscriptLine, sample_transcript[1]).sentiment == "POSITIVE"
+        assert db.session.get(TranscriptLine, sample_transcript[0]).sentiment == "positive"
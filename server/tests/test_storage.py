@@ -0,0 +1,119 @@
+from concurrent.futures import ThreadPoolExecutor
+import io
+import pytest
+from botocore.exceptions import ClientError
+from unittest.mock import Mock, PropertyMock, patch
+from urllib3.exceptions import ProtocolError
+
+import server.src.utils
+from server.src.storage import LocalStorage, S3Storage, StorageError, create_storage
+
+def test_local_storage_round_trip(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    url = storage.put('media/video.mp4', b'0123456789')
+
+    assert url == f'file://{tmp_path}/media/video.mp4'
+    assert storage.owns(url)
+    assert not storage.owns('s3://bucket/media/video.mp4')
+    assert storage.size('media/video.mp4') == 10
+    with storage.open('media/video.mp4') as f:
+        assert f.read() == b'0123456789'
+
+    # Streamed writes and range reads
+    storage.put('media/copy.mp4', io.BytesIO(b'abcdef' * 1000))
+    assert storage.read_range('media/copy.mp4', 6, 9) == b'abc'
+    assert storage.read_range('media/copy.mp4', 5997, 6000) == b'def'
+    assert storage.read_range('media/copy.mp4', 5999, 6010) == b'f'
+
+    storage.put('empty', b'')
+    assert storage.read_range('empty', 0, 10) == b''
+
+def test_local_storage_copy_and_errors(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    url = storage.put('source.mp4', b'video')
+    assert storage.copy(url, 'copies/target.mp4') == storage.url('copies/target.mp4')
+    assert storage.read_range('copies/target.mp4', 0, 5) == b'video'
+
+    with pytest.raises(StorageError):
+        storage.put('../outside', b'data')
+    with pytest.raises(StorageError):
+        storage.open('missing')
+
+def test_local_storage_removes_partial_files(tmp_path):
+    class FailingStream(io.RawIOBase):
+        def readinto(self, buffer):
+            raise OSError("connection reset")
+
+    storage = LocalStorage(str(tmp_path))
+    with pytest.raises(StorageError):
+        storage.put('video.mp4', FailingStream())
+    assert list(tmp_path.iterdir()) == []
+
+def test_local_storage_concurrent_writes(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda index: storage.put('video.mp4', io.BytesIO(bytes([index]) * 100000)), range(32)))
+
+    content = storage.read_range('video.mp4', 0, 100000)
+    assert len(set(content)) == 1
+    assert [path.name for path in tmp_path.iterdir()] == ['video.mp4']
+
+def test_s3_storage():
+    client = Mock()
+    client.get_object.return_value = {'Body': io.BytesIO(b'abc')}
+    storage = S3Storage('bucket', client=client)
+
+    assert storage.put('doc', b'data') == 's3://bucket/doc'
+    client.put_object.assert_called_once_with(Bucket='bucket', Key='doc', Body=b'data')
+    stream = io.BytesIO(b'data')
+    storage.put('video', stream)
+    assert client.upload_fileobj.call_args.args == (stream, 'bucket', 'video')
+
+    assert storage.read_range('video', 10, 13) == b'abc'
+    assert client.get_object.call_args.kwargs == {'Bucket': 'bucket', 'Key': 'video', 'Range': 'bytes=10-12'}
+
+    client.head_object.side_effect = ClientError({'Error': {'Code': '404'}}, 'HeadObject')
+    with pytest.raises(StorageError):
+        storage.size('missing')
+
+def test_create_storage():
+    assert isinstance(create_storage('local'), LocalStorage)
+    assert isinstance(create_storage('s3'), S3Storage)
+    with pytest.raises(ValueError):
+        create_storage('ftp')
+
+@patch('requests.Session.request')
+def test_download_and_reupload_file_to_local_storage(mock_get, tmp_path, monkeypatch):
+    storage = LocalStorage(str(tmp_path))
+    monkeypatch.setattr(server.src.utils, 'storage', storage)
+    response = Mock(status_code=200, raw=io.BytesIO(b'recording'))
+    response.__enter__ = Mock(return_value=response)
+    response.__exit__ = Mock(return_value=False)
+    mock_get.return_value = response
+
+    url = server.src.utils.download_and_reupload_file('https://example.com/video.mp4', 'bot.mp4')
+    assert url == storage.url('bot.mp4')
+    assert server.src.utils.download_and_reupload_file(url, 'preprocessed.mp4') == storage.url('preprocessed.mp4')
+    assert storage.read_range('preprocessed.mp4', 0, 9) == b'recording'
+
+    # S3 URLs are still read when files are stored locally
+    with patch.object(S3Storage, 'client', new_callable=PropertyMock) as mock_client:
+        mock_client.return_value.get_object.return_value = {'Body': io.BytesIO(b's3 recording')}
+        assert server.src.utils.download_and_reupload_file('s3://bucket/path/video.mp4', 'other.mp4') == storage.url('other.mp4')
+        assert mock_client.return_value.get_object.call_args.kwargs == {'Bucket': 'bucket', 'Key': 'path/video.mp4'}
+    assert storage.read_range('other.mp4', 0, 12) == b's3 recording'
+
+@patch('requests.Session.request')
+def test_download_and_reupload_file_dropped_download_to_local_storage(mock_get, tmp_path, monkeypatch):
+    class DroppedStream(io.RawIOBase):
+        def readinto(self, buffer):
+            raise ProtocolError("Connection broken: connection reset")
+
+    monkeypatch.setattr(server.src.utils, 'storage', LocalStorage(str(tmp_path)))
+    response = Mock(status_code=200, raw=DroppedStream())
+    response.__enter__ = Mock(return_value=response)
+    response.__exit__ = Mock(return_value=False)
+    mock_get.return_value = response
+
+    assert server.src.utils.download_and_reupload_file('https://example.com/video.mp4', 'bot.mp4') is None
+    assert list(tmp_path.iterdir()) == []
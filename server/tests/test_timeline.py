@@ -0,0 +1,54 @@
+from collections import namedtuple
+from flask import json
+import pytest
+
+from server.src.apis.timeline import bin_transcript_lines, build_timeline_series, downsample_lttb
+
+from .test_apis import client, sample_data, sample_transcript
+
+Line = namedtuple('Line', ['start', 'end', 'speaker', 'text', 'sentiment'])
+
+def test_bin_transcript_lines_splits_lines_across_bins():
+    lines = [
+        Line(0, 4000, "interviewer", "one two three four", "POSITIVE"),
+        Line(4000, 6000, "candidate", "five six", "negative")
+    ]
+    bins = bin_transcript_lines(lines, 3000)
+    assert [current["start"] for current in bins] == [0, 3000]
+    assert bins[0]["talk_time"] == {"interviewer": 3000}
+    assert bins[1]["talk_time"] == {"interviewer": 1000, "candidate": 2000}
+    assert bins[0]["words"] == pytest.approx(3)
+    assert bins[1]["words"] == pytest.approx(3)
+
+    series = build_timeline_series(bins)
+    assert series["talk_ratio"]["candidate"] == [[0, 0.0], [3000, 0.6667]]
+    assert series["sentiment"] == [[0, 1.0], [3000, -0.3333]]
+    assert series["wpm"] == [[0, 60.0], [3000, 60.0]]
+
+def test_build_timeline_series_skips_silent_bins():
+    lines = [Line(0, 1000, "a", "hi", None), Line(5000, 6000, "a", "bye", None)]
+    series = build_timeline_series(bin_transcript_lines(lines, 2000))
+    assert [point[0] for point in series["wpm"]] == [0, 4000]
+    assert series["sentiment"] == []
+
+def test_downsample_lttb_keeps_peaks_and_endpoints():
+    points = [[x, 0] for x in range(100)]
+    points[37][1] = 10
+    sampled = downsample_lttb(points, 10)
+    assert len(sampled) == 10
+    assert sampled[0] == [0, 0] and sampled[-1] == [99, 0]
+    assert [37, 10] in sampled
+    assert downsample_lttb(points[:5], 10) == points[:5]
+
+def test_get_interview_timeline(client, sample_data, sample_transcript):
+    response = client.get(f'/api/interviews/{sample_data}/timeline?bin_ms=2000&points=3')
+    assert response.status_code == 200
+    timeline = json.loads(response.data)
+    assert timeline["bin_ms"] == 2000
+    assert len(timeline["series"]["wpm"]) == 3
+    assert set(timeline["series"]["talk_ratio"]) == {"interviewer", "candidate"}
+
+def test_get_interview_timeline_invalid_parameters(client, sample_data):
+    assert client.get(f'/api/interviews/{sample_data}/timeline?bin_ms=0').status_code == 400
+    assert client.get(f'/api/interviews/{sample_data}/timeline?points=2').status_code == 400
+    assert client.get('/api/interviews/999999/timeline').status_code == 404
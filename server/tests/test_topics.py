@@ -0,0 +1,53 @@
+from flask import json
+import pytest
+
+from server.app import app as flask_app
+from server.src.apis.topics import count_topic_mentions, index_interview_topics
+from server.src.database import db, Application, Interview, TopicAggregate
+
+from .test_apis import sample_data
+
+def test_count_topic_mentions():
+    labels = [
+        json.dumps(["Technology>Programming:0.9", "Careers:0.4"]),
+        json.dumps(["Technology>Programming:0.7"]),
+        None,
+        "greeting"
+    ]
+    assert count_topic_mentions(labels) == {"Technology>Programming": 2, "Careers": 1}
+
+def test_index_interview_topics(client, sample_data):
+    with flask_app.app_context():
+        interview = db.session.get(Interview, sample_data)
+        role_id = db.session.get(Application, interview.application_id).role_id
+
+        index_interview_topics(sample_data, {"topic1": 0.9, "topic2": 0.5}, {"topic1": 3})
+        db.session.commit()
+
+    response = client.get(f'/api/roles/{role_id}/topics')
+    assert response.status_code == 200
+    topics = json.loads(response.data)["topics"]
+    assert [topic["topic"] for topic in topics] == ["topic1", "topic2"]
+    assert topics[0]["interview_count"] == 1
+    assert topics[0]["total_mentions"] == 3
+
+    response = client.get('/api/topics/interviews?topic=topic1')
+    assert response.status_code == 200
+    assert [entry["interview_id"] for entry in json.loads(response.data)["interviews"]] == [sample_data]
+
+def test_reindex_interview_topics_replaces_totals(client, sample_data):
+    with flask_app.app_context():
+        interview = db.session.get(Interview, sample_data)
+        role_id = db.session.get(Application, interview.application_id).role_id
+
+        index_interview_topics(sample_data, {"topic1": 0.9, "topic2": 0.5}, {})
+        index_interview_topics(sample_data, {"topic1": 0.4}, {})
+        db.session.commit()
+
+        aggregates = TopicAggregate.query.filter_by(scope="role", scope_id=role_id).all()
+        assert [(aggregate.topic, aggregate.interview_count) for aggregate in aggregates] == [("topic1", 1)]
+        assert aggregates[0].total_weight == pytest.approx(0.4)
+
+def test_topic_interviews_missing_topic(client):
+    response = client.get('/api/topics/interviews')
+    assert response.status_code == 400
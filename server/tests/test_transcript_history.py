@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+from flask import json
+
+from server.app import app as flask_app
+from server.src.apis.transcript import diff_transcript_line, persist_transcript_lines
+from server.src.apis.transcript_history import undo_transcript_edit
+from server.src.database import db, Interview, TranscriptEdit
+
+from .test_apis import client, sample_data, sample_transcript
+
+LINE = {"text": "Hello", "start": 0, "end": 1000, "confidence": 0.9, "sentiment": "POSITIVE", "engagement": "high", "speaker": "interviewer", "labels": "[]"}
+
+def test_diff_transcript_line_keeps_only_changed_fields():
+    assert diff_transcript_line(1, LINE, {"text": "Hello", "speaker": "candidate"}) == {
+        "line_id": 1, "op": "update", "changes": {"speaker": "candidate"}, "previous": {"speaker": "interviewer"}
+    }
+    assert diff_transcript_line(1, LINE, {"text": "Hello"}) is None
+    assert diff_transcript_line(1, None, LINE)["changes"] == LINE
+    assert diff_transcript_line(1, LINE, None)["previous"] == LINE
+
+def test_undo_transcript_edits():
+    edits = [SimpleNamespace(**edit) for edit in [
+        diff_transcript_line(1, None, LINE),
+        diff_transcript_line(1, LINE, {"text": "Hi"}),
+        diff_transcript_line(2, None, {**LINE, "start": 2000}),
+        diff_transcript_line(2, {**LINE, "start": 2000}, None)
+    ]]
+    lines = {1: {"id": 1, **LINE, "text": "Hi"}}
+    for edit in reversed(edits[1:]):
+        undo_transcript_edit(lines, edit)
+    assert lines == {1: {"id": 1, **LINE}}
+    undo_transcript_edit(lines, edits[0])
+    assert lines == {}
+
+def test_reconstruct_transcript_versions(client, sample_data, sample_transcript):
+    with flask_app.app_context():
+        original_version = db.session.get(Interview, sample_data).transcript_version
+    original = json.loads(client.get(f'/api/interviews/{sample_data}/transcript').data)
+
+    assert client.put(f'/api/transcript_lines/{sample_transcript[0]}', json={"text": "Updated text"}).status_code == 200
+    assert client.delete(f'/api/transcript_lines/{sample_transcript[1]}').status_code == 204
+
+    response = client.get(f'/api/interviews/{sample_data}/transcript/versions/{original_version}')
+    assert response.status_code == 200
+    assert json.loads(response.data)["lines"] == original
+
+    response = client.get(f'/api/interviews/{sample_data}/transcript/versions/{original_version + 1}')
+    assert [line["text"] for line in json.loads(response.data)["lines"]] == ["Updated text", "I'm doing well, thank you."]
+
+    response = client.get(f'/api/interviews/{sample_data}/transcript/edits?after_version={original_version}')
+    edits = json.loads(response.data)["edits"]
+    assert [(edit["op"], edit["line_id"]) for edit in edits] == [("update", sample_transcript[0]), ("delete", sample_transcript[1])]
+    assert edits[0]["changes"] == {"text": "Updated text"}
+    assert edits[0]["previous"] == {"text": "Hello, how are you?"}
+
+    assert client.get(f'/api/interviews/{sample_data}/transcript/versions/{original_version + 5}').status_code == 404
+
+def test_edits_log_only_changed_fields(client, sample_data, sample_transcript):
+    for text in ["One", "Two", "Three"]:
+        assert client.put(f'/api/transcript_lines/{sample_transcript[0]}', json={"text": text}).status_code == 200
+
+    with flask_app.app_context():
+        edits = TranscriptEdit.query.filter_by(interview_id=sample_data).order_by(TranscriptEdit.version).all()
+        assert [edit.changes for edit in edits] == [{"text": "One"}, {"text": "Two"}, {"text": "Three"}]
+        version = db.session.get(Interview, sample_data).transcript_version
+
+    response = client.get(f'/api/interviews/{sample_data}/transcript/versions/{version - 2}')
+    assert json.loads(response.data)["lines"][0]["text"] == "One"
+
+def test_ingested_lines_are_not_logged(client, sample_data, sample_transcript):
+    assert client.put(f'/api/transcript_lines/{sample_transcript[0]}', json={"text": "Updated text"}).status_code == 200
+    with flask_app.app_context():
+        edited_version = db.session.get(Interview, sample_data).transcript_version
+        persist_transcript_lines(sample_data, [{**LINE, "start": 90000, "end": 91000}])
+        db.session.commit()
+        ingested_version = db.session.get(Interview, sample_data).transcript_version
+
+    response = client.get(f'/api/interviews/{sample_data}/transcript/edits?after_version={edited_version}')
+    assert json.loads(response.data)["edits"] == []
+
+    response = client.get(f'/api/interviews/{sample_data}/transcript/versions/{ingested_version}')
+    assert [line["text"] for line in json.loads(response.data)["lines"]][-1] == "Hello"
+    assert client.delete(f'/api/transcript_lines/{sample_transcript[1]}').status_code == 204
+    assert client.get(f'/api/interviews/{sample_data}/transcript/versions/{ingested_version}').status_code == 200
+    # Rebuilding a version before the ingestion would need the unlogged change undone
+    assert client.get(f'/api/interviews/{sample_data}/transcript/versions/{edited_version}').status_code == 404
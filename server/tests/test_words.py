@@ -0,0 +1,63 @@
+from flask import json
+import pytest
+
+from server.app import app as flask_app
+from server.src.apis.words import extract_words, pack_word_timings, store_word_timings, unpack_word_timings
+from server.src.database import db
+
+from .test_apis import client, sample_data
+
+RECALL_TRANSCRIPT = [
+    {"speaker": "interviewer", "words": [
+        {"text": "Hello", "start_timestamp": 0.0, "end_timestamp": 0.4, "confidence": 0.99},
+        {"text": "there", "start_timestamp": 0.5, "end_timestamp": 0.9}
+    ]},
+    {"speaker": "candidate", "words": [
+        {"text": "Hi!", "start_timestamp": 1.2, "end_timestamp": 1.5, "confidence": 0.8}
+    ]}
+]
+
+def test_extract_words():
+    assert extract_words(RECALL_TRANSCRIPT) == [("Hello", 0, 400, 0.99), ("there", 500, 900, None), ("Hi!", 1200, 1500, 0.8)]
+    assert extract_words({"transcript": [{"text": "No words", "start": 0, "end": 1000}]}) == []
+
+def test_pack_word_timings_round_trip():
+    words = extract_words(RECALL_TRANSCRIPT)
+    text, timings = pack_word_timings(words)
+    assert text == "Hello there Hi!"
+    assert len(timings) == 4 * 4 * len(words)
+
+    word_timings = unpack_word_timings(len(words), text, timings)
+    assert word_timings.to_json(0, len(word_timings)) == [
+        {"text": "Hello", "start": 0, "end": 400, "confidence": 0.99},
+        {"text": "there", "start": 500, "end": 900, "confidence": None},
+        {"text": "Hi!", "start": 1200, "end": 1500, "confidence": 0.8}
+    ]
+
+def test_find_word_range():
+    words = extract_words(RECALL_TRANSCRIPT)
+    word_timings = unpack_word_timings(len(words), *pack_word_timings(words))
+    assert word_timings.find_range(600, 1300) == (1, 3)
+    assert word_timings.find_range(950, 1100) == (2, 2)
+    assert word_timings.find_range() == (0, 3)
+
+def test_unpack_word_timings_from_memoryview():
+    words = extract_words(RECALL_TRANSCRIPT)
+    text, timings = pack_word_timings(words)
+    # Postgres drivers can return bytea columns as memoryviews
+    word_timings = unpack_word_timings(len(words), text, memoryview(timings))
+    assert list(word_timings.starts) == [0, 500, 1200]
+    assert word_timings.to_json(2, 3) == [{"text": "Hi!", "start": 1200, "end": 1500, "confidence": 0.8}]
+
+def test_get_interview_words(client, sample_data):
+    with flask_app.app_context():
+        store_word_timings(sample_data, extract_words(RECALL_TRANSCRIPT))
+        db.session.commit()
+
+    response = client.get(f'/api/interviews/{sample_data}/words?start_ms=1000')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data["word_count"] == 3
+    assert [word["text"] for word in data["words"]] == ["Hi!"]
+
+    assert client.get(f'/api/interviews/{sample_data}/words?start_ms=abc').status_code == 400
@@ -0,0 +1,48 @@
+import time
+
+# Functions in this file stand in for Recall's real-time transcription webhooks during testing.
+
+def build_realtime_segment(bot_id, line):
+    """Builds a Recall real-time transcription event for one transcript line (start and end in milliseconds)."""
+    words = line["text"].split()
+    start = line["start"] / 1000
+    step = (line["end"] - line["start"]) / 1000 / len(words)
+    return {
+        "event": "bot.transcription",
+        "data": {
+            "bot_id": bot_id,
+            "transcript": {
+                "speaker": line["speaker"],
+                "is_final": True,
+                "words": [
+                    {"text": word, "start_time": start + i * step, "end_time": start + (i + 1) * step, "confidence": line.get("confidence", 1.0)}
+                    for i, word in enumerate(words)
+                ]
+            }
+        }
+    }
+
+def replay_transcript(post, url, bot_id, lines, speed=1.0, sleep=time.sleep):
+    """
+    Sends each transcript line to the real-time webhook when it would have finished in the meeting.
+
+    Args:
+        post: A function that posts JSON to a URL, such as a Flask test client's post or requests.post.
+        url: The webhook URL.
+        bot_id: The Recall bot id of the interview.
+        lines: Dictionaries with text, start, end and speaker, ordered by end time.
+        speed: How many times faster than real time to replay. Use float('inf') to send without waiting.
+        sleep: The function used to wait between lines.
+
+    Returns:
+        The responses to each request.
+    """
+    responses = []
+    replay_start = time.monotonic()
+    transcript_start = lines[0]["start"] if lines else 0
+    for line in lines:
+        delay = (line["end"] - transcript_start) / 1000 / speed - (time.monotonic() - replay_start)
+        if delay > 0:
+            sleep(delay)
+        responses.append(post(url, json=build_realtime_segment(bot_id, line)))
+    return responses
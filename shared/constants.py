@@ -0,0 +1,4 @@
+# Settings shared by the server and the command line tools, so both behave the same against Recall
+
+# Time limit in seconds shared by the concurrent Recall transcript and intelligence requests, including retries
+RECALL_FETCH_DEADLINE_SECONDS = 60
@@ -0,0 +1,348 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+import random
+import requests
+from requests.adapters import HTTPAdapter
+from threading import Lock
+import time
+from urllib.parse import urlparse
+
+# Functions in this file send every outbound HTTP request made by the server and the command line tools.
+# The module only depends on requests, so command_line/recall_tool.py can import it without the rest of the server.
+
+# (connect, read) timeouts in seconds for integrations without their own entry
+DEFAULT_TIMEOUT = (5, 30)
+
+# Methods that are safe to send again if the first attempt fails
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+
+# Response statuses after which an idempotent request is retried
+RETRY_STATUSES = frozenset([429, 502, 503, 504])
+
+# Response statuses counted as failures by the circuit breaker
+FAILURE_STATUSES = frozenset(range(500, 600))
+
+# Errors that mean the host couldn't be reached or didn't answer in time. Only these are retried and counted by the circuit breaker, unlike errors in the request itself such as an invalid URL
+HOST_ERRORS = (requests.ConnectionError, requests.Timeout)
+
+# Upper bounds, in milliseconds, of the latency histogram buckets (the last bucket has no upper bound)
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+def limit_timeout(timeout, remaining):
+    """Caps a requests timeout, either a number or a (connect, read) tuple, at the seconds remaining before a deadline."""
+    if timeout is None:
+        return remaining
+    if isinstance(timeout, tuple):
+        return tuple(min(part, remaining) if part is not None else remaining for part in timeout)
+    return min(timeout, remaining)
+
+def close_late_response(future):
+    """Closes the response of a request that finished after its caller stopped waiting, returning its connection to the pool."""
+    if future.exception() is None:
+        future.result().close()
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without sending a request while a host's circuit breaker is open."""
+
+class CircuitBreaker:
+    """
+    Stops requests to a host after repeated failures, so callers fail fast instead of waiting on timeouts.
+
+    After failure_threshold consecutive failures the circuit opens and requests are rejected. Once reset_seconds have passed, one trial request is let through: if it succeeds the circuit closes, otherwise it opens again.
+    """
+
+    def __init__(self, failure_threshold, reset_seconds):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_progress = False
+        self.lock = Lock()
+
+    @property
+    def state(self):
+        with self.lock:
+            if self.opened_at is None:
+                return 'closed'
+            if self.trial_in_progress or time.monotonic() - self.opened_at >= self.reset_seconds:
+                return 'half_open'
+            return 'open'
+
+    def allow_request(self):
+        """Checks whether a request may be sent, reserving the trial request if the circuit is half open."""
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if self.trial_in_progress or time.monotonic() - self.opened_at < self.reset_seconds:
+                return False
+            self.trial_in_progress = True
+            return True
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_progress = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_in_progress or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_in_progress = False
+
+    def release_trial(self):
+        """Gives up the trial request without counting it, after a request that failed for a reason that says nothing about the host."""
+        with self.lock:
+            self.trial_in_progress = False
+
+class LatencyMetrics:
+    """Request counts and a latency histogram for one integration."""
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.rejected = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.lock = Lock()
+
+    def record(self, elapsed_ms, failed):
+        with self.lock:
+            self.requests += 1
+            self.errors += failed
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            index = 0
+            while index < len(self.buckets_ms) and elapsed_ms > self.buckets_ms[index]:
+                index += 1
+            self.counts[index] += 1
+
+    def record_retry(self):
+        with self.lock:
+            self.retries += 1
+
+    def record_rejected(self):
+        with self.lock:
+            self.rejected += 1
+
+    def percentile(self, fraction):
+        """Estimates a latency percentile from the histogram, as the upper bound of the bucket it falls in."""
+        target = fraction * self.requests
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return self.buckets_ms[index] if index < len(self.buckets_ms) else self.max_ms
+        return 0.0
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "retries": self.retries,
+                "rejected": self.rejected,
+                "mean_ms": round(self.total_ms / self.requests, 1) if self.requests else 0.0,
+                "max_ms": round(self.max_ms, 1),
+                "p50_ms": self.percentile(0.5),
+                "p95_ms": self.percentile(0.95),
+                "histogram_ms": {
+                    **{f"le_{bound}": count for bound, count in zip(self.buckets_ms, self.counts)},
+                    "inf": self.counts[-1]
+                }
+            }
+
+class HttpClient:
+    """
+    Sends outbound HTTP requests over keep-alive connection pools, one pool per host.
+
+    Each request names the integration it belongs to, which selects its timeout and the metrics it is recorded in. Idempotent requests are retried with exponential backoff after connection errors, timeouts and RETRY_STATUSES; others are sent once. Each host has a circuit breaker, so a failing integration is rejected with CircuitOpenError instead of tying up a worker on every request.
+
+    Args:
+        timeouts: Dictionary of (connect, read) timeouts in seconds by integration name.
+        retries: The number of times an idempotent request is retried.
+        backoff_seconds: The delay before the first retry, doubled for each retry after it.
+        backoff_max_seconds: The longest delay between retries.
+        pool_size: The number of connections kept open to each host.
+        failure_threshold: The number of consecutive failures after which a host's circuit opens.
+        reset_seconds: How long a host's circuit stays open before a trial request is let through.
+        max_hosts: The number of hosts a connection pool and circuit breaker are kept for. The least recently used host's are dropped beyond it, since document and media URLs can point anywhere.
+        sleep: Function used to wait between retries.
+    """
+
+    def __init__(self, timeouts=None, retries=3, backoff_seconds=0.5, backoff_max_seconds=8, pool_size=10, failure_threshold=5, reset_seconds=30, max_hosts=64, sleep=time.sleep):
+        self.timeouts = timeouts or {}
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.pool_size = pool_size
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.max_hosts = max_hosts
+        self.sleep = sleep
+        self.sessions = OrderedDict()
+        self.breakers = OrderedDict()
+        self.metrics = {}
+        self.executor = None
+        self.lock = Lock()
+
+    def get_host_entry(self, entries, host, create):
+        """Gets a host's entry in sessions or breakers, creating it on first use and dropping the least recently used host's beyond max_hosts. Call with the lock held."""
+        entry = entries.get(host)
+        if entry is None:
+            entry = entries[host] = create()
+            while len(entries) > self.max_hosts:
+                # An evicted session is closed once the requests still using it finish
+                entries.popitem(last=False)
+        else:
+            entries.move_to_end(host)
+        return entry
+
+    def create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def get_session(self, host):
+        """Gets the session holding the connection pool for a host, creating it on first use."""
+        with self.lock:
+            return self.get_host_entry(self.sessions, host, self.create_session)
+
+    def get_breaker(self, host):
+        with self.lock:
+            return self.get_host_entry(self.breakers, host, lambda: CircuitBreaker(self.failure_threshold, self.reset_seconds))
+
+    def get_metrics(self, integration):
+        with self.lock:
+            metrics = self.metrics.get(integration)
+            if metrics is None:
+                metrics = self.metrics[integration] = LatencyMetrics()
+            return metrics
+
+    def backoff(self, attempt):
+        """Gets the delay before a retry, with full jitter so clients retrying together spread out."""
+        return random.uniform(0, min(self.backoff_max_seconds, self.backoff_seconds * 2 ** attempt))
+
+    def request(self, method, url, integration='default', retry=None, deadline=None, **kwargs):
+        """
+        Sends a request, retrying it if it's idempotent.
+
+        Args:
+            method: The HTTP method.
+            url: The URL to request.
+            integration: The integration the request belongs to, selecting its timeout and metrics.
+            retry: Whether to retry the request. Defaults to whether the method is idempotent.
+            deadline: Optional time.monotonic() value after which no attempt is started, and which caps each attempt's timeout.
+            **kwargs: Passed on to requests, e.g. headers, json, data or stream. A timeout given here overrides the integration's.
+
+        Returns:
+            The last response received. Responses with error statuses are returned rather than raised.
+
+        Raises:
+            CircuitOpenError: If the host's circuit breaker is open.
+            requests.RequestException: If the last attempt failed without a response, or the deadline passed.
+        """
+        method = method.upper()
+        host = urlparse(url).netloc
+        kwargs.setdefault('timeout', self.timeouts.get(integration, DEFAULT_TIMEOUT))
+        attempts = 1 + (self.retries if (retry if retry is not None else method in IDEMPOTENT_METHODS) else 0)
+        session = self.get_session(host)
+        breaker = self.get_breaker(host)
+        metrics = self.get_metrics(integration)
+
+        for attempt in range(attempts):
+            attempt_kwargs = kwargs
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise requests.Timeout(f"Deadline passed before requesting {url}")
+                attempt_kwargs = {**kwargs, 'timeout': limit_timeout(kwargs['timeout'], remaining)}
+            if not breaker.allow_request():
+                metrics.record_rejected()
+                raise CircuitOpenError(f"Circuit open for {host} after repeated failures")
+
+            # Don't retry if the backoff would run past the deadline
+            delay = self.backoff(attempt)
+            last_attempt = attempt == attempts - 1 or (deadline is not None and time.monotonic() + delay >= deadline)
+
+            start_time = time.perf_counter()
+            try:
+                response = session.request(method, url, **attempt_kwargs)
+            except requests.RequestException as e:
+                metrics.record((time.perf_counter() - start_time) * 1000, True)
+                if not isinstance(e, HOST_ERRORS):
+                    breaker.release_trial()
+                    raise
+                breaker.record_failure()
+                if last_attempt:
+                    raise
+            else:
+                failed = response.status_code in FAILURE_STATUSES
+                metrics.record((time.perf_counter() - start_time) * 1000, failed)
+                if failed:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if response.status_code not in RETRY_STATUSES or last_attempt:
+                    return response
+                response.close()
+
+            metrics.record_retry()
+            self.sleep(delay)
+
+    def get(self, url, integration='default', **kwargs):
+        return self.request('GET', url, integration, **kwargs)
+
+    def post(self, url, integration='default', **kwargs):
+        return self.request('POST', url, integration, **kwargs)
+
+    def get_executor(self):
+        """Gets the thread pool used to send concurrent requests, creating it on first use."""
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='http')
+            return self.executor
+
+    def get_many(self, urls, integration='default', deadline_seconds=None, **kwargs):
+        """
+        Sends GET requests for several URLs at the same time, so the wait is the slowest request rather than the sum of them.
+
+        Args:
+            urls: The URLs to request.
+            integration: The integration the requests belong to.
+            deadline_seconds: Optional time limit shared by all the requests, including their retries.
+            **kwargs: Passed on to each request.
+
+        Returns:
+            A list with, for each URL in order, either its response or the exception its request failed with, so callers can tell which requests failed. Requests still running at the deadline are reported as requests.Timeout, and their responses are closed when they arrive.
+        """
+        deadline = time.monotonic() + deadline_seconds if deadline_seconds is not None else None
+        executor = self.get_executor()
+        futures = [executor.submit(self.get, url, integration, deadline=deadline, **kwargs) for url in urls]
+        done, _ = wait(futures, timeout=deadline_seconds)
+
+        results = []
+        for url, future in zip(urls, futures):
+            if future in done:
+                results.append(future.exception() or future.result())
+            else:
+                if not future.cancel():
+                    future.add_done_callback(close_late_response)
+                results.append(requests.Timeout(f"No response from {url} within {deadline_seconds} seconds"))
+        return results
+
+    def metrics_snapshot(self):
+        """Gets the latency metrics of every integration and the state of every host's circuit breaker."""
+        with self.lock:
+            metrics = dict(self.metrics)
+            breakers = dict(self.breakers)
+        return {
+            "integrations": {integration: integration_metrics.snapshot() for integration, integration_metrics in sorted(metrics.items())},
+            "circuits": {host: breaker.state for host, breaker in sorted(breakers.items())}
+        }
@@ -0,0 +1,180 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from threading import Lock
+import time
+
+# Functions in this file keep raw provider payloads on disk, so re-analysis and debugging don't download them again.
+# The module only uses the standard library, so the server and command_line/recall_tool.py share it.
+
+# Matches the bot ids and payload kinds allowed in file names, so a key can't point outside the cache
+KEY_PATTERN = re.compile(r'[A-Za-z0-9_-]+')
+
+def encode_payload(data):
+    """Serializes a JSON payload compactly, so equal payloads have equal bytes and hashes."""
+    return json.dumps(data, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+def write_atomically(path, content):
+    """Writes a file through a uniquely named temporary file and a rename, so readers never see a partial file and concurrent writers of the same file don't clash."""
+    descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write(content)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+class PayloadCache:
+    """
+    Content-addressed, gzip-compressed cache of JSON payloads, with least recently used eviction by total size.
+
+    Each payload is stored once under the SHA-256 hash of its bytes in objects/, and refs/ maps a (bot id, payload kind) pair to the hash it was last fetched with. Reading a payload updates its object's modification time, which is the recency used for eviction.
+
+    Args:
+        root: The directory the cache is stored in. Created on first write.
+        max_bytes: The largest total size of the compressed objects. The least recently used are deleted beyond it.
+        max_age_seconds: How long after it was fetched a payload is served. None serves payloads until they're evicted.
+        compresslevel: The gzip compression level.
+    """
+
+    def __init__(self, root, max_bytes, max_age_seconds=None, compresslevel=6):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.compresslevel = compresslevel
+        self.total_bytes = None
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+    def object_path(self, payload_hash):
+        return os.path.join(self.root, 'objects', payload_hash[:2], payload_hash + '.json.gz')
+
+    def ref_path(self, bot_id, kind):
+        if not KEY_PATTERN.fullmatch(bot_id) or not KEY_PATTERN.fullmatch(kind):
+            raise ValueError(f"Invalid payload cache key: {bot_id}/{kind}")
+        return os.path.join(self.root, 'refs', bot_id, kind + '.json')
+
+    def get(self, bot_id, kind):
+        """
+        Gets a cached payload.
+
+        Returns:
+            The decoded payload, or None if it isn't cached, was fetched more than max_age_seconds ago, or has been evicted.
+        """
+        data = None
+        try:
+            with open(self.ref_path(bot_id, kind)) as f:
+                ref = json.load(f)
+            if self.max_age_seconds is None or time.time() - ref["fetched_at"] <= self.max_age_seconds:
+                path = self.object_path(ref["hash"])
+                with gzip.open(path, 'rb') as f:
+                    data = json.loads(f.read())
+        except (ValueError, KeyError, OSError):
+            pass
+        if data is None:
+            with self.lock:
+                self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            # Evicted by another process since it was read
+            pass
+
+        with self.lock:
+            self.hits += 1
+        return data
+
+    def put(self, bot_id, kind, data):
+        """
+        Stores a payload, evicting the least recently used objects if the cache grows past max_bytes.
+
+        Returns:
+            The payload's hash.
+        """
+        content = encode_payload(data)
+        payload_hash = hashlib.sha256(content).hexdigest()
+        path = self.object_path(payload_hash)
+
+        added_bytes = 0
+        if os.path.exists(path):
+            # The same payload is already stored, possibly for another bot, so just mark it as used
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            compressed = gzip.compress(content, compresslevel=self.compresslevel)
+            write_atomically(path, compressed)
+            added_bytes = len(compressed)
+
+        ref_path = self.ref_path(bot_id, kind)
+        os.makedirs(os.path.dirname(ref_path), exist_ok=True)
+        write_atomically(ref_path, json.dumps({"hash": payload_hash, "fetched_at": time.time()}).encode('utf-8'))
+
+        with self.lock:
+            if self.total_bytes is not None:
+                self.total_bytes += added_bytes
+            over_limit = self.total_bytes is None or self.total_bytes > self.max_bytes
+        if over_limit:
+            self.evict()
+        return payload_hash
+
+    def invalidate(self, bot_id):
+        """Drops every ref of a bot, so its payloads are fetched again. The objects are left for eviction, since other bots' refs may share them."""
+        if not KEY_PATTERN.fullmatch(bot_id):
+            raise ValueError(f"Invalid payload cache key: {bot_id}")
+        shutil.rmtree(os.path.join(self.root, 'refs', bot_id), ignore_errors=True)
+
+    def list_objects(self):
+        """Lists the (modification time, size, path) of every stored object."""
+        objects = []
+        objects_root = os.path.join(self.root, 'objects')
+        if not os.path.isdir(objects_root):
+            return objects
+        for directory in os.scandir(objects_root):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                if entry.name.endswith('.json.gz'):
+                    stat = entry.stat()
+                    objects.append((stat.st_mtime, stat.st_size, entry.path))
+        return objects
+
+    def evict(self):
+        """
+        Deletes the least recently used objects until the cache fits in max_bytes. Refs to deleted objects become misses.
+
+        The directory is scanned rather than trusting the running total, since other processes may share the cache.
+
+        Returns:
+            The number of objects deleted.
+        """
+        objects = sorted(self.list_objects())
+        total_bytes = sum(size for _, size, _ in objects)
+        deleted = 0
+        for _, size, path in objects:
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+            deleted += 1
+
+        with self.lock:
+            self.total_bytes = total_bytes
+        return deleted
+
+    def stats(self):
+        """Gets the cache's hit and miss counts and its size on disk."""
+        with self.lock:
+            hits, misses = self.hits, self.misses
+        objects = self.list_objects()
+        return {"hits": hits, "misses": misses, "objects": len(objects), "bytes": sum(size for _, size, _ in objects), "max_bytes": self.max_bytes}